@@ -16,8 +16,10 @@ class HandCalibrator:
         curr_lim=50,
         testing=False,
         motor_ids=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11],
+        port=None,
     ):
-        self.hand = Hand(hand_type)
+        # The limits are what is being calibrated, so goals are not clamped
+        self.hand = Hand(hand_type, port=port, enforce_limits=False)
         self.curr_lim = curr_lim
         self.testing = testing
         self.motor_ids = motor_ids
@@ -118,6 +120,12 @@ def parse_args():
     parser.add_argument(
         "--curr-lim", type=int, default=50, help="Current limit for calibration"
     )
+    parser.add_argument(
+        "--port",
+        type=str,
+        default=None,
+        help="Port of the hand, e.g. /dev/pts/3 of an emulated bus",
+    )
     return parser.parse_args()
 
 
@@ -131,5 +139,6 @@ if __name__ == "__main__":
         hand_type=args.hand_type,
         curr_lim=args.curr_lim,
         testing=args.testing,
+        port=args.port,
     )
     calibrator.save_motor_limits()
@@ -0,0 +1,190 @@
+# Runs several hands in one process from a single schedule
+import torch
+import zmq
+
+from ruka_hand.control.operator import RUKAOperator
+from ruka_hand.learning.grouped_lstm_mlp_enc_dec import GroupedLSTMMLPEncDec
+from ruka_hand.utils.timer import FrequencyTimer
+
+
+class BimanualOperator:
+    """Drives both hands from one process and one scheduler loop.
+
+    The bus of every hand is owned by its own HandIOThread, so the serial I/O
+    of the hands overlaps and never blocks the scheduler, which only runs the
+    inference of all hands in each tick and submits their goals together.
+    Finger learners of the same shapes are grouped across the hands, so each
+    tick runs one GroupedLSTMMLPEncDec forward per shape for both hands.
+    Compared to one RUKAOperator process per hand this spends one timer and
+    one interpreter on both hands and keeps their goals in the same tick.
+
+    Args:
+        hand_types: The hands to drive, e.g. ("left", "right").
+        frequency: Rate of the scheduler, i.e. of inference and goals.
+        io_frequency: Rate of the I/O thread of each hand.
+        Remaining arguments are passed to each RUKAOperator.
+    """
+
+    def __init__(
+        self,
+        hand_types=("left", "right"),
+        frequency=50,
+        io_frequency=200,
+        moving_average_limit=1,
+        fingertip_overshoot_ratio=0,
+        joint_angle_overshoot_ratio=0,
+        record=False,
+        data_save_dir=None,
+        hand_options=None,
+    ):
+        self.timer = FrequencyTimer(frequency)
+        self.operators = {
+            hand_type: RUKAOperator(
+                hand_type=hand_type,
+                moving_average_limit=moving_average_limit,
+                fingertip_overshoot_ratio=fingertip_overshoot_ratio,
+                joint_angle_overshoot_ratio=joint_angle_overshoot_ratio,
+                record=record,
+                data_save_dir=data_save_dir,
+                io_frequency=io_frequency,
+                hand_options=hand_options,
+            )
+            for hand_type in hand_types
+        }
+        self.device = next(iter(self.operators.values())).controller.device
+        self.learner_groups = self._group_learners()
+
+    def _group_learners(self):
+        # Returns a list of ((hand type, finger name) pairs, GroupedLSTMMLPEncDec)
+        # for the learners whose shapes are shared by several hands, the others
+        # run in the learner groups of their controller. Exported graphs and
+        # streaming controllers, which keep their LSTM states, are not grouped.
+        signatures = {}
+        for hand_type, operator in self.operators.items():
+            controller = operator.controller
+            if (
+                controller.inference_backend != "eager"
+                or controller.streaming_inference
+            ):
+                continue
+            for finger_name, learner in controller.learners.items():
+                # Grouped learners take a batch of observation sequences
+                if "obs_horizon" in controller.cfgs[finger_name].dataset:
+                    signatures.setdefault(
+                        GroupedLSTMMLPEncDec.signature(learner), []
+                    ).append((hand_type, finger_name))
+
+        learner_groups = []
+        for members in signatures.values():
+            if len({hand_type for hand_type, _ in members}) < 2:
+                continue
+            try:
+                grouped_learner = GroupedLSTMMLPEncDec(
+                    [
+                        self.operators[hand_type].controller.learners[finger_name]
+                        for hand_type, finger_name in members
+                    ]
+                ).to(self.device)
+            except ValueError as e:
+                print(f"Not grouping learners of {members}: {e}")
+                continue
+            learner_groups.append((members, grouped_learner))
+
+        print(f"Bimanual Learner Groups: {[members for members, _ in learner_groups]}")
+        return learner_groups
+
+    def step(self, hand_keypoints):
+        """Runs one tick for the hands in hand_keypoints.
+
+        Args:
+            hand_keypoints: Dict from hand type to its keypoints, hands
+                without new keypoints are skipped and keep their goal.
+        """
+        controllers = dict()
+        model_inputs = dict()
+        for hand_type, keypoints in hand_keypoints.items():
+            if keypoints is None:
+                continue
+            model_input = self.operators[hand_type]._keypoints_to_input(keypoints)
+            if model_input is not None:
+                controllers[hand_type] = self.operators[hand_type].controller
+                model_inputs[hand_type] = model_input
+
+        # The stages of HandController.step, with the learner groups shared by
+        # the hands run once for all of them in between
+        try:
+            with torch.inference_mode():
+                finger_inputs = dict()
+                for hand_type, controller in controllers.items():
+                    controller._read_tick_state()
+                    finger_inputs[hand_type] = controller._process_inputs(
+                        model_inputs[hand_type]
+                    )
+
+                pred_motor_positions = {hand_type: dict() for hand_type in controllers}
+                for members, grouped_learner in self.learner_groups:
+                    # Skipped if a hand has no step this tick, the other hands
+                    # then run these fingers in their own learner groups
+                    if any(hand_type not in controllers for hand_type, _ in members):
+                        continue
+                    # (fingers, 1, obs_horizon, input_dim), a batch of one each
+                    grouped_input = torch.stack(
+                        [
+                            finger_inputs[hand_type][finger_name]
+                            for hand_type, finger_name in members
+                        ]
+                    ).unsqueeze(1)
+                    grouped_pred = (
+                        grouped_learner(grouped_input.to(self.device)).detach().cpu()
+                    )
+                    for index, (hand_type, finger_name) in enumerate(members):
+                        pred_motor_positions[hand_type][finger_name] = grouped_pred[
+                            index, 0
+                        ]
+
+                for hand_type, controller in controllers.items():
+                    operator = self.operators[hand_type]
+                    controller._predict(
+                        finger_inputs[hand_type], pred_motor_positions[hand_type]
+                    )
+                    controller._apply_predictions(
+                        pred_motor_positions[hand_type],
+                        moving_average_info={
+                            "queue": operator.motor_moving_average_queue,
+                            "limit": operator.moving_average_limit,
+                        },
+                    )
+        finally:
+            for controller in controllers.values():
+                controller._tick_state = None
+
+    def run(self, r2r_teleop=False):
+        for operator in self.operators.values():
+            operator._init_subscribers(r2r_teleop)
+
+        try:
+            while True:
+                self.timer.start_loop()
+                # A hand whose stream has no new keypoints does not hold back
+                # the other one
+                self.step(
+                    {
+                        hand_type: operator._recv_keypoints(
+                            flip_x_axis=r2r_teleop, flags=zmq.NOBLOCK
+                        )
+                        for hand_type, operator in self.operators.items()
+                    }
+                )
+                self.timer.end_loop()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def reset(self):
+        for operator in self.operators.values():
+            operator.reset()
+
+    def close(self):
+        for operator in self.operators.values():
+            operator.controller.close()
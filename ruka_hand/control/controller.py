@@ -10,14 +10,26 @@ import torch
 from omegaconf import OmegaConf
 
 from ruka_hand.control.hand import *
+from ruka_hand.learning.export import load_exported_learner
+from ruka_hand.learning.grouped_lstm_mlp_enc_dec import GroupedLSTMMLPEncDec
 from ruka_hand.utils.constants import *
 from ruka_hand.utils.data import handle_normalization
-from ruka_hand.utils.extract_control_table import df_controlTable
 from ruka_hand.utils.file_ops import get_repo_root
+from ruka_hand.utils.history import ObservationHistory
 from ruka_hand.utils.initialize_learner import init_learner
 from ruka_hand.utils.timer import FrequencyTimer
+from ruka_hand.utils.trajectory import profile_position
 from ruka_hand.utils.vectorops import moving_average
 
+# Registers held by the state snapshots of the hand, see STATE_DTYPE
+STATE_REGISTER_FIELDS = {
+    "Present Position": "position",
+    "Present Velocity": "velocity",
+    "Present Current": "current",
+    "Present Temperature": "temperature",
+    "Hardware Error Status": "hardware_error",
+}
+
 
 class HandController:
     def __init__(
@@ -28,6 +40,15 @@ class HandController:
         device="cpu",
         record=False,
         data_save_dir=None,
+        port=None,
+        profiled_moves=False,
+        io_frequency=None,
+        batched_inference=True,
+        streaming_inference=False,
+        resync_period=50,
+        inference_backend="eager",
+        num_threads=None,
+        hand_options=None,
     ):
         """
         finger_to_training_dir = {
@@ -46,11 +67,48 @@ class HandController:
         learner_dict = self._set_learner_dict(hand_type)
 
         self.device = device
+        # "eager" runs the checkpoints with PyTorch, "torchscript" and "onnx"
+        # the graphs exported from them with scripts/export_controller.py on
+        # the CPU. Steps always run without autograd, on num_threads threads
+        # if given.
+        if inference_backend not in ["eager", "torchscript", "onnx"]:
+            raise ValueError(f"Unknown inference backend {inference_backend}")
+        self.inference_backend = inference_backend
+        self.num_threads = num_threads
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
         self._load_learners(learner_dict=learner_dict)
         self._set_input_type()
+        # Fingers whose learners have the same shapes run in one forward pass.
+        # Exported graphs are already fused and keep no LSTM state.
+        if inference_backend != "eager":
+            batched_inference = streaming_inference = False
+        self.learner_groups = self._group_learners(batched_inference)
+        # With streaming_inference the LSTM state of each learner group is
+        # kept between steps and only the newest observation is fed to it.
+        # Every resync_period steps the state is rebuilt from the whole
+        # observation window, bounding the drift from the windows trained on.
+        self.streaming_inference = streaming_inference
+        self.resync_period = resync_period
+        self._lstm_states = dict()
+        self._steps_since_resync = 0
         self.finger_to_stats = self._load_dataset_stats(learner_dict=learner_dict)
-
-        self.hand = Hand(hand_type)
+        # Fingers whose inputs or outputs depend on the motor positions
+        self._state_fingers = [
+            finger_name
+            for finger_name, cfg in self.cfgs.items()
+            if ("state_as_input" in cfg.dataset and cfg.dataset.state_as_input)
+            or ("predict_residual" in cfg.dataset and cfg.dataset.predict_residual)
+        ]
+
+        # With io_frequency, the bus is owned by the I/O thread of the hand and
+        # steps only submit goals and read its latest state. hand_options are
+        # passed to the hand, CONTROL_HAND_OPTIONS if None.
+        if hand_options is None:
+            hand_options = CONTROL_HAND_OPTIONS
+        self.hand = Hand(
+            hand_type, port=port, io_frequency=io_frequency, **hand_options
+        )
         self.hand_pos = self.hand.init_pos
         self.record = record
         if record:
@@ -68,7 +126,12 @@ class HandController:
 
         self.timer = FrequencyTimer(frequency * single_move_len)
         self.single_move_len = single_move_len
+        # Multi-step moves are a single goal write with the motion profile of
+        # the motors instead of one write per interpolated step
+        self.profiled_moves = profiled_moves
         self.past_observations = dict()
+        # Hand state read once at the start of step and used by all its stages
+        self._tick_state = None
         self.robot_stats = torch.FloatTensor([self.hand.min_lim, self.hand.max_lim])
 
     def _set_learner_dict(self, hand_type):
@@ -92,6 +155,17 @@ class HandController:
             cfg = OmegaConf.load(os.path.join(training_dir, ".hydra/config.yaml"))
             model_path = Path(training_dir) / "models"
 
+            if self.inference_backend != "eager":
+                learner = load_exported_learner(
+                    model_path,
+                    model_type=checkpoint,
+                    export_format=self.inference_backend,
+                    num_threads=self.num_threads,
+                )
+                self.learners[key] = learner
+                self.cfgs[key] = cfg
+                continue
+
             # Load the trained model
             learner = init_learner(cfg=cfg, device=self.device)
             learner.load(model_path, training_cfg=cfg, model_type=checkpoint, device=self.device)
@@ -103,6 +177,41 @@ class HandController:
 
         print(f"Controller Learners: {self.learners}")
 
+    def _group_learners(self, batched_inference):
+        # Returns a list of (finger names, GroupedLSTMMLPEncDec or None), the
+        # fingers without a grouped learner use their own learner
+        if not batched_inference:
+            return [([finger_name], None) for finger_name in self.learners.keys()]
+
+        signatures = {}
+        for finger_name, learner in self.learners.items():
+            # Grouped learners take a batch of observation sequences
+            if "obs_horizon" in self.cfgs[finger_name].dataset:
+                signature = GroupedLSTMMLPEncDec.signature(learner)
+            else:
+                signature = finger_name
+            signatures.setdefault(signature, []).append(finger_name)
+
+        learner_groups = []
+        for finger_names in signatures.values():
+            grouped_learner = None
+            if len(finger_names) > 1:
+                try:
+                    grouped_learner = GroupedLSTMMLPEncDec(
+                        [self.learners[finger_name] for finger_name in finger_names]
+                    ).to(self.device)
+                except ValueError as e:
+                    print(f"Not grouping learners of {finger_names}: {e}")
+            if grouped_learner is None:
+                learner_groups.extend(
+                    ([finger_name], None) for finger_name in finger_names
+                )
+            else:
+                learner_groups.append((finger_names, grouped_learner))
+
+        print(f"Controller Learner Groups: {[names for names, _ in learner_groups]}")
+        return learner_groups
+
     def _set_input_type(self):
         all_input_types = np.array(
             [cfg.dataset.input_type for cfg in self.cfgs.values()]
@@ -135,6 +244,7 @@ class HandController:
         return finger_to_stats
 
     def reset(self):
+        self._lstm_states = dict()
         self.move_to_pos(
             curr_pos=self.hand.read_pos(), des_pos=self.hand.tensioned_pos, traj_len=30
         )
@@ -146,7 +256,9 @@ class HandController:
         cfg = self.cfgs[finger_name]
         if "state_as_input" in cfg.dataset and cfg.dataset.state_as_input:
             motor_ids = FINGER_NAMES_TO_MOTOR_IDS[finger_name]
-            curr_motor_pos = torch.FloatTensor(self.hand.read_pos())[motor_ids]
+            curr_motor_pos = torch.as_tensor(self._read_pos(), dtype=torch.float32)[
+                motor_ids
+            ]
 
             input = handle_normalization(
                 input=input,
@@ -186,23 +298,13 @@ class HandController:
 
         if "obs_horizon" in cfg.dataset:  # TODO: Check if this actually works
             if not finger_name in self.past_observations:
-                self.past_observations[finger_name] = input.repeat(
-                    cfg.dataset.obs_horizon
-                ).reshape(-1, input.shape[0])
-
-            else:
-
-                self.past_observations[finger_name] = torch.cat(
-                    [
-                        torch.roll(
-                            self.past_observations[finger_name], shifts=-1, dims=0
-                        )[:-1, :],
-                        input.unsqueeze(0),
-                    ],
-                    dim=0,
+                self.past_observations[finger_name] = ObservationHistory(
+                    cfg.dataset.obs_horizon, input
                 )
+            else:
+                self.past_observations[finger_name].append(input)
 
-            input = self.past_observations[finger_name]
+            input = self.past_observations[finger_name].view()
 
         return input
 
@@ -220,25 +322,69 @@ class HandController:
         motor_ids = FINGER_NAMES_TO_MOTOR_IDS[finger_name]
         if "predict_residual" in cfg.dataset and cfg.dataset.predict_residual:
             # Get the current motor position and add the output to that
-            curr_motor_pos = np.array(self.hand.read_pos())[motor_ids]
+            curr_motor_pos = self._read_pos()[motor_ids]
             output = curr_motor_pos + output
 
-        output = np.clip(output, 0, 4000)
-        for i in range(len(motor_ids)):
-            self.hand_pos[motor_ids[i]] = output[i]
+        # Clamped to the calibrated motor limits of the hand, as steps without
+        # a move return and record hand_pos without passing it to the hand
+        self.hand_pos[motor_ids] = np.clip(
+            np.asarray(output),
+            self.hand.goal_min[motor_ids],
+            self.hand.goal_max[motor_ids],
+        )
+
+    def _read_tick_state(self, move=True):
+        # Only read if a stage of the step uses the state, i.e. fingers with
+        # the motor positions as input or residual, recording or multi-step
+        # moves. The position comes from Hand.read_pos, which fills motors
+        # that did not reply with their last good position. With recording,
+        # it and the other recorded registers are reused by _update_ruka_data
+        if not (
+            self._state_fingers or (move and (self.record or self.single_move_len > 1))
+        ):
+            return
+        position = np.asarray(self.hand.read_pos(), dtype=np.float64)
+        registers = None
+        if self.record and move:
+            names = [
+                name for name in self._data_names.values() if name != "Present Position"
+            ]
+            registers = self._read_registers(names) if names else dict()
+            registers["Present Position"] = position.tolist()
+        self._tick_state = dict(
+            position=position, registers=registers, timestamp=time.time()
+        )
+
+    def _read_registers(self, names):
+        # With the I/O thread the registers of its state snapshots are taken
+        # from the latest one instead of a bus read competing with the thread
+        if self.hand.io_thread is not None and all(
+            name in STATE_REGISTER_FIELDS for name in names
+        ):
+            state = self.hand.read_state()
+            return {name: state[STATE_REGISTER_FIELDS[name]].tolist() for name in names}
+        return self.hand.read_registers(names)
+
+    def _read_pos(self):
+        # Position of the current step if there is one, otherwise read now
+        if self._tick_state is not None:
+            return self._tick_state["position"]
+        return np.asarray(self.hand.read_pos(), dtype=np.float64)
 
-    def _update_ruka_data(self, commanded_position):
+    def _update_ruka_data(self, commanded_position, tick_state=None):
         curr_data = dict()
+        if tick_state is not None and tick_state["registers"] is not None:
+            registers = tick_state["registers"]
+            timestamp = tick_state["timestamp"]
+        else:
+            # All registers are read with a single bulk read
+            registers = self._read_registers(list(self._data_names.values()))
+            timestamp = time.time()
         for key, value in self._data_names.items():
-            row = df_controlTable[df_controlTable["Data Name"] == value]
-            addr = int(row["Address"].values[0])
-            size = int(row["Size(Byte)"].values[0])
-            data = self.hand.read_any(addr, size)
-            curr_data[key] = np.array(data)
+            curr_data[key] = np.array(registers[value])
             if key == "present_position":
-                curr_data["timestamp"] = (
-                    time.time()
-                )  # Save the time of the present position
+                # Save the time of the present position
+                curr_data["timestamp"] = timestamp
 
         curr_data["commanded_position"] = np.array(commanded_position)
 
@@ -260,7 +406,13 @@ class HandController:
             self.hand.set_pos(des_pos)
             self.hand_pos = des_pos
             if self.record:
-                self._update_ruka_data(commanded_position=des_pos)
+                self._update_ruka_data(
+                    commanded_position=des_pos, tick_state=self._tick_state
+                )
+            return
+
+        if self.profiled_moves:
+            self._move_to_pos_profiled(curr_pos, des_pos, traj_len)
             return
 
         trajectory = np.linspace(curr_pos, des_pos, traj_len)[
@@ -278,24 +430,118 @@ class HandController:
 
             self.timer.end_loop()
 
+    def _move_to_pos_profiled(self, curr_pos, des_pos, traj_len):
+        duration = self.hand.set_pos_profiled(
+            des_pos,
+            (traj_len - 1) * self.timer.time_available / 1e9,
+            curr_pos=curr_pos,
+        )
+        self.hand_pos = des_pos
+
+        if not self.record:
+            time.sleep(duration)
+        else:
+            # The timer only paces the recording, the motors move on their own
+            start = time.monotonic()
+            elapsed = 0.0
+            while elapsed < duration:
+                self.timer.start_loop()
+                self._update_ruka_data(
+                    commanded_position=profile_position(
+                        curr_pos, des_pos, elapsed, duration
+                    )
+                )
+                self.timer.end_loop()
+                elapsed = time.monotonic() - start
+        self.hand.clear_profile()
+
     def step(self, input_data, moving_average_info=None, move=True):
+        # The hand state is read once per step instead of in every stage
+        self._read_tick_state(move)
+        try:
+            with torch.inference_mode():
+                return self._step(input_data, moving_average_info, move)
+        finally:
+            self._tick_state = None
+
+    def _step(self, input_data, moving_average_info=None, move=True):
+        model_inputs = self._process_inputs(input_data)
+        pred_motor_positions = self._predict(model_inputs)
+        return self._apply_predictions(pred_motor_positions, moving_average_info, move)
+
+    def _process_inputs(self, input_data):
         # input_data: (5,3) - 5: fingers, 3: input_dim
         input_data = torch.FloatTensor(input_data)
         # times_passed = []
 
+        model_inputs = dict()
         for finger_name in self.learners.keys():
-            learner = self.learners[finger_name]
-
             finger_id = FINGER_NAMES_TO_MANUS_IDS[finger_name]
-            motor_ids = FINGER_NAMES_TO_MOTOR_IDS[finger_name]
-
             model_input = input_data[finger_id, :]  # (3)
 
-            model_input = self._process_input(
+            model_inputs[finger_name] = self._process_input(
                 input=model_input, finger_name=finger_name
             )
-
-            pred_motor_pos = learner.forward(model_input).detach().cpu()[0]
+        return model_inputs
+
+    def _predict(self, model_inputs, pred_motor_positions=None):
+        # Fills pred_motor_positions with the normalized prediction of every
+        # finger, skipping the learner groups whose fingers it already holds,
+        # e.g. predicted together with the other hand by BimanualOperator
+        if pred_motor_positions is None:
+            pred_motor_positions = dict()
+
+        if self.streaming_inference:
+            self._steps_since_resync += 1
+            if self._steps_since_resync >= self.resync_period:
+                self._lstm_states = dict()
+                self._steps_since_resync = 0
+
+        for group_id, (finger_names, grouped_learner) in enumerate(self.learner_groups):
+            if all(finger_name in pred_motor_positions for finger_name in finger_names):
+                continue
+            # Only the newest observation of the window is new to a kept state
+            state = self._lstm_states.get(group_id)
+            window = slice(-1, None) if state is not None else slice(None)
+
+            if grouped_learner is None:
+                finger_name = finger_names[0]
+                learner = self.learners[finger_name]
+                if not (
+                    self.streaming_inference
+                    and "obs_horizon" in self.cfgs[finger_name].dataset
+                ):
+                    pred_motor_positions[finger_name] = (
+                        learner.forward(model_inputs[finger_name]).detach().cpu()[0]
+                    )
+                    continue
+                pred, state = learner.forward_state(
+                    model_inputs[finger_name][window], state
+                )
+                pred_motor_positions[finger_name] = pred.detach().cpu()[0]
+                self._lstm_states[group_id] = state
+                continue
+
+            # (fingers, 1, obs_horizon, input_dim), a batch of one per finger
+            grouped_input = torch.stack(
+                [model_inputs[finger_name][window] for finger_name in finger_names]
+            ).unsqueeze(1)
+            grouped_pred, state = grouped_learner.forward_state(
+                grouped_input.to(self.device), state
+            )
+            grouped_pred = grouped_pred.detach().cpu()
+            for index, finger_name in enumerate(finger_names):
+                pred_motor_positions[finger_name] = grouped_pred[index, 0]
+            if self.streaming_inference:
+                self._lstm_states[group_id] = state
+        return pred_motor_positions
+
+    def _apply_predictions(
+        self, pred_motor_positions, moving_average_info=None, move=True
+    ):
+        for finger_name in self.learners.keys():
+            motor_ids = FINGER_NAMES_TO_MOTOR_IDS[finger_name]
+            pred_motor_pos = pred_motor_positions[finger_name]
 
             robot_stats = torch.stack(
                 [self.robot_stats[0][motor_ids], self.robot_stats[1][motor_ids]]
@@ -317,8 +563,9 @@ class HandController:
 
         # before_step = time.time()
         if move:
+            # Single step moves go straight to the goal without the position
             self.move_to_pos(
-                curr_pos=self.hand.read_pos(),
+                curr_pos=self._read_pos() if self.single_move_len > 1 else None,
                 des_pos=self.hand_pos,
                 traj_len=self.single_move_len,
             )
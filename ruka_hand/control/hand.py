@@ -3,14 +3,20 @@ from copy import deepcopy as copy
 
 import numpy as np
 
+from ruka_hand.control.hand_io import HandIOThread
+from ruka_hand.control.thermal_monitor import ThermalMonitor
 from ruka_hand.utils.constants import (
     FINGER_NAMES_TO_MOTOR_IDS,
     MOTOR_RANGES_LEFT,
     MOTOR_RANGES_RIGHT,
+    SHARED_STATE_NAMES,
+    USB_PORT_SHARDS,
     USB_PORTS,
 )
 from ruka_hand.utils.dynamixel_util import *
 from ruka_hand.utils.file_ops import get_repo_root
+from ruka_hand.utils.shared_state import SharedStateRing
+from ruka_hand.utils.trajectory import synchronized_profile
 
 """port: The Dynamixel device to talk to. e.g.
                 - Linux: /dev/ttyUSB0
@@ -30,19 +36,70 @@ DIP_PIP_D_GAIN = 960
 DIP_PIP_I_GAIN = 100
 DIP_PIP_P_GAIN = 500
 
+# Bus and monitoring subsystems of Hand, off by default, which HandController
+# enables for the control and teleoperation loops
+CONTROL_HAND_OPTIONS = dict(
+    indirect_state=True,
+    fast_sync_read=True,
+    native_codec=True,
+    recovery=True,
+    thermal_monitor=True,
+)
+
 
 class Hand:
     """Robot Hand class.
     Initializes dynamixel client, sets motor ids and initial motor settings.
     """
 
-    def __init__(self, hand_type="right"):
+    def __init__(
+        self,
+        hand_type="right",
+        io_frequency=None,
+        port=None,
+        profile_interval=None,
+        goal_deadband=0,
+        goal_refresh_period=1.0,
+        publish_state=False,
+        read_deadline=0.01,
+        read_timeout=None,
+        indirect_state=False,
+        fast_sync_read=False,
+        native_codec=False,
+        recovery=False,
+        thermal_monitor=False,
+        enforce_limits=True,
+        max_goal_step=None,
+    ):
         self.motors = motors = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
         self.DIP_PIP_motors = [4, 6, 9, 11]
         self.MCP_motors = [5, 7, 8, 10]
         # self.motors = motors = [1]
-        self.port = USB_PORTS[hand_type]
-        self.dxl_client = DynamixelClient(motors, self.port)
+        # port overrides the USB port of the hand, e.g. emulator://right, and
+        # can also be a dict from port to motor IDs like USB_PORT_SHARDS
+        if port is not None:
+            self.port = port
+        else:
+            self.port = USB_PORT_SHARDS.get(hand_type, USB_PORTS[hand_type])
+        client_kwargs = dict(
+            indirect_state=indirect_state,
+            fast_sync_read=fast_sync_read,
+            native_codec=native_codec,
+            # Failing motors are recovered in the background, see MotorRecovery
+            recovery=recovery,
+            # Only lower this with the latency timer of the USB adapter
+            read_timeout=read_timeout,
+            # Logs bus latencies and errors every profile_interval seconds
+            profiler=(
+                BusProfiler(summary_interval=profile_interval)
+                if profile_interval is not None
+                else None
+            ),
+        )
+        if isinstance(self.port, dict):
+            self.dxl_client = ShardedDynamixelClient(motors, self.port, **client_kwargs)
+        else:
+            self.dxl_client = DynamixelClient(motors, self.port, **client_kwargs)
         self.dxl_client.connect()
 
         self.fingers_dict = FINGER_NAMES_TO_MOTOR_IDS
@@ -80,77 +137,52 @@ class Hand:
         self.init_pos = copy(self.tensioned_pos)
         self._commanded_pos = copy(self.tensioned_pos)
 
-        # Initialization settings of dxl_client
-        self.dxl_client.sync_write(
-            motors,
-            np.ones(len(motors)) * self.operating_mode,
-            ADDR_OPERATING_MODE,
-            LEN_OPERATING_MODE,
-        )  # Set all motors to current-based position control mode
-        self.dxl_client.sync_write(
-            motors,
-            np.ones(len(motors)) * self.temp_lim,
-            ADDR_TEMP_LIMIT,
-            LEN_TEMP_LIMIT,
-        )  # Set Temp limit
-        self.dxl_client.sync_write(
-            motors,
-            np.ones(len(motors)) * self.curr_lim,
-            ADDR_CURRENT_LIMIT,
-            LEN_CURRENT_LIMIT,
-        )  # Set Current limit
-        self.dxl_client.sync_write(
-            FINGER_NAMES_TO_MOTOR_IDS["Thumb"],
-            np.ones(len(motors)) * 700,
-            ADDR_CURRENT_LIMIT,
-            LEN_CURRENT_LIMIT,
-        )  # Set thumb specific current limit
-        self.dxl_client.sync_write(
-            motors,
-            np.ones(len(motors)) * self.goal_velocity,
-            ADDR_GOAL_VELOCITY,
-            LEN_GOAL_VELOCITY,
-        )  # Set Goal Velocity
-
-        # PID Gains for DIP + PIP motors
-        self.dxl_client.sync_write(
-            self.DIP_PIP_motors,
-            np.ones(len(motors)) * DIP_PIP_P_GAIN,
-            ADDR_POSITION_P_GAIN,
-            LEN_POSITION_P_GAIN,
-        )  # Set P gain for DIP and PIP motors
-        self.dxl_client.sync_write(
-            self.DIP_PIP_motors,
-            np.ones(len(motors)) * DIP_PIP_I_GAIN,
-            ADDR_POSITION_I_GAIN,
-            LEN_POSITION_I_GAIN,
-        )  # Set I gain for DIP and PIP motors
-        self.dxl_client.sync_write(
-            self.DIP_PIP_motors,
-            np.ones(len(motors)) * DIP_PIP_D_GAIN,
-            ADDR_POSITION_D_GAIN,
-            LEN_POSITION_D_GAIN,
-        )  # Set D gain for DIP and PIP motors
-
-        # PID Gains for MCP motors
-        self.dxl_client.sync_write(
-            self.MCP_motors,
-            np.ones(len(motors)) * MCP_P_GAIN,
-            ADDR_POSITION_P_GAIN,
-            LEN_POSITION_P_GAIN,
-        )  # Set P gain for MCP motors
-        self.dxl_client.sync_write(
-            self.MCP_motors,
-            np.ones(len(motors)) * MCP_I_GAIN,
-            ADDR_POSITION_I_GAIN,
-            LEN_POSITION_I_GAIN,
-        )  # Set I gain for MCP motors
-        self.dxl_client.sync_write(
-            self.MCP_motors,
-            np.ones(len(motors)) * MCP_D_GAIN,
-            ADDR_POSITION_D_GAIN,
-            LEN_POSITION_D_GAIN,
-        )  # Set D gain for MCP motors
+        # Goals are clamped to the calibrated limits and, if max_goal_step is
+        # given, moved by at most max_goal_step ticks (scalar or per motor)
+        # per goal, see _limit_goal. All buffers are preallocated so limiting
+        # a goal does not allocate.
+        self.enforce_limits = enforce_limits
+        self.max_goal_step = (
+            None
+            if max_goal_step is None
+            else np.broadcast_to(
+                np.asarray(max_goal_step, dtype=np.float64), (len(motors),)
+            )
+        )
+        self.goal_min = np.minimum(self.min_lim, self.max_lim).astype(np.float64)
+        self.goal_max = np.maximum(self.min_lim, self.max_lim).astype(np.float64)
+        self.saturation_counts = np.zeros(len(motors), dtype=np.int64)
+        self.slew_limited_counts = np.zeros(len(motors), dtype=np.int64)
+        self._goal = np.zeros(len(motors))
+        self._goal_step = np.zeros(len(motors))
+        self._last_goal = None
+        self._limited = np.zeros(len(motors), dtype=bool)
+        self._limited_high = np.zeros(len(motors), dtype=bool)
+
+        # Goals are only written to the motors whose goal moved by more than
+        # goal_deadband ticks (scalar or per motor), and to all motors every
+        # goal_refresh_period seconds
+        self.goal_deadband = np.broadcast_to(goal_deadband, (len(motors),))
+        self.goal_refresh_period = goal_refresh_period
+        self._written_goal = None
+        self._last_goal_refresh = 0.0
+
+        # Position and state reads are retried for read_deadline seconds, then
+        # motors that still did not reply get their last good value and are
+        # flagged in self.stale. Motors that never replied are also flagged in
+        # self.unread and get NaN positions.
+        self.read_deadline = read_deadline
+        self.read_retry_interval = 0.001
+        self.stale = np.zeros(len(motors), dtype=bool)
+        self.unread = np.zeros(len(motors), dtype=bool)
+        self.stale_counts = np.zeros(len(motors), dtype=np.int64)
+        self.deadline_misses = 0
+        # Read name -> (last good values, mask of the motors that have one)
+        self._last_good = {}
+
+        # Initialization settings of dxl_client, only the values that differ
+        # from the ones already on the motors are written
+        self.dxl_client.apply_config(self.motor_config())
 
         # Enable Torque
         self.dxl_client.set_torque_enabled(True, -1, 0.05)
@@ -162,22 +194,226 @@ class Hand:
             "commanded_hand_state": self.get_commanded_hand_state,
         }
 
+        # Goal currents are derated and hot fingers paused before the motors
+        # shut down on overheating, see ThermalMonitor
+        self.thermal = ThermalMonitor(self) if thermal_monitor else None
+
+        # Every state read is published to shared memory for recorders and
+        # monitors in other processes, see SharedStateRing
+        self.state_ring = None
+        if publish_state:
+            self.state_ring = SharedStateRing(
+                SHARED_STATE_NAMES[hand_type], num_motors=len(motors), create=True
+            )
+
+        # Optional background thread owning the bus, see start_io_thread
+        self.io_thread = None
+        if io_frequency is not None:
+            self.start_io_thread(io_frequency)
+
+    def motor_config(self):
+        """Returns the RegisterSettings applied to the motors on startup."""
+        # FINGER_NAMES_TO_MOTOR_IDS holds indices, motor IDs start at 1
+        thumb_motors = [index + 1 for index in self.fingers_dict["Thumb"]]
+        return [
+            # Current-based position control mode
+            RegisterSetting(
+                self.motors,
+                ADDR_OPERATING_MODE,
+                LEN_OPERATING_MODE,
+                self.operating_mode,
+            ),
+            RegisterSetting(
+                self.motors, ADDR_TEMP_LIMIT, LEN_TEMP_LIMIT, self.temp_lim
+            ),
+            RegisterSetting(
+                self.motors, ADDR_CURRENT_LIMIT, LEN_CURRENT_LIMIT, self.curr_lim
+            ),
+            # Thumb specific current limit
+            RegisterSetting(thumb_motors, ADDR_CURRENT_LIMIT, LEN_CURRENT_LIMIT, 700),
+            RegisterSetting(
+                self.motors, ADDR_GOAL_VELOCITY, LEN_GOAL_VELOCITY, self.goal_velocity
+            ),
+            # Goals are followed without a profile, except in set_pos_profiled
+            RegisterSetting(
+                self.motors, ADDR_PROFILE_ACCELERATION, LEN_PROFILE_ACCELERATION, 0
+            ),
+            RegisterSetting(
+                self.motors, ADDR_PROFILE_VELOCITY, LEN_PROFILE_VELOCITY, 0
+            ),
+            # PID Gains for DIP + PIP motors
+            RegisterSetting(
+                self.DIP_PIP_motors,
+                ADDR_POSITION_P_GAIN,
+                LEN_POSITION_P_GAIN,
+                DIP_PIP_P_GAIN,
+            ),
+            RegisterSetting(
+                self.DIP_PIP_motors,
+                ADDR_POSITION_I_GAIN,
+                LEN_POSITION_I_GAIN,
+                DIP_PIP_I_GAIN,
+            ),
+            RegisterSetting(
+                self.DIP_PIP_motors,
+                ADDR_POSITION_D_GAIN,
+                LEN_POSITION_D_GAIN,
+                DIP_PIP_D_GAIN,
+            ),
+            # PID Gains for MCP motors
+            RegisterSetting(
+                self.MCP_motors, ADDR_POSITION_P_GAIN, LEN_POSITION_P_GAIN, MCP_P_GAIN
+            ),
+            RegisterSetting(
+                self.MCP_motors, ADDR_POSITION_I_GAIN, LEN_POSITION_I_GAIN, MCP_I_GAIN
+            ),
+            RegisterSetting(
+                self.MCP_motors, ADDR_POSITION_D_GAIN, LEN_POSITION_D_GAIN, MCP_D_GAIN
+            ),
+        ]
+
+    def start_io_thread(self, frequency=200):
+        """Moves bus I/O to a background thread polling at the given frequency.
+
+        Afterwards reads return the latest snapshot and goal writes are applied
+        on the next cycle, so callers never block on the serial port. Returns
+        once the thread read the first state, motors that did not reply being
+        flagged in self.stale.
+        """
+        if self.io_thread is not None:
+            return
+        io_thread = HandIOThread(
+            self.dxl_client,
+            frequency,
+            write_goal=self._write_goal,
+            state_ring=self.state_ring,
+            observe_state=self._observe_state,
+            read_state=self._read_bounded_state,
+        )
+        io_thread.start()
+        if not io_thread.wait_for_state(timeout=1.0):
+            io_thread.stop()
+            raise OSError("Hand I/O thread could not read a state.")
+        self.io_thread = io_thread
+
+    def stop_io_thread(self):
+        if self.io_thread is None:
+            return
+        self.io_thread.stop()
+        self.io_thread = None
+
     def close(self):
+        self.stop_io_thread()
         self.dxl_client.disconnect()
+        if self.state_ring is not None:
+            self.state_ring.close()
+            self.state_ring = None
+
+    # latest state snapshot of the I/O thread and the time it was read at, a
+    # state read right away without the I/O thread
+    def latest_state(self):
+        if self.io_thread is None:
+            return self.read_state(), time.time()
+        state, timestamp, _ = self.io_thread.latest_state()
+        return state, timestamp
+
+    # goal applied by the I/O thread on its next cycle, written right away
+    # without the I/O thread
+    def submit_goal(self, pos):
+        self.set_pos(pos)
 
     # read any given address for the given motors
     def read_any(self, addr: int, size: int):
         return self.dxl_client.sync_read(self.motors, addr, size)
 
+    # read registers by name, e.g. "Present Current", in one transaction
+    def read_registers(self, names, scaled=False):
+        return self.dxl_client.read_registers(names, scaled=scaled)
+
     # read position
     def read_pos(self):
         # print(f"in read_pos")
-        curr_pos = self.dxl_client.read_pos()
-        while curr_pos is None:
-            curr_pos = self.dxl_client.read_pos()
-            time.sleep(0.001)
+        if self.io_thread is not None:
+            return self._state_positions(self.latest_state()[0]).tolist()
+        if self.thermal is not None and self.thermal.due():
+            # The thermal monitor samples a full state read in place of every
+            # few position reads
+            state = self._read_state()
+            self.thermal.update(state, time.time())
+            return self._state_positions(state).tolist()
+        return self._read_bounded(
+            "read_pos", self._read_pos_partial, missing_value=np.nan
+        ).tolist()
+
+    def _read_pos_partial(self):
+        pos = self.dxl_client.read_pos()
+        received = np.array([value is not None for value in pos])
+        return (
+            np.array(
+                [np.nan if value is None else value for value in pos],
+                dtype=np.float64,
+            ),
+            received,
+        )
 
-        return curr_pos
+    # positions of a state read, NaN for the motors that never replied
+    def _state_positions(self, state):
+        pos = state["position"].astype(np.float64)
+        pos[self.unread] = np.nan
+        return pos
+
+    def _read_bounded(self, name, read, missing_value=0):
+        """Retries a partial read until every motor replied or the deadline.
+
+        Retries back off from read_retry_interval and stop at read_deadline,
+        or once only quarantined motors are missing, as those are not read.
+        Missing motors get their last good value and are flagged in
+        self.stale. Motors without a good value get missing_value and are
+        also flagged in self.unread.
+
+        Args:
+            name: Name of the read, e.g. "read_pos", for the last good values
+                and retry counters.
+            read: Returns the values of all motors and a mask of the motors
+                that replied, e.g. DynamixelClient.read_state_partial.
+            missing_value: Value of the motors without a good value.
+        """
+        deadline = time.perf_counter() + self.read_deadline
+        values, received = read()
+        if name not in self._last_good:
+            last_good = np.empty_like(values)
+            last_good[...] = missing_value
+            self._last_good[name] = (last_good, np.zeros(len(self.motors), bool))
+        last_good, has_good = self._last_good[name]
+
+        retry_interval = self.read_retry_interval
+        while not received.all():
+            quarantined = self.dxl_client.quarantined
+            if all(
+                motor in quarantined
+                for motor, motor_received in zip(self.motors, received)
+                if not motor_received
+            ):
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(retry_interval, remaining))
+            retry_interval *= 2
+            self.dxl_client.record_retry(name)
+            retry_values, retry_received = read()
+            values[retry_received] = retry_values[retry_received]
+            received |= retry_received
+
+        self.stale = ~received
+        if self.stale.any():
+            values[self.stale] = last_good[self.stale]
+            self.stale_counts[self.stale] += 1
+            self.deadline_misses += 1
+        last_good[received] = values[received]
+        has_good |= received
+        self.unread = ~has_good
+        return values
 
     # read velocity
     def read_vel(self):
@@ -190,12 +426,158 @@ class Hand:
 
     # set pose
     def set_pos(self, pos):
+        if self.io_thread is not None:
+            self._commanded_pos = pos
+            self.io_thread.submit_goal(self._limit_goal(pos))
+            return
         self._commanded_pos = pos
-        self.dxl_client.set_pos(pos)
+        self._write_goal(self._limit_goal(pos))
         return
 
+    def _limit_goal(self, pos, slew=True):
+        """Clamps pos in place of a preallocated buffer and returns it.
+
+        Goals are clamped to [goal_min, goal_max] and, with max_goal_step and
+        slew, to max_goal_step ticks from the previous goal. How often each
+        motor was limited is counted in saturation_counts and
+        slew_limited_counts.
+        """
+        goal = self._goal
+        goal[:] = pos
+        # Goals computed from unread (NaN) positions hold the last goal
+        unread = np.isnan(goal)
+        if unread.any():
+            goal[unread] = (
+                self.init_pos if self._written_goal is None else self._written_goal
+            )[unread]
+        if not self.enforce_limits:
+            return goal
+
+        np.less(goal, self.goal_min, out=self._limited)
+        np.greater(goal, self.goal_max, out=self._limited_high)
+        np.logical_or(self._limited, self._limited_high, out=self._limited)
+        self.saturation_counts += self._limited
+        np.clip(goal, self.goal_min, self.goal_max, out=goal)
+
+        if self.max_goal_step is not None:
+            if self._last_goal is None:
+                self._last_goal = np.array(self.read_pos(), dtype=np.float64)
+                unread = np.isnan(self._last_goal)
+                self._last_goal[unread] = goal[unread]
+            if slew:
+                step = self._goal_step
+                np.subtract(goal, self._last_goal, out=step)
+                np.abs(step, out=step)
+                np.greater(step, self.max_goal_step, out=self._limited)
+                self.slew_limited_counts += self._limited
+                np.subtract(self._last_goal, self.max_goal_step, out=step)
+                np.maximum(goal, step, out=goal)
+                np.add(self._last_goal, self.max_goal_step, out=step)
+                np.minimum(goal, step, out=goal)
+            self._last_goal[:] = goal
+        return goal
+
+    # move to pos in duration seconds with the motion profile of the motor
+    # firmware, so that all motors arrive together, returns the duration
+    def set_pos_profiled(self, pos, duration, accel_fraction=0.25, curr_pos=None):
+        if curr_pos is None:
+            curr_pos = self.read_pos()
+        # The firmware profile bounds the velocity, so only the limits apply
+        goal = self._limit_goal(pos, slew=False)
+        if self.thermal is not None:
+            goal = self.thermal.filter_goal(goal)
+        goal = np.trunc(goal)
+        # Unread (NaN) motors have no distance to go
+        curr_pos = np.asarray(curr_pos, dtype=np.float64)
+        curr_pos = np.where(np.isnan(curr_pos), goal, curr_pos)
+        acceleration, velocity, duration = synchronized_profile(
+            curr_pos, goal, duration, accel_fraction
+        )
+        # Profile Acceleration, Profile Velocity and Goal Position are adjacent
+        # registers, so the whole move is a single Sync Write
+        self.dxl_client.sync_write(
+            self.motors,
+            [
+                int(motor_acceleration)
+                | int(motor_velocity) << 32
+                | (int(motor_goal) & 0xFFFFFFFF) << 64
+                for motor_acceleration, motor_velocity, motor_goal in zip(
+                    acceleration, velocity, goal
+                )
+            ],
+            ADDR_PROFILE_ACCELERATION,
+            LEN_PROFILE_ACCELERATION + LEN_PROFILE_VELOCITY + LEN_GOAL_POSITION,
+        )
+        self._commanded_pos = pos
+        self._written_goal = goal
+        self._last_goal_refresh = time.monotonic()
+        return duration
+
+    # go back to following goals without a profile after set_pos_profiled
+    def clear_profile(self):
+        self.dxl_client.sync_write(
+            self.motors,
+            [0] * len(self.motors),
+            ADDR_PROFILE_ACCELERATION,
+            LEN_PROFILE_ACCELERATION + LEN_PROFILE_VELOCITY,
+        )
+
+    def _write_goal(self, pos):
+        if self.thermal is not None:
+            pos = self.thermal.filter_goal(pos)
+        # Goal registers hold integers, so compare the truncated goals
+        goal = np.trunc(np.asarray(pos, dtype=np.float64))
+        now = time.monotonic()
+        if (
+            self._written_goal is None
+            or now - self._last_goal_refresh >= self.goal_refresh_period
+        ):
+            self.dxl_client.set_pos(goal)
+            self._written_goal = goal
+            self._last_goal_refresh = now
+            return
+
+        changed = np.abs(goal - self._written_goal) > self.goal_deadband
+        if not changed.any():
+            return
+        self.dxl_client.sync_write(
+            [
+                motor
+                for motor, motor_changed in zip(self.motors, changed)
+                if motor_changed
+            ],
+            goal[changed],
+            ADDR_GOAL_POSITION,
+            LEN_GOAL_POSITION,
+        )
+        self._written_goal[changed] = goal[changed]
+
     def read_temp(self):
-        self.dxl_client.sync_read(self.motors, 146, 1)
+        return self.dxl_client.sync_read(
+            self.motors, ADDR_PRESENT_TEMP, LEN_PRESENT_TEMP
+        )
+
+    # read position, velocity, current, temperature and hardware error at once
+    def read_state(self):
+        if self.io_thread is not None:
+            return self.latest_state()[0]
+        state = self._read_state()
+        self._observe_state(state, time.time())
+        return state
+
+    def _read_bounded_state(self):
+        return self._read_bounded("read_state", self.dxl_client.read_state_partial)
+
+    def _read_state(self):
+        state = self._read_bounded_state()
+        if self.state_ring is not None:
+            self.state_ring.publish(state, time.time(), self._commanded_pos)
+        return state
+
+    # passes every decimation-th state read to the thermal monitor
+    def _observe_state(self, state, timestamp):
+        if self.thermal is not None and self.thermal.due():
+            self.thermal.update(state, timestamp)
 
     @property
     def commanded_pos(self):
@@ -203,18 +585,18 @@ class Hand:
 
     @property
     def actual_pos(self):
-        pos = self.read_pos()
-        while any(item is None for item in pos):
-            pos = self.read_pos()
-            time.sleep(0.0001)
-        return pos
+        return self.read_pos()
 
     def get_hand_state(self):
 
+        state = self.read_state()
         motor_state = dict(
-            position=np.array(self.actual_pos, dtype=np.float32),
+            position=state["position"].astype(np.float32),
             commanded_position=np.array(self.commanded_pos, dtype=np.float32),
-            velocity=np.array(self.read_vel(), dtype=np.float32),
+            velocity=state["velocity"].astype(np.float32),
+            current=state["current"].astype(np.float32),
+            temperature=state["temperature"].astype(np.float32),
+            hardware_error=state["hardware_error"],
             timestamp=time.time(),
         )
         return motor_state
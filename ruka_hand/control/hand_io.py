@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+from ruka_hand.utils.dynamixel_util import STATE_DTYPE
+
+
+class StateDoubleBuffer:
+    """Lock-free double buffer holding the latest motor state snapshot.
+
+    A single writer fills the back slot and publishes it by incrementing the
+    sequence number, which flips the front slot. Readers copy the front slot
+    and retry if a publish happened during the copy, so the writer never
+    waits on them.
+    """
+
+    def __init__(self, num_motors):
+        self._states = [np.zeros(num_motors, dtype=STATE_DTYPE) for _ in range(2)]
+        self._timestamps = [0.0, 0.0]
+        self._sequence = 0
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    def publish(self, state, timestamp):
+        back = (self._sequence + 1) % 2
+        self._states[back][:] = state
+        self._timestamps[back] = timestamp
+        self._sequence += 1
+
+    def read(self):
+        """Returns a copy of the latest state, its timestamp and sequence."""
+        while True:
+            sequence = self._sequence
+            front = sequence % 2
+            state = self._states[front].copy()
+            timestamp = self._timestamps[front]
+            # The writer only reuses this slot after the next publish
+            if self._sequence == sequence:
+                return state, timestamp, sequence
+
+
+class HandIOThread(threading.Thread):
+    """Thread owning the bus of a hand.
+
+    Every cycle it writes the most recently submitted goal, if there is a new
+    one, and then reads the full motor state into a StateDoubleBuffer and, if
+    given, publishes it to a SharedStateRing for other processes and passes it
+    to observe_state, e.g. Hand._observe_state. The buffer holds zeros until
+    the first state is read, see wait_for_state.
+    """
+
+    def __init__(
+        self,
+        dxl_client,
+        frequency,
+        write_goal=None,
+        state_ring=None,
+        observe_state=None,
+        read_state=None,
+    ):
+        super().__init__(daemon=True)
+        self.dxl_client = dxl_client
+        # Writes a goal to the motors, e.g. Hand._write_goal
+        self.write_goal = write_goal if write_goal is not None else dxl_client.set_pos
+        # Reads the state of all motors, e.g. Hand._read_bounded_state, which
+        # keeps publishing when some motors do not reply
+        self.read_state = (
+            read_state if read_state is not None else dxl_client.read_state
+        )
+        self.period = 1.0 / frequency
+        self.state_buffer = StateDoubleBuffer(len(dxl_client.motor_ids))
+        self.state_ring = state_ring
+        self.observe_state = observe_state
+
+        # (sequence, goal) pair, replaced as a whole so the swap is atomic
+        self._goal = (0, None)
+        self._written_goal_sequence = 0
+        self._stop_event = threading.Event()
+        self._first_state = threading.Event()
+
+    def submit_goal(self, goal):
+        self._goal = (self._goal[0] + 1, np.array(goal, dtype=np.float64))
+
+    def latest_state(self):
+        return self.state_buffer.read()
+
+    def wait_for_state(self, timeout=None):
+        return self._first_state.wait(timeout)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def _cycle(self):
+        goal_sequence, goal = self._goal
+        if goal_sequence != self._written_goal_sequence:
+            self.write_goal(goal)
+            self._written_goal_sequence = goal_sequence
+
+        state = self.read_state()
+        if state is not None:
+            timestamp = time.time()
+            self.state_buffer.publish(state, timestamp)
+            if self.state_ring is not None:
+                self.state_ring.publish(state, timestamp, goal)
+            if self.observe_state is not None:
+                self.observe_state(state, timestamp)
+            self._first_state.set()
+
+    def run(self):
+        next_cycle = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self._cycle()
+            except Exception as e:
+                logging.error("Hand I/O cycle failed: %s", e)
+
+            # Sleep instead of spinning so the control thread keeps the GIL
+            next_cycle += self.period
+            wait_time = next_cycle - time.perf_counter()
+            if wait_time > 0:
+                self._stop_event.wait(wait_time)
+            else:
+                next_cycle = time.perf_counter()
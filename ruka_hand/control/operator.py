@@ -16,6 +16,10 @@ class RUKAOperator:
         joint_angle_overshoot_ratio=0,
         record=False,
         data_save_dir=None,
+        io_frequency=None,
+        inference_backend="eager",
+        num_threads=None,
+        hand_options=None,
     ):
 
         self.hand_type = hand_type
@@ -30,6 +34,10 @@ class RUKAOperator:
             single_move_len=1,
             record=record,
             data_save_dir=data_save_dir,
+            io_frequency=io_frequency,
+            inference_backend=inference_backend,
+            num_threads=num_threads,
+            hand_options=hand_options,
         )
 
         self.fingertip_overshoot_ratio = fingertip_overshoot_ratio
@@ -123,11 +131,17 @@ class RUKAOperator:
             host=HOST, port=self.stream_port, topic="keypoints"
         )
 
+    def _recv_keypoints(self, flip_x_axis=False, flags=None):
+        # flags=zmq.NOBLOCK returns None if no new keypoints arrived
+        keypoints = self.keypoints_subscriber.recv(flags)
+        if keypoints is not None and flip_x_axis:
+            # This is only used in robot_to_robot teleop
+            keypoints[:, :, 0] = -keypoints[:, :, 0]
+        return keypoints
+
     def _get_model_input(self, flip_x_axis=False):
 
-        keypoints = self.keypoints_subscriber.recv()
-        if flip_x_axis:  # This is only used in robot_to_robot teleop
-            keypoints[:, :, 0] = -keypoints[:, :, 0]
+        keypoints = self._recv_keypoints(flip_x_axis)
         print(f"keypoints.shape: {keypoints.shape}")
 
         fingertips = calculate_fingertips(keypoints)
@@ -143,17 +157,23 @@ class RUKAOperator:
             input_type=self.controller.input_type,
         )
 
-    def step(self, keypoints):
+    def _keypoints_to_input(self, keypoints):
+        # Returns None for keypoints with NaN values
         fingertips = calculate_fingertips(keypoints)
         joint_angles = calculate_joint_angles(keypoints)
         if np.isnan(joint_angles).any() or np.isnan(fingertips).any():
             print("NAN values inputted skipping")
-            return
-        model_input = self._handle_input_type(
+            return None
+        return self._handle_input_type(
             fingertips=fingertips,
             joint_angles=joint_angles,
             input_type=self.controller.input_type,
         )
+
+    def step(self, keypoints):
+        model_input = self._keypoints_to_input(keypoints)
+        if model_input is None:
+            return
         self.controller.step(
             input_data=model_input,
             moving_average_info={
@@ -0,0 +1,223 @@
+import logging
+import math
+
+import numpy as np
+
+from ruka_hand.utils.dynamixel_util import ADDR_GOAL_CURRENT, LEN_GOAL_CURRENT
+
+
+class ThermalMonitor:
+    """Watches motor temperatures and currents and derates them before a
+    hardware shutdown.
+
+    Every decimation-th state read of the hand, see due(), is folded into per motor
+    exponential moving averages of temperature, temperature slope and
+    absolute current. From these the temperature horizon seconds ahead is
+    predicted:
+
+    - Once the prediction passes temp_lim - derate_margin, the Goal Current of
+      the motor is lowered linearly down to min_current_scale of the current
+      limit at temp_lim - pause_margin.
+    - Once the temperature itself reaches temp_lim - pause_margin, the finger
+      of the motor is paused in its tensioned, unloaded position until it has
+      cooled below temp_lim - derate_margin.
+
+    Args:
+        hand: The Hand to watch, its goals pass through filter_goal().
+        decimation: Only every decimation-th state read is sampled.
+        temperature_time_constant: Smoothing of the temperature in seconds.
+        slope_time_constant: Smoothing of the temperature slope in seconds.
+        current_time_constant: Smoothing of the current in seconds.
+        horizon: How far ahead the temperature is predicted, in seconds.
+        derate_margin: Degrees below temp_lim where derating starts.
+        pause_margin: Degrees below temp_lim where fingers are paused.
+        min_current_scale: Lowest fraction of the current limit derated to.
+        current_step: Goal currents are only rewritten when their scale
+            changes by this much, keeping the bus traffic negligible.
+        refresh_period: Derated goal currents are rewritten every
+            refresh_period seconds, as a reboot of the motor resets them.
+    """
+
+    def __init__(
+        self,
+        hand,
+        decimation=10,
+        temperature_time_constant=1.0,
+        slope_time_constant=10.0,
+        current_time_constant=2.0,
+        horizon=60.0,
+        derate_margin=10,
+        pause_margin=3,
+        min_current_scale=0.4,
+        current_step=0.1,
+        refresh_period=1.0,
+    ):
+        self.hand = hand
+        self.decimation = decimation
+        self.temperature_time_constant = temperature_time_constant
+        self.slope_time_constant = slope_time_constant
+        self.current_time_constant = current_time_constant
+        self.horizon = horizon
+        self.derate_margin = derate_margin
+        self.pause_margin = pause_margin
+        self.min_current_scale = min_current_scale
+        self.current_step = current_step
+        self.refresh_period = refresh_period
+
+        num_motors = len(hand.motors)
+        self.temperature = None
+        self.slope = np.zeros(num_motors)
+        self.current = np.zeros(num_motors)
+        self.max_temperature = np.zeros(num_motors)
+        self.current_scale = np.ones(num_motors)
+        self.paused = np.zeros(num_motors, dtype=bool)
+        self._reads = 0
+        self._last_timestamp = None
+        self._last_current_refresh = 0.0
+
+        # Motor indices of each finger, a hot motor pauses its whole finger
+        self._finger_of_motor = np.zeros(num_motors, dtype=np.int64)
+        self._finger_names = list(hand.fingers_dict.keys())
+        for finger, motor_indices in enumerate(hand.fingers_dict.values()):
+            self._finger_of_motor[motor_indices] = finger
+
+    @property
+    def temperature_limit(self):
+        return self.hand.temp_lim
+
+    def predicted_temperature(self):
+        return self.temperature + np.maximum(self.slope, 0) * self.horizon
+
+    def due(self):
+        """Counts a state read, returns True for the ones to pass to update()."""
+        self._reads += 1
+        return self._reads % self.decimation == 0
+
+    def update(self, state, timestamp):
+        """Folds a state read into the statistics, see the class docstring."""
+        temperature = state["temperature"].astype(np.float64)
+        current = np.abs(state["current"].astype(np.float64))
+        if self.temperature is None:
+            self.temperature = temperature
+            self.current = current
+            self.max_temperature = temperature.copy()
+            self._last_timestamp = timestamp
+            return
+
+        dt = timestamp - self._last_timestamp
+        if dt <= 0:
+            return
+        self._last_timestamp = timestamp
+
+        previous = self.temperature
+        self.temperature = previous + self._alpha(
+            dt, self.temperature_time_constant
+        ) * (temperature - previous)
+        self.slope += self._alpha(dt, self.slope_time_constant) * (
+            (self.temperature - previous) / dt - self.slope
+        )
+        self.current += self._alpha(dt, self.current_time_constant) * (
+            current - self.current
+        )
+        np.maximum(self.max_temperature, temperature, out=self.max_temperature)
+
+        self._derate(timestamp)
+        self._update_paused(temperature)
+
+    @staticmethod
+    def _alpha(dt, time_constant):
+        return 1.0 - math.exp(-dt / time_constant)
+
+    def _derate(self, timestamp):
+        derate_start = self.temperature_limit - self.derate_margin
+        derate_end = self.temperature_limit - self.pause_margin
+        progress = np.clip(
+            (self.predicted_temperature() - derate_start) / (derate_end - derate_start),
+            0,
+            1,
+        )
+        raw_scale = 1 - progress * (1 - self.min_current_scale)
+        # Quantize so that noise does not cause a write on every sample, and
+        # only raise the current again with half a step of hysteresis
+        scale = np.maximum(
+            np.floor(raw_scale / self.current_step + 1e-9) * self.current_step,
+            self.min_current_scale,
+        )
+        hold = (scale > self.current_scale) & (
+            raw_scale < scale + self.current_step / 2
+        )
+        scale[hold] = self.current_scale[hold]
+        changed = np.abs(scale - self.current_scale) > 1e-6
+        if timestamp - self._last_current_refresh >= self.refresh_period:
+            self._last_current_refresh = timestamp
+            changed |= scale < 1
+        if not changed.any():
+            return
+
+        motor_ids = [
+            motor
+            for motor, motor_changed in zip(self.hand.motors, changed)
+            if motor_changed
+        ]
+        if np.any(scale[changed] != self.current_scale[changed]):
+            logging.warning(
+                "Goal current of Dynamixel %s derated to %s of the limit",
+                motor_ids,
+                np.round(scale[changed], 2).tolist(),
+            )
+        self.current_scale = scale
+        self.hand.dxl_client.sync_write(
+            motor_ids,
+            np.round(self.hand.curr_lim * scale[changed]),
+            ADDR_GOAL_CURRENT,
+            LEN_GOAL_CURRENT,
+        )
+
+    def _update_paused(self, temperature):
+        hot_fingers = set(
+            self._finger_of_motor[
+                temperature >= self.temperature_limit - self.pause_margin
+            ]
+        )
+        cool_fingers = set(range(len(self._finger_names))) - set(
+            self._finger_of_motor[
+                self.temperature > self.temperature_limit - self.derate_margin
+            ]
+        )
+        paused = self.paused.copy()
+        for finger in hot_fingers:
+            paused[self._finger_of_motor == finger] = True
+        for finger in cool_fingers:
+            paused[self._finger_of_motor == finger] = False
+
+        for finger in set(self._finger_of_motor[paused & ~self.paused]):
+            logging.warning(
+                "Pausing %s to cool down, temperatures: %s",
+                self._finger_names[finger],
+                temperature[self._finger_of_motor == finger].tolist(),
+            )
+        for finger in set(self._finger_of_motor[self.paused & ~paused]):
+            logging.warning("Resuming %s", self._finger_names[finger])
+        self.paused = paused
+
+    def filter_goal(self, goal):
+        """Replaces the goals of paused fingers with their tensioned position."""
+        if not self.paused.any():
+            return goal
+        goal = np.array(goal, dtype=np.float64)
+        goal[self.paused] = self.hand.tensioned_pos[self.paused]
+        return goal
+
+    def stats(self):
+        """Returns the rolling statistics of every motor."""
+        return dict(
+            temperature=None if self.temperature is None else self.temperature.copy(),
+            temperature_slope=self.slope.copy(),
+            predicted_temperature=(
+                None if self.temperature is None else self.predicted_temperature()
+            ),
+            max_temperature=self.max_temperature.copy(),
+            current=self.current.copy(),
+            current_scale=self.current_scale.copy(),
+            paused=self.paused.copy(),
+        )
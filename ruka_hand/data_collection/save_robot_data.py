@@ -9,13 +9,21 @@ from tqdm import tqdm
 
 from ruka_hand.control.hand import Hand
 from ruka_hand.data_collection.recorder import Recorder
-from ruka_hand.utils.extract_control_table import df_controlTable
 from ruka_hand.utils.timer import FrequencyTimer
+from ruka_hand.utils.trajectory import profile_position
 from ruka_hand.utils.vectorops import *
 
 
 class RUKADataCollector(Recorder):
-    def __init__(self, num_intervals, wait_period, frequency, hand_type, data_save_dir):
+    def __init__(
+        self,
+        num_intervals,
+        wait_period,
+        frequency,
+        hand_type,
+        data_save_dir,
+        profiled_moves=False,
+    ):
         self.hand = Hand(hand_type)
         self.hand_pos = copy(self.hand.tensioned_pos)
         self.data_save_dir = data_save_dir
@@ -26,6 +34,9 @@ class RUKADataCollector(Recorder):
         self.frequency = frequency
         self.num_intervals = num_intervals
         self.wait_period = wait_period
+        # Multi-step moves are a single goal write with the motion profile of
+        # the motors instead of one write per interpolated step
+        self.profiled_moves = profiled_moves
 
         self._recorder_file_name = f"{self.data_save_dir}/ruka_data.h5"
         self.ruka_data = dict()
@@ -45,12 +56,10 @@ class RUKADataCollector(Recorder):
 
     def _update_ruka_data(self, commanded_position):
         curr_data = dict()
+        # All registers are read with a single bulk read
+        registers = self.hand.read_registers(list(self._data_names.values()))
         for key, value in self._data_names.items():
-            row = df_controlTable[df_controlTable["Data Name"] == value]
-            addr = int(row["Address"].values[0])
-            size = int(row["Size(Byte)"].values[0])
-            data = self.hand.read_any(addr, size)
-            curr_data[key] = np.array(data)
+            curr_data[key] = np.array(registers[value])
             if key == "present_position":
                 curr_data["timestamp"] = (
                     time.time()
@@ -80,6 +89,10 @@ class RUKADataCollector(Recorder):
             self._update_ruka_data(commanded_position=des_pos)
             return
 
+        if self.profiled_moves:
+            self._move_to_pos_profiled(curr_pos, des_pos, traj_len)
+            return
+
         if traj_len == 1:
             trajectory = [des_pos]
         else:
@@ -97,6 +110,26 @@ class RUKADataCollector(Recorder):
 
             self.timer.end_loop()
 
+    def _move_to_pos_profiled(self, curr_pos, des_pos, traj_len):
+        duration = self.hand.set_pos_profiled(
+            des_pos, (traj_len - 1) / self.frequency, curr_pos=curr_pos
+        )
+        self.hand_pos = des_pos
+
+        # The timer only paces the recording, the motors move on their own
+        start = time.monotonic()
+        elapsed = 0.0
+        while elapsed < duration:
+            self.timer.start_loop()
+            self._update_ruka_data(
+                commanded_position=profile_position(
+                    curr_pos, des_pos, elapsed, duration
+                )
+            )
+            self.timer.end_loop()
+            elapsed = time.monotonic() - start
+        self.hand.clear_profile()
+
     def wait(self):
 
         if self.wait_period == -1:
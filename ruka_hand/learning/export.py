@@ -0,0 +1,146 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+from omegaconf import OmegaConf
+
+from ruka_hand.utils.initialize_learner import init_learner
+
+# Export format -> file extension of the exported graph
+EXPORT_FORMATS = dict(torchscript="pt", onnx="onnx")
+
+
+class EncoderDecoder(nn.Module):
+    # The encoder and decoder of a LSTMMLPEncDec as a single module to export
+    def __init__(self, learner):
+        super().__init__()
+        self.encoder = learner.encoder
+        self.decoder = learner.decoder
+
+    def forward(self, input_data):
+        return self.decoder(self.encoder(input_data))
+
+
+def exported_model_path(model_path, model_type="best", export_format="torchscript"):
+    return os.path.join(
+        model_path, f"controller_{model_type}.{EXPORT_FORMATS[export_format]}"
+    )
+
+
+def load_learner(training_dir, model_type="best", device="cpu"):
+    """Loads the learner of a training directory and its training config."""
+    cfg = OmegaConf.load(os.path.join(training_dir, ".hydra/config.yaml"))
+    learner = init_learner(cfg=cfg, device=device)
+    learner.load(
+        Path(training_dir) / "models",
+        training_cfg=cfg,
+        model_type=model_type,
+        device=device,
+    )
+    learner.eval()
+    learner.to(device)
+    return learner, cfg
+
+
+def export_learner(training_dir, export_format="torchscript", model_type="best"):
+    """Exports the model_type checkpoint of a training directory.
+
+    The encoder and decoder are exported as one graph next to the checkpoint,
+    see exported_model_path, with a dynamic batch size and a fixed
+    obs_horizon. Learners without an obs_horizon take a single observation,
+    exported as a window of one. TorchScript graphs are frozen and optimized
+    for inference, ONNX graphs are optimized by onnxruntime when they are
+    loaded.
+
+    Returns:
+        The path of the exported graph.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {export_format}, "
+            f"expected one of {list(EXPORT_FORMATS)}"
+        )
+
+    learner, cfg = load_learner(training_dir, model_type=model_type)
+    module = EncoderDecoder(learner).eval()
+    obs_horizon = cfg.dataset.obs_horizon if "obs_horizon" in cfg.dataset else 1
+    example_input = torch.zeros(1, obs_horizon, cfg.net.input_dim)
+    path = exported_model_path(Path(training_dir) / "models", model_type, export_format)
+    with torch.no_grad():
+        if export_format == "torchscript":
+            traced = torch.jit.trace(module, example_input)
+            torch.jit.save(torch.jit.optimize_for_inference(traced), path)
+        else:
+            torch.onnx.export(
+                module,
+                example_input,
+                path,
+                input_names=["input"],
+                output_names=["output"],
+                dynamic_axes=dict(input={0: "batch"}, output={0: "batch"}),
+            )
+    return path
+
+
+class TorchScriptLearner:
+    """Runs an exported TorchScript graph like LSTMMLPEncDec.forward."""
+
+    def __init__(self, path):
+        self.device = "cpu"
+        self.module = torch.jit.load(path, map_location=self.device)
+        self.module.eval()
+
+    def forward(self, input_data):
+        input_data = input_data.to(self.device)
+        # A single observation or window becomes a batch of one window
+        while len(input_data.shape) < 3:
+            input_data = input_data.unsqueeze(0)
+        return self.module(input_data)
+
+
+class OnnxLearner:
+    """Runs an exported ONNX graph on onnxruntime like LSTMMLPEncDec.forward.
+
+    Args:
+        path: Path of the exported graph.
+        num_threads: Threads of the session, onnxruntime picks if None.
+    """
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            path, options, providers=["CPUExecutionProvider"]
+        )
+        self.device = "cpu"
+
+    def forward(self, input_data):
+        input_data = np.asarray(input_data, dtype=np.float32)
+        # A single observation or window becomes a batch of one window
+        while len(input_data.shape) < 3:
+            input_data = input_data[np.newaxis]
+        (output,) = self.session.run(["output"], dict(input=input_data))
+        return torch.from_numpy(output)
+
+
+def load_exported_learner(
+    model_path, model_type="best", export_format="torchscript", num_threads=None
+):
+    """Loads a graph exported with export_learner."""
+    path = exported_model_path(model_path, model_type, export_format)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} does not exist, export it with scripts/export_controller.py"
+        )
+    if export_format == "torchscript":
+        return TorchScriptLearner(path)
+    return OnnxLearner(path, num_threads=num_threads)
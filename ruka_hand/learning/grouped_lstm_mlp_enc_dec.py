@@ -0,0 +1,184 @@
+import torch
+import torch.nn as nn
+
+
+def _mlp_linears(net):
+    # Linear layers of an MLP in eval mode, with a ReLU between each
+    linears = []
+    for layer in net:
+        if isinstance(layer, nn.Linear):
+            linears.append(layer)
+        elif not isinstance(layer, (nn.ReLU, nn.Dropout)):
+            raise ValueError(f"Cannot group MLPs with {type(layer).__name__} layers")
+    return linears
+
+
+def _stack(tensors):
+    return torch.stack([tensor.detach() for tensor in tensors])
+
+
+class GroupedLSTMMLPEncDec(nn.Module):
+    """Runs the forward pass of several same shaped LSTMMLPEncDec learners at
+    once.
+
+    The weights of the learners are stacked along a leading group dimension,
+    so every layer of all learners is a single batched matrix multiplication
+    (torch.baddbmm) instead of one call per learner. Only meant for inference,
+    dropout is skipped as in eval mode.
+
+    Args:
+        learners: LSTMMLPEncDec learners with the same signature(), the
+            weights are copied so later changes to them are not picked up.
+    """
+
+    def __init__(self, learners):
+        super().__init__()
+        if len({self.signature(learner) for learner in learners}) != 1:
+            raise ValueError("Only learners with the same shapes can be grouped")
+
+        encoders = [learner.encoder for learner in learners]
+        decoders = [learner.decoder for learner in learners]
+        lstm = encoders[0].lstm
+        if lstm.bidirectional or lstm.proj_size > 0 or not lstm.batch_first:
+            raise ValueError("Only unidirectional batch first LSTMs can be grouped")
+
+        self.num_layers = lstm.num_layers
+        self.hidden_size = lstm.hidden_size
+        self.pred_horizon = decoders[0].pred_horizon
+
+        # Weights are stored transposed, as (group, in_features, out_features)
+        self.register_buffer(
+            "embed_weight", _stack([encoder.embed.weight.t() for encoder in encoders])
+        )
+        self.register_buffer(
+            "embed_bias",
+            _stack([encoder.embed.bias for encoder in encoders]).unsqueeze(1),
+        )
+        for layer in range(self.num_layers):
+            self.register_buffer(
+                f"weight_ih_l{layer}",
+                _stack(
+                    [
+                        getattr(encoder.lstm, f"weight_ih_l{layer}").t()
+                        for encoder in encoders
+                    ]
+                ),
+            )
+            self.register_buffer(
+                f"weight_hh_l{layer}",
+                _stack(
+                    [
+                        getattr(encoder.lstm, f"weight_hh_l{layer}").t()
+                        for encoder in encoders
+                    ]
+                ),
+            )
+            # Both biases are added to the same gates
+            self.register_buffer(
+                f"bias_l{layer}",
+                _stack(
+                    [
+                        getattr(encoder.lstm, f"bias_ih_l{layer}")
+                        + getattr(encoder.lstm, f"bias_hh_l{layer}")
+                        for encoder in encoders
+                    ]
+                ).unsqueeze(1),
+            )
+
+        # The linear decoder of the encoder and the MLP decoder are one chain
+        linears = [[encoder.decoder] for encoder in encoders]
+        for decoder_linears, decoder in zip(linears, decoders):
+            decoder_linears.extend(_mlp_linears(decoder.net))
+        self.num_linears = len(linears[0])
+        for index in range(self.num_linears):
+            self.register_buffer(
+                f"linear_weight_{index}",
+                _stack([chain[index].weight.t() for chain in linears]),
+            )
+            self.register_buffer(
+                f"linear_bias_{index}",
+                _stack([chain[index].bias for chain in linears]).unsqueeze(1),
+            )
+
+    @staticmethod
+    def signature(learner):
+        """Returns what has to match for learners to be grouped."""
+        modules = (learner.encoder, learner.decoder)
+        return (
+            learner.decoder.pred_horizon,
+            tuple(type(layer) for layer in learner.decoder.net),
+            tuple(
+                (name, tuple(tensor.shape))
+                for module in modules
+                for name, tensor in module.state_dict().items()
+            ),
+        )
+
+    def forward(self, input_data):
+        """Runs the learners on their inputs.
+
+        Args:
+            input_data: Tensor of shape (group, batch, obs_horizon, input_dim),
+                input_data[i] being the input to the i-th learner.
+
+        Returns:
+            Tensor of shape (group, batch, pred_horizon, output_dim), the
+            output of LSTMMLPEncDec.forward for each learner.
+        """
+        return self.forward_state(input_data)[0]
+
+    def forward_state(self, input_data, state=None):
+        """Like forward, but continues from the LSTM state of an earlier call,
+        see LSTMMLPEncDec.forward_state.
+
+        Returns:
+            The output of forward and the LSTM state after input_data, a list
+            of (hidden, cell) tensors of shape (group, batch, hidden_size) per
+            layer.
+        """
+        groups, batch, horizon, _ = input_data.shape
+        out = torch.baddbmm(
+            self.embed_bias,
+            input_data.reshape(groups, batch * horizon, -1),
+            self.embed_weight,
+        )
+        next_state = []
+        for layer in range(self.num_layers):
+            # Input contributions of all time steps at once
+            input_gates = torch.baddbmm(
+                getattr(self, f"bias_l{layer}"),
+                out,
+                getattr(self, f"weight_ih_l{layer}"),
+            ).reshape(groups, batch, horizon, -1)
+            weight_hh = getattr(self, f"weight_hh_l{layer}")
+            if state is None:
+                hidden = input_data.new_zeros(groups, batch, self.hidden_size)
+                cell = input_data.new_zeros(groups, batch, self.hidden_size)
+            else:
+                hidden, cell = state[layer]
+            hiddens = []
+            for step in range(horizon):
+                gates = torch.baddbmm(input_gates[:, :, step], hidden, weight_hh)
+                # Same gate order as nn.LSTM
+                input_gate, forget_gate, cell_gate, output_gate = gates.chunk(4, -1)
+                cell = torch.sigmoid(forget_gate) * cell + torch.sigmoid(
+                    input_gate
+                ) * torch.tanh(cell_gate)
+                hidden = torch.sigmoid(output_gate) * torch.tanh(cell)
+                hiddens.append(hidden)
+            next_state.append((hidden, cell))
+            if layer < self.num_layers - 1:
+                out = torch.stack(hiddens, dim=2).reshape(groups, batch * horizon, -1)
+
+        # LSTMEncoder only passes the last time step on to the MLPDecoder
+        out = hidden
+        for index in range(self.num_linears):
+            out = torch.baddbmm(
+                getattr(self, f"linear_bias_{index}"),
+                out,
+                getattr(self, f"linear_weight_{index}"),
+            )
+            # No ReLU after the encoder output and the last layer
+            if 0 < index < self.num_linears - 1:
+                out = torch.relu(out)
+        return out.reshape(groups, batch, self.pred_horizon, -1), next_state
@@ -69,6 +69,13 @@ class LSTMEncoder(nn.Module):
         out = self.decoder(out.reshape((*x.shape[:-2], *out.shape[-2:])))
         return out[:, -1:, :]
 
+    def forward_state(self, x, state=None):
+        # Like forward, but continues from the (h, c) state of the LSTM after
+        # an earlier sequence and also returns the state after x
+        embed = self.embed(x)
+        out, state = self.lstm(embed, state)
+        return self.decoder(out[:, -1:, :]), state
+
 
 class LSTMMLPEncDec(Learner):
     def __init__(self, cfg, rank=0, **kwargs):
@@ -213,3 +220,26 @@ class LSTMMLPEncDec(Learner):
         pred_output = self.decoder(input_states)
 
         return pred_output
+
+    def forward_state(self, input_data, state=None):
+        """Runs the learner on observations following the ones of state.
+
+        Feeding the observations of a window one call at a time gives the
+        same prediction as forward() on the whole window, so with the state
+        of the previous call only the newest observation has to be fed.
+
+        Args:
+            input_data: Observations of shape (horizon, input_dim) or
+                (batch, horizon, input_dim).
+            state: LSTM (h, c) state returned by the previous call, None to
+                start from the zero state like forward().
+
+        Returns:
+            The prediction and the LSTM state after input_data.
+        """
+        input_data = input_data.to(self.device)
+        if len(input_data.shape) == 2:
+            input_data = input_data.unsqueeze(0)
+
+        input_states, state = self.encoder.forward_state(input_data, state)
+        return self.decoder(input_states), state
@@ -2,6 +2,7 @@ import argparse
 import os
 from multiprocessing import Process
 
+from ruka_hand.control.bimanual import BimanualOperator
 from ruka_hand.control.operator import RUKAOperator
 from ruka_hand.utils.constants import HOST
 from ruka_hand.utils.manus_streamer import MANUSStreamer
@@ -15,9 +16,12 @@ class ManusTeleoperator:
         frequency,
         record=False,
         data_save_dir=None,
+        bimanual=False,
     ):
         self.freq = frequency
         self.hand_names = hand_names
+        # Drives all hands from one process, see BimanualOperator
+        self.bimanual = bimanual
         self.record = record
         self.data_save_dir = data_save_dir
         self._start_teleop()
@@ -39,6 +43,9 @@ class ManusTeleoperator:
             self.processes.append(
                 Process(target=self._start_manus_data_stream, args=(hand_name,))
             )
+        if self.bimanual:
+            self.processes.append(Process(target=self._start_bimanual_operator))
+            return
         for hand_name in self.hand_names:
             self.processes.append(
                 Process(target=self._start_ruka_operator, args=(hand_name,))
@@ -72,6 +79,18 @@ class ManusTeleoperator:
         except KeyboardInterrupt:
             operator.controller.close()
 
+    def _start_bimanual_operator(self):
+        operator = BimanualOperator(
+            hand_types=self.hand_names,
+            frequency=self.freq,
+            moving_average_limit=10,
+            fingertip_overshoot_ratio=0.1,
+            joint_angle_overshoot_ratio=0.3,
+            record=self.record,
+            data_save_dir=self.data_save_dir,
+        )
+        operator.run()
+
     def run(self):
         for process in self.processes:
             process.start()
@@ -4,6 +4,7 @@ import numpy as np
 from numpy.linalg import pinv
 from scipy.spatial.transform import Rotation
 
+from ruka_hand.control.bimanual import BimanualOperator
 from ruka_hand.control.operator import RUKAOperator
 from ruka_hand.utils.constants import *
 from ruka_hand.utils.timer import FrequencyTimer
@@ -20,6 +21,7 @@ class OculusTeleoperator:
         frequency,
         moving_average_limit=10,
         hands=["left", "right"],
+        bimanual=False,
     ):
         self.timer = FrequencyTimer(frequency)
         self.frequency = frequency
@@ -41,8 +43,22 @@ class OculusTeleoperator:
         }, {"left": [], "right": []}
 
         self.hand_names = hands
+        # Steps all hands together with their bus I/O on separate threads,
+        # see BimanualOperator
+        self.bimanual = bimanual
+        self.bimanual_operator = None
 
     def _init_hands(self):
+        if self.bimanual:
+            self.bimanual_operator = BimanualOperator(
+                hand_types=self.hand_names,
+                frequency=self.frequency,
+                moving_average_limit=5,
+            )
+            self.hands = self.bimanual_operator.operators
+            self._hand_keypoints = {}
+            return
+
         self.hands = {}
         for hand_name in self.hand_names:
             self.hands[hand_name] = RUKAOperator(
@@ -205,6 +221,10 @@ class OculusTeleoperator:
                 self.moving_average_limit,
             )
 
+            if self.bimanual_operator is not None:
+                # Stepped together with the other hand in _run_robots
+                self._hand_keypoints[hand_name] = transformed_hand_coords
+                return
             self.hands[hand_name].step(transformed_hand_coords)
 
     def _run_robots(self):
@@ -219,6 +239,10 @@ class OculusTeleoperator:
 
             self._operate_hand(name, transformed_hand_coords)
 
+        if self.bimanual_operator is not None:
+            self.bimanual_operator.step(self._hand_keypoints)
+            self._hand_keypoints = {}
+
     def run(self):
 
         self._init_hands()
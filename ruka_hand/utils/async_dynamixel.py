@@ -0,0 +1,340 @@
+import asyncio
+import logging
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import serial
+
+from ruka_hand.utils.dynamixel_util import *
+
+# Latency timer of the USB serial adapter in milliseconds, as in dynamixel_sdk
+LATENCY_TIMER = 16
+
+
+def _parse_status(buffer: bytearray, fast: bool = False):
+    """Extracts the first status packet from the received bytes.
+
+    Bytes before the packet and the packet itself are removed from buffer.
+
+    Returns:
+        The packet and COMM_SUCCESS or COMM_RX_CORRUPT, or (None, None) if
+        more bytes are needed.
+    """
+    max_id = BROADCAST_ID if fast else MAX_ID
+    while True:
+        start = buffer.find(PACKET_HEADER)
+        if start < 0:
+            # Keep the last bytes in case they are a partial header
+            del buffer[: max(len(buffer) - 3, 0)]
+            return None, None
+        del buffer[:start]
+        if len(buffer) < STATUS_MIN_LENGTH:
+            return None, None
+
+        length = buffer[PKT_LENGTH_L] | (buffer[PKT_LENGTH_H] << 8)
+        if (
+            buffer[PKT_ID] > max_id
+            or length > RXPACKET_MAX_LEN
+            or buffer[PKT_INSTRUCTION] != INST_STATUS
+        ):
+            del buffer[0]
+            continue
+
+        packet_length = length + PKT_LENGTH_H + 1
+        if len(buffer) < packet_length:
+            return None, None
+        packet = bytes(buffer[:packet_length])
+        del buffer[:packet_length]
+
+        crc = packet[-2] | (packet[-1] << 8)
+        if PacketCodec.crc16(packet[:-2]) != crc:
+            return packet, COMM_RX_CORRUPT
+        if not fast:
+            packet = (
+                packet[:PKT_INSTRUCTION]
+                + PacketCodec.unstuff(packet[PKT_INSTRUCTION:-2])
+                + packet[-2:]
+            )
+        return packet, COMM_SUCCESS
+
+
+class AsyncDynamixelClient:
+    """Asyncio client for communicating with Dynamixel motors.
+
+    The serial port is non-blocking and registered with the event loop, so
+    waiting for status packets yields to other tasks, e.g. the client of the
+    other hand or ZMQ subscribers, instead of blocking the thread.
+
+    NOTE: This only supports Protocol 2 and POSIX serial ports.
+    """
+
+    def __init__(
+        self,
+        motor_ids: Sequence[int],
+        port: str = "/dev/ttyUSB0",
+        indirect_state: bool = True,
+        fast_sync_read: bool = False,
+    ):
+        """Initializes a new client.
+
+        Args:
+            motor_ids: All motor IDs being used by the client.
+            port: The Dynamixel device to talk to, e.g. /dev/ttyUSB0.
+            indirect_state: If True, maps the state registers to the indirect
+                data area on connect so read_state() takes one transaction.
+            fast_sync_read: If True, reads use Fast Sync Read.
+        """
+        self.motor_ids = list(motor_ids)
+        self.port_name = port
+        self.baudrate = BAUDRATE
+        self.indirect_state = indirect_state
+        self.fast_sync_read = fast_sync_read
+        self.codec = PacketCodec()
+
+        self._serial = None
+        self._loop = None
+        self._rx_buffer = bytearray()
+        self._rx_event = asyncio.Event()
+        # Serializes transactions of the tasks sharing the client
+        self._bus_lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._serial is not None and self._serial.is_open
+
+    @property
+    def byte_time(self) -> float:
+        """Transmission time of one byte in milliseconds."""
+        return 1000.0 * 10.0 / self.baudrate
+
+    async def connect(self):
+        """Opens the port and configures the indirect state mapping."""
+        assert not self.is_connected, "Client is already connected."
+        try:
+            self._serial = serial.Serial(
+                port=self.port_name, baudrate=self.baudrate, timeout=0
+            )
+        except serial.SerialException as e:
+            raise OSError(
+                (
+                    "Failed to open port at {} (Check that the device is powered "
+                    "on and connected to your computer)."
+                ).format(self.port_name)
+            ) from e
+        self._serial.reset_input_buffer()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._serial.fileno(), self._on_readable)
+        logging.info("Succeeded to open port: %s", self.port_name)
+
+        if self.indirect_state:
+            await self.configure_indirect_state()
+
+    async def disconnect(self):
+        """Disables the torque and closes the port."""
+        if not self.is_connected:
+            return
+        await self.set_torque_enabled(False, retries=0)
+        self._loop.remove_reader(self._serial.fileno())
+        self._serial.close()
+
+    def _on_readable(self):
+        self._rx_buffer += self._serial.read(self._serial.in_waiting or 1)
+        self._rx_event.set()
+
+    def _transmit(self, packet: bytes):
+        self._rx_buffer.clear()
+        self._serial.write(packet)
+
+    def _deadline(self, reply_length: int) -> float:
+        # Same timeout as dynamixel_sdk's setPacketTimeout, in loop time
+        timeout = reply_length * self.byte_time + LATENCY_TIMER * 2.0 + 2.0
+        return self._loop.time() + timeout / 1000.0
+
+    async def _receive_status(self, deadline: float, fast: bool = False):
+        """Waits for the next status packet until the deadline."""
+        while True:
+            packet, result = _parse_status(self._rx_buffer, fast=fast)
+            if packet is not None:
+                return packet, result
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return None, COMM_RX_TIMEOUT
+            self._rx_event.clear()
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sync_write(
+        self,
+        motor_ids: Sequence[int],
+        values: Sequence[Union[int, float]],
+        address: int,
+        size: int,
+    ):
+        """Writes values to a group of motors with one Sync Write."""
+        async with self._bus_lock:
+            self._transmit(
+                self.codec.encode_sync_write(motor_ids, values, address, size)
+            )
+
+    async def sync_read_raw(
+        self,
+        motor_ids: Sequence[int],
+        address: int,
+        size: int,
+        fast: Optional[bool] = None,
+    ):
+        """Reads raw bytes from a group of motors in a single transaction.
+
+        Returns:
+            A list with the received bytes for each motor, or None for the
+            motors that did not reply.
+        """
+        fast = self.fast_sync_read if fast is None else fast
+        motor_ids = list(motor_ids)
+        received = {}
+        async with self._bus_lock:
+            self._transmit(self.codec.encode_sync_read(motor_ids, address, size, fast))
+            deadline = self._deadline((STATUS_MIN_LENGTH + size) * len(motor_ids))
+
+            while len(received) < len(motor_ids):
+                packet, result = await self._receive_status(deadline, fast=fast)
+                if result == COMM_RX_TIMEOUT:
+                    break
+                if result != COMM_SUCCESS:
+                    continue
+                if fast:
+                    # ERROR ID DATA CRC16 for every motor in one packet
+                    for start in range(
+                        PKT_PARAMETER0, len(packet) - size - 3, size + 4
+                    ):
+                        received[packet[start + 1]] = packet[
+                            start + 2 : start + 2 + size
+                        ]
+                    break
+                received[packet[PKT_ID]] = packet[
+                    PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + size
+                ]
+
+        errored_ids = [motor_id for motor_id in motor_ids if motor_id not in received]
+        if errored_ids:
+            logging.error("Sync read data is unavailable for: %s", str(errored_ids))
+        return [received.get(motor_id) for motor_id in motor_ids]
+
+    async def sync_read(
+        self,
+        motor_ids: Sequence[int],
+        address: int,
+        size: int,
+        fast: Optional[bool] = None,
+    ):
+        """Reads unsigned values from a group of motors."""
+        return [
+            None if data is None else int.from_bytes(data, byteorder="little")
+            for data in await self.sync_read_raw(motor_ids, address, size, fast)
+        ]
+
+    async def configure_indirect_state(self):
+        """Maps STATE_REGISTERS byte by byte to the indirect data area."""
+        indirect_addresses = [
+            address + offset
+            for address, size in STATE_REGISTERS
+            for offset in range(size)
+        ]
+        size = len(indirect_addresses) * LEN_INDIRECT_ADDRESS
+        block = b"".join(
+            address.to_bytes(LEN_INDIRECT_ADDRESS, byteorder="little")
+            for address in indirect_addresses
+        )
+        await self.sync_write(
+            self.motor_ids,
+            [int.from_bytes(block, byteorder="little")] * len(self.motor_ids),
+            ADDR_INDIRECT_ADDRESS_1,
+            size,
+        )
+
+        written = await self.sync_read_raw(
+            self.motor_ids, ADDR_INDIRECT_ADDRESS_1, size, fast=False
+        )
+        self.indirect_state = all(data == block for data in written)
+        if not self.indirect_state:
+            logging.warning(
+                "Could not map the state to the indirect address area, "
+                "reading state registers separately."
+            )
+        return self.indirect_state
+
+    async def read_state(self):
+        """Reads position, velocity, current, temperature and hardware error.
+
+        Returns:
+            A structured array with STATE_DTYPE holding one record per motor,
+            or None if any motor did not reply.
+        """
+        if self.indirect_state:
+            raw_data = await self.sync_read_raw(
+                self.motor_ids, ADDR_INDIRECT_DATA_1, LEN_STATE
+            )
+            if any(data is None for data in raw_data):
+                return None
+            return np.frombuffer(b"".join(raw_data), dtype=STATE_DTYPE).copy()
+
+        state = np.zeros(len(self.motor_ids), dtype=STATE_DTYPE)
+        for name, (address, size) in zip(STATE_DTYPE.names, STATE_REGISTERS):
+            bulk_data = await self.sync_read(self.motor_ids, address, size)
+            if any(value is None for value in bulk_data):
+                return None
+            if STATE_DTYPE[name].kind == "i":
+                bulk_data = [unsigned_to_signed(value, size) for value in bulk_data]
+            state[name] = bulk_data
+        return state
+
+    async def write_goal(self, positions: Sequence[Union[int, float]]):
+        """Writes the goal positions of all motors."""
+        await self.sync_write(
+            self.motor_ids, positions, ADDR_GOAL_POSITION, LEN_GOAL_POSITION
+        )
+
+    async def set_torque_enabled(
+        self, enabled: bool, retries: int = -1, retry_interval: float = 0.25
+    ):
+        """Sets whether torque is enabled, see DynamixelClient."""
+        value = int(enabled)
+        remaining_ids = list(self.motor_ids)
+        while remaining_ids:
+            await self.sync_write(
+                remaining_ids,
+                [value] * len(remaining_ids),
+                ADDR_TORQUE_ENABLE,
+                LEN_TORQUE_ENABLE,
+            )
+            torque = await self.sync_read(
+                remaining_ids, ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE, fast=False
+            )
+            remaining_ids = [
+                motor_id
+                for motor_id, motor_torque in zip(remaining_ids, torque)
+                if motor_torque != value
+            ]
+            if not remaining_ids:
+                break
+            logging.error(
+                "Could not set torque %s for IDs: %s",
+                "enabled" if enabled else "disabled",
+                str(remaining_ids),
+            )
+            if retries == 0:
+                break
+            await asyncio.sleep(retry_interval)
+            retries -= 1
+
+    async def __aenter__(self):
+        """Enables use as an async context manager."""
+        if not self.is_connected:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        """Enables use as an async context manager."""
+        await self.disconnect()
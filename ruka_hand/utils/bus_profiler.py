@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+# Upper edges of the latency histogram buckets in seconds, from 50us doubling
+# up to ~100ms, plus a last bucket for anything slower
+LATENCY_BUCKET_EDGES = 50e-6 * 2.0 ** np.arange(12)
+
+# Summaries are logged at INFO, which the WARNING level the root logger is
+# configured with in dynamixel_util.py would drop
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class BusProfiler:
+    """Collects per-transaction latencies and error counters of a bus.
+
+    Latencies are kept as histograms keyed by (operation, address), e.g.
+    ("sync_read", 132). Counters track timeouts, CRC errors, motors missing
+    from reads and retries of the callers.
+
+    Args:
+        summary_interval: If set, a summary is logged every summary_interval
+            seconds while transactions are being recorded.
+    """
+
+    def __init__(self, summary_interval=None):
+        self.summary_interval = summary_interval
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            # (count, total, max) of the latencies per key
+            self._totals = {}
+            self.counters = Counter()
+            self._last_summary = time.perf_counter()
+
+    def record(self, operation, address, latency):
+        """Adds the latency, in seconds, of one transaction."""
+        key = (operation, address)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = np.zeros(
+                    len(LATENCY_BUCKET_EDGES) + 1, dtype=np.int64
+                )
+                self._totals[key] = (0, 0.0, 0.0)
+            self._histograms[key][np.searchsorted(LATENCY_BUCKET_EDGES, latency)] += 1
+            count, total, max_latency = self._totals[key]
+            self._totals[key] = (count + 1, total + latency, max(max_latency, latency))
+
+        if self.summary_interval is not None:
+            now = time.perf_counter()
+            if now - self._last_summary >= self.summary_interval:
+                self._last_summary = now
+                logger.info("Bus profile:\n%s", self.summary())
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    @staticmethod
+    def _percentile(histogram, quantile):
+        # Upper edge of the bucket holding the quantile, inf for the last one
+        rank = np.searchsorted(np.cumsum(histogram), quantile * histogram.sum())
+        if rank >= len(LATENCY_BUCKET_EDGES):
+            return float("inf")
+        return float(LATENCY_BUCKET_EDGES[rank])
+
+    def snapshot(self):
+        """Returns a copy of the statistics collected so far.
+
+        Returns:
+            A dict with "latency", mapping (operation, address) to the count,
+            mean, max, p50 and p99 latency in seconds and the histogram, and
+            "counters", mapping counter names to their values.
+        """
+        with self._lock:
+            latency = {}
+            for key, histogram in self._histograms.items():
+                count, total, max_latency = self._totals[key]
+                latency[key] = dict(
+                    count=count,
+                    mean=total / count,
+                    max=max_latency,
+                    p50=min(self._percentile(histogram, 0.5), max_latency),
+                    p99=min(self._percentile(histogram, 0.99), max_latency),
+                    histogram=histogram.copy(),
+                )
+            return dict(latency=latency, counters=dict(self.counters))
+
+    def summary(self):
+        """Formats the snapshot as one line per key and one for the counters."""
+        snapshot = self.snapshot()
+        lines = [
+            "{}@{}: n={} mean={:.2f}ms p50<={:.2f}ms p99<={:.2f}ms max={:.2f}ms".format(
+                operation,
+                address,
+                stats["count"],
+                stats["mean"] * 1e3,
+                stats["p50"] * 1e3,
+                stats["p99"] * 1e3,
+                stats["max"] * 1e3,
+            )
+            for (operation, address), stats in sorted(snapshot["latency"].items())
+        ]
+        lines.append(
+            "counters: "
+            + (
+                " ".join(
+                    "{}={}".format(name, value)
+                    for name, value in sorted(snapshot["counters"].items())
+                )
+                or "none"
+            )
+        )
+        return "\n".join(lines)
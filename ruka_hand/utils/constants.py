@@ -12,6 +12,12 @@ FINGER_NAMES_TO_MANUS_IDS = {"Thumb": 0, "Index": 1, "Middle": 2, "Ring": 3, "Pi
 MOTOR_RANGES_LEFT = [724, 600, 563, 1230, 930, 1240, 930, 1000, 1270, 1100, 1100]
 MOTOR_RANGES_RIGHT = [900, 600, 563, 1430, 930, 1340, 1058, 1000, 1270, 1200, 1300]
 USB_PORTS = {"left": "/dev/ttyUSB0", "right": "/dev/ttyUSB0"}
+# Optional split of the motors of a hand over several USB serial adapters which
+# are then read concurrently, e.g.
+# "right": {"/dev/ttyUSB0": [1, 2, 3, 4, 5, 6], "/dev/ttyUSB1": [7, 8, 9, 10, 11]}
+USB_PORT_SHARDS = {}
+# Shared memory ring buffer a Hand publishes its state to, see SharedStateRing
+SHARED_STATE_NAMES = {"left": "ruka_left_state", "right": "ruka_right_state"}
 
 # Controller constants
 HOST = "<input IP address>"
@@ -6,6 +6,9 @@
 #
 # #########################################################################
 
+# Every register by its Data Name in the e-manual, generated from the
+# e-manual table by generate_registry.py
+from ruka_hand.utils.control_table.registry import CONTROL_TABLE, Register
 
 # EEPROM AREA (ONLY WRITE-ABLE WITH TORQUE OFF)
 
@@ -134,3 +137,15 @@ LEN_PRESENT_INPUT_VOLTAGE = 2
 
 ADDR_PRESENT_TEMP = 146
 LEN_PRESENT_TEMP = 1
+
+
+# INDIRECT ADDRESS AREA
+# Indirect Address n holds the control table address mirrored by Indirect Data n
+
+ADDR_INDIRECT_ADDRESS_1 = 168
+LEN_INDIRECT_ADDRESS = 2
+
+ADDR_INDIRECT_DATA_1 = 208
+LEN_INDIRECT_DATA = 1
+
+NUM_INDIRECT_ENTRIES = 20
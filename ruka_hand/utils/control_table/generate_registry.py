@@ -0,0 +1,173 @@
+# Generates registry.py from controlTable.html, the EEPROM and RAM <table>
+# elements of https://emanual.robotis.com/docs/en/dxl/x/xl330-m288/#control-table
+#
+# Run from the repository root after updating controlTable.html:
+#   python -m ruka_hand.utils.control_table.generate_registry
+#   black ruka_hand/utils/control_table/registry.py
+
+import os
+import re
+from html.parser import HTMLParser
+
+CONTROL_TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+HTML_PATH = os.path.join(CONTROL_TABLE_DIR, "controlTable.html")
+REGISTRY_PATH = os.path.join(CONTROL_TABLE_DIR, "registry.py")
+
+# Registers holding two's complement values although their range in the
+# e-manual is not given as negative
+SIGNED_REGISTERS = {
+    "Goal Position",
+    "Present PWM",
+    "Present Current",
+    "Present Velocity",
+    "Present Position",
+    "Velocity Trajectory",
+    "Position Trajectory",
+}
+
+HEADER = '''\
+# #########################################################################
+#
+#   Control table registry for Dynamixel XL330-M288-T
+#   GENERATED by generate_registry.py from controlTable.html, do not edit.
+#
+# #########################################################################
+
+from collections import namedtuple
+
+import numpy as np
+
+
+class Register(
+    namedtuple(
+        "Register", ["name", "address", "size", "signed", "unit_scale", "unit", "access"]
+    )
+):
+    """A register of the control table.
+
+    unit_scale converts raw values to unit, e.g. 0.229 rev/min for velocities,
+    and access is "R" or "RW".
+    """
+
+    __slots__ = ()
+
+    @property
+    def dtype(self):
+        """Little endian numpy dtype of the raw register value."""
+        return np.dtype("<{}{}".format("i" if self.signed else "u", self.size))
+
+    @property
+    def writable(self):
+        return self.access == "RW"
+
+
+CONTROL_TABLE = {
+'''
+
+
+class _TableParser(HTMLParser):
+    """Collects the text of the cells of every <tbody> row."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._in_body = False
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tbody":
+            self._in_body = True
+        elif tag == "tr" and self._in_body:
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = ""
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._cell is not None:
+            self._row.append(self._cell.strip())
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == "tbody":
+            self._in_body = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell += data
+
+
+def expand_elided_rows(rows):
+    """Fills the rows elided with "…", e.g. Indirect Address 4 to 17."""
+    expanded = []
+    for index, row in enumerate(rows):
+        if row[0] != "…":
+            expanded.append(row)
+            continue
+        previous, following = expanded[-1], rows[index + 1]
+        prefix, first = re.match(r"(.*) (\d+)$", previous[2]).groups()
+        last = int(re.match(r".* (\d+)$", following[2]).group(1))
+        size = int(previous[1])
+        for number in range(int(first) + 1, last):
+            offset = number - int(first)
+            expanded.append(
+                [
+                    str(int(previous[0]) + offset * size),
+                    previous[1],
+                    "{} {}".format(prefix, number),
+                    previous[3],
+                    (
+                        str(int(previous[4]) + offset)
+                        if previous[4].isdigit()
+                        else previous[4]
+                    ),
+                    previous[5],
+                    previous[6],
+                ]
+            )
+    return expanded
+
+
+def parse_unit(unit):
+    """Splits a unit cell like "0.229 [rev/min]" into (0.229, "rev/min")."""
+    match = re.match(r"([\d.]+)\s*\[\s*([^\]]*?)\s*\]", unit)
+    if match is None:
+        return 1.0, ""
+    return float(match.group(1)), match.group(2)
+
+
+def parse_registers(html):
+    parser = _TableParser()
+    parser.feed(html)
+    registers = []
+    for address, size, name, access, _, value_range, unit in expand_elided_rows(
+        parser.rows
+    ):
+        unit_scale, unit = parse_unit(unit)
+        # Ranges like "-1,044,479 ~1,044,479", where "-" alone means no range
+        signed = name in SIGNED_REGISTERS or re.match(r"-\S", value_range) is not None
+        registers.append(
+            (name, int(address), int(size), signed, unit_scale, unit, access)
+        )
+    return registers
+
+
+def format_registry(registers):
+    lines = [HEADER]
+    for name, address, size, signed, unit_scale, unit, access in registers:
+        lines.append(
+            "    {!r}: Register({!r}, {}, {}, {}, {!r}, {!r}, {!r}),\n".format(
+                name, name, address, size, signed, unit_scale, unit, access
+            )
+        )
+    lines.append("}\n")
+    return "".join(lines)
+
+
+if __name__ == "__main__":
+    with open(HTML_PATH) as fp:
+        registers = parse_registers(fp.read())
+    with open(REGISTRY_PATH, "w") as fp:
+        fp.write(format_registry(registers))
+    print("Wrote {} registers to {}".format(len(registers), REGISTRY_PATH))
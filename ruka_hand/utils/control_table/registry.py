@@ -0,0 +1,186 @@
+# #########################################################################
+#
+#   Control table registry for Dynamixel XL330-M288-T
+#   GENERATED by generate_registry.py from controlTable.html, do not edit.
+#
+# #########################################################################
+
+from collections import namedtuple
+
+import numpy as np
+
+
+class Register(
+    namedtuple(
+        "Register",
+        ["name", "address", "size", "signed", "unit_scale", "unit", "access"],
+    )
+):
+    """A register of the control table.
+
+    unit_scale converts raw values to unit, e.g. 0.229 rev/min for velocities,
+    and access is "R" or "RW".
+    """
+
+    __slots__ = ()
+
+    @property
+    def dtype(self):
+        """Little endian numpy dtype of the raw register value."""
+        return np.dtype("<{}{}".format("i" if self.signed else "u", self.size))
+
+    @property
+    def writable(self):
+        return self.access == "RW"
+
+
+CONTROL_TABLE = {
+    "Model Number": Register("Model Number", 0, 2, False, 1.0, "", "R"),
+    "Model Information": Register("Model Information", 2, 4, False, 1.0, "", "R"),
+    "Firmware Version": Register("Firmware Version", 6, 1, False, 1.0, "", "R"),
+    "ID": Register("ID", 7, 1, False, 1.0, "", "RW"),
+    "Baud Rate": Register("Baud Rate", 8, 1, False, 1.0, "", "RW"),
+    "Return Delay Time": Register("Return Delay Time", 9, 1, False, 2.0, "μsec", "RW"),
+    "Drive Mode": Register("Drive Mode", 10, 1, False, 1.0, "", "RW"),
+    "Operating Mode": Register("Operating Mode", 11, 1, False, 1.0, "", "RW"),
+    "Secondary(Shadow) ID": Register(
+        "Secondary(Shadow) ID", 12, 1, False, 1.0, "", "RW"
+    ),
+    "Protocol Type": Register("Protocol Type", 13, 1, False, 1.0, "", "RW"),
+    "Homing Offset": Register("Homing Offset", 20, 4, True, 1.0, "pulse", "RW"),
+    "Moving Threshold": Register(
+        "Moving Threshold", 24, 4, False, 0.229, "rev/min", "RW"
+    ),
+    "Temperature Limit": Register("Temperature Limit", 31, 1, False, 1.0, "°C", "RW"),
+    "Max Voltage Limit": Register("Max Voltage Limit", 32, 2, False, 0.1, "V", "RW"),
+    "Min Voltage Limit": Register("Min Voltage Limit", 34, 2, False, 0.1, "V", "RW"),
+    "PWM Limit": Register("PWM Limit", 36, 2, False, 0.113, "%", "RW"),
+    "Current Limit": Register("Current Limit", 38, 2, False, 1.0, "mA", "RW"),
+    "Velocity Limit": Register("Velocity Limit", 44, 4, False, 0.229, "rev/min", "RW"),
+    "Max Position Limit": Register(
+        "Max Position Limit", 48, 4, False, 1.0, "pulse", "RW"
+    ),
+    "Min Position Limit": Register(
+        "Min Position Limit", 52, 4, False, 1.0, "pulse", "RW"
+    ),
+    "Startup Configuration": Register(
+        "Startup Configuration", 60, 1, False, 1.0, "", "RW"
+    ),
+    "PWM Slope": Register("PWM Slope", 62, 1, False, 1.977, "mV/msec", "RW"),
+    "Shutdown": Register("Shutdown", 63, 1, False, 1.0, "", "RW"),
+    "Torque Enable": Register("Torque Enable", 64, 1, False, 1.0, "", "RW"),
+    "LED": Register("LED", 65, 1, False, 1.0, "", "RW"),
+    "Status Return Level": Register("Status Return Level", 68, 1, False, 1.0, "", "RW"),
+    "Registered Instruction": Register(
+        "Registered Instruction", 69, 1, False, 1.0, "", "R"
+    ),
+    "Hardware Error Status": Register(
+        "Hardware Error Status", 70, 1, False, 1.0, "", "R"
+    ),
+    "Velocity I Gain": Register("Velocity I Gain", 76, 2, False, 1.0, "", "RW"),
+    "Velocity P Gain": Register("Velocity P Gain", 78, 2, False, 1.0, "", "RW"),
+    "Position D Gain": Register("Position D Gain", 80, 2, False, 1.0, "", "RW"),
+    "Position I Gain": Register("Position I Gain", 82, 2, False, 1.0, "", "RW"),
+    "Position P Gain": Register("Position P Gain", 84, 2, False, 1.0, "", "RW"),
+    "Feedforward 2nd Gain": Register(
+        "Feedforward 2nd Gain", 88, 2, False, 1.0, "", "RW"
+    ),
+    "Feedforward 1st Gain": Register(
+        "Feedforward 1st Gain", 90, 2, False, 1.0, "", "RW"
+    ),
+    "Bus Watchdog": Register("Bus Watchdog", 98, 1, False, 20.0, "msec", "RW"),
+    "Goal PWM": Register("Goal PWM", 100, 2, True, 1.0, "", "RW"),
+    "Goal Current": Register("Goal Current", 102, 2, True, 1.0, "mA", "RW"),
+    "Goal Velocity": Register("Goal Velocity", 104, 4, True, 0.229, "rev/min", "RW"),
+    "Profile Acceleration": Register(
+        "Profile Acceleration", 108, 4, False, 214.577, "rev/min2", "RW"
+    ),
+    "Profile Velocity": Register(
+        "Profile Velocity", 112, 4, False, 0.229, "rev/min", "RW"
+    ),
+    "Goal Position": Register("Goal Position", 116, 4, True, 1.0, "pulse", "RW"),
+    "Realtime Tick": Register("Realtime Tick", 120, 2, False, 1.0, "msec", "R"),
+    "Moving": Register("Moving", 122, 1, False, 1.0, "", "R"),
+    "Moving Status": Register("Moving Status", 123, 1, False, 1.0, "", "R"),
+    "Present PWM": Register("Present PWM", 124, 2, True, 1.0, "", "R"),
+    "Present Current": Register("Present Current", 126, 2, True, 1.0, "mA", "R"),
+    "Present Velocity": Register(
+        "Present Velocity", 128, 4, True, 0.229, "rev/min", "R"
+    ),
+    "Present Position": Register("Present Position", 132, 4, True, 1.0, "pulse", "R"),
+    "Velocity Trajectory": Register(
+        "Velocity Trajectory", 136, 4, True, 0.229, "rev/min", "R"
+    ),
+    "Position Trajectory": Register(
+        "Position Trajectory", 140, 4, True, 1.0, "pulse", "R"
+    ),
+    "Present Input Voltage": Register(
+        "Present Input Voltage", 144, 2, False, 0.1, "V", "R"
+    ),
+    "Present Temperature": Register(
+        "Present Temperature", 146, 1, False, 1.0, "°C", "R"
+    ),
+    "Backup Ready": Register("Backup Ready", 147, 1, False, 1.0, "", "R"),
+    "Indirect Address 1": Register("Indirect Address 1", 168, 2, False, 1.0, "", "RW"),
+    "Indirect Address 2": Register("Indirect Address 2", 170, 2, False, 1.0, "", "RW"),
+    "Indirect Address 3": Register("Indirect Address 3", 172, 2, False, 1.0, "", "RW"),
+    "Indirect Address 4": Register("Indirect Address 4", 174, 2, False, 1.0, "", "RW"),
+    "Indirect Address 5": Register("Indirect Address 5", 176, 2, False, 1.0, "", "RW"),
+    "Indirect Address 6": Register("Indirect Address 6", 178, 2, False, 1.0, "", "RW"),
+    "Indirect Address 7": Register("Indirect Address 7", 180, 2, False, 1.0, "", "RW"),
+    "Indirect Address 8": Register("Indirect Address 8", 182, 2, False, 1.0, "", "RW"),
+    "Indirect Address 9": Register("Indirect Address 9", 184, 2, False, 1.0, "", "RW"),
+    "Indirect Address 10": Register(
+        "Indirect Address 10", 186, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 11": Register(
+        "Indirect Address 11", 188, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 12": Register(
+        "Indirect Address 12", 190, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 13": Register(
+        "Indirect Address 13", 192, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 14": Register(
+        "Indirect Address 14", 194, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 15": Register(
+        "Indirect Address 15", 196, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 16": Register(
+        "Indirect Address 16", 198, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 17": Register(
+        "Indirect Address 17", 200, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 18": Register(
+        "Indirect Address 18", 202, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 19": Register(
+        "Indirect Address 19", 204, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Address 20": Register(
+        "Indirect Address 20", 206, 2, False, 1.0, "", "RW"
+    ),
+    "Indirect Data 1": Register("Indirect Data 1", 208, 1, False, 1.0, "", "RW"),
+    "Indirect Data 2": Register("Indirect Data 2", 209, 1, False, 1.0, "", "RW"),
+    "Indirect Data 3": Register("Indirect Data 3", 210, 1, False, 1.0, "", "RW"),
+    "Indirect Data 4": Register("Indirect Data 4", 211, 1, False, 1.0, "", "RW"),
+    "Indirect Data 5": Register("Indirect Data 5", 212, 1, False, 1.0, "", "RW"),
+    "Indirect Data 6": Register("Indirect Data 6", 213, 1, False, 1.0, "", "RW"),
+    "Indirect Data 7": Register("Indirect Data 7", 214, 1, False, 1.0, "", "RW"),
+    "Indirect Data 8": Register("Indirect Data 8", 215, 1, False, 1.0, "", "RW"),
+    "Indirect Data 9": Register("Indirect Data 9", 216, 1, False, 1.0, "", "RW"),
+    "Indirect Data 10": Register("Indirect Data 10", 217, 1, False, 1.0, "", "RW"),
+    "Indirect Data 11": Register("Indirect Data 11", 218, 1, False, 1.0, "", "RW"),
+    "Indirect Data 12": Register("Indirect Data 12", 219, 1, False, 1.0, "", "RW"),
+    "Indirect Data 13": Register("Indirect Data 13", 220, 1, False, 1.0, "", "RW"),
+    "Indirect Data 14": Register("Indirect Data 14", 221, 1, False, 1.0, "", "RW"),
+    "Indirect Data 15": Register("Indirect Data 15", 222, 1, False, 1.0, "", "RW"),
+    "Indirect Data 16": Register("Indirect Data 16", 223, 1, False, 1.0, "", "RW"),
+    "Indirect Data 17": Register("Indirect Data 17", 224, 1, False, 1.0, "", "RW"),
+    "Indirect Data 18": Register("Indirect Data 18", 225, 1, False, 1.0, "", "RW"),
+    "Indirect Data 19": Register("Indirect Data 19", 226, 1, False, 1.0, "", "RW"),
+    "Indirect Data 20": Register("Indirect Data 20", 227, 1, False, 1.0, "", "RW"),
+}
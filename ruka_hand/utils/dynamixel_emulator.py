@@ -0,0 +1,660 @@
+# Software emulator of a Dynamixel bus with XL330-M288-T motors, speaking
+# Protocol 2.0 either in-process (EmulatedPortHandler) or over a pseudo-terminal
+# (PtyBusEmulator), so that the control stack can run without hardware.
+import argparse
+import math
+import os
+import random
+import threading
+import time
+import tty
+from collections import deque
+
+import dynamixel_sdk
+
+from ruka_hand.utils.dynamixel_util import *
+
+CONTROL_TABLE_SIZE = 661
+MODEL_NUMBER_XL330_M288 = 1200
+FIRMWARE_VERSION = 46
+
+ADDR_MODEL_NUMBER = 0
+ADDR_FIRMWARE_VERSION = 6
+ADDR_ID = 7
+ADDR_BAUD_RATE = 8
+ADDR_RETURN_DELAY_TIME = 9
+
+# Instructions
+INST_PING = 0x01
+INST_READ = 0x02
+INST_WRITE = 0x03
+INST_REBOOT = 0x08
+INST_BULK_WRITE = 0x93
+
+# Status packet errors and hardware error status bits
+ERRNUM_ACCESS = 7
+HW_ERROR_OVERHEATING = 1 << 2
+HW_ERROR_OVERLOAD = 1 << 5
+
+# Unit conversions of the XL330 control table
+PULSES_PER_REV = 4096
+PULSES_PER_S_PER_VELOCITY_UNIT = 0.229 * PULSES_PER_REV / 60.0
+PULSES_PER_S2_PER_ACCELERATION_UNIT = 214.577 * PULSES_PER_REV / 3600.0
+RETURN_DELAY_UNIT = 2e-6  # seconds
+
+# Registers reset by a reboot, with their initial values
+RAM_DEFAULTS = (
+    (ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE, 0),
+    (ADDR_STATUS_RETURN_LEVEL, LEN_STATUS_RETURN_LEVEL, 2),
+    (ADDR_HARDWARE_ERROR, LEN_HARDWARE_ERROR, 0),
+    (ADDR_VELOCITY_I_GAIN, LEN_VELOCITY_I_GAIN, 1600),
+    (ADDR_VELOCITY_P_GAIN, LEN_VELOCITY_P_GAIN, 180),
+    (ADDR_POSITION_D_GAIN, LEN_POSITION_D_GAIN, 0),
+    (ADDR_POSITION_I_GAIN, LEN_POSITION_I_GAIN, 0),
+    (ADDR_POSITION_P_GAIN, LEN_POSITION_P_GAIN, 400),
+    (ADDR_GOAL_PWM, LEN_GOAL_PWM, 885),
+    (ADDR_GOAL_CURRENT, LEN_GOAL_CURRENT, 1750),
+    (ADDR_GOAL_VELOCITY, LEN_GOAL_VELOCITY, 0),
+    (ADDR_PROFILE_ACCELERATION, LEN_PROFILE_ACCELERATION, 0),
+    (ADDR_PROFILE_VELOCITY, LEN_PROFILE_VELOCITY, 0),
+)
+EEPROM_DEFAULTS = (
+    (ADDR_MODEL_NUMBER, 2, MODEL_NUMBER_XL330_M288),
+    (ADDR_FIRMWARE_VERSION, 1, FIRMWARE_VERSION),
+    (ADDR_BAUD_RATE, 1, 4),  # 2 Mbps
+    (ADDR_RETURN_DELAY_TIME, 1, 0),
+    (ADDR_OPERATING_MODE, LEN_OPERATING_MODE, 3),
+    (ADDR_MOVING_THRESHOLD, LEN_MOVING_THRESHOLD, 10),
+    (ADDR_TEMP_LIMIT, LEN_TEMP_LIMIT, 70),
+    (ADDR_MAX_VOLTAGE_LIMIT, LEN_MAX_VOLTAGE_LIMIT, 70),
+    (ADDR_PWM_LIMIT, LEN_PWM_LIMIT, 885),
+    (ADDR_CURRENT_LIMIT, LEN_CURRENT_LIMIT, 1750),
+    (ADDR_VELOCITY_LIMIT, LEN_VELOCITY_LIMIT, 445),
+    (ADDR_MAX_POSITION_LIMIT, LEN_MAX_POSITION_LIMIT, 4095),
+    (ADDR_MIN_POSITION_LIMIT, LEN_MIN_POSITION_LIMIT, 0),
+    (ADDR_SHUTDOWN, LEN_SHUTDOWN, 53),
+)
+
+
+class EmulatedXL330:
+    """Control table and first-order dynamics of a single XL330 motor.
+
+    Args:
+        motor_id: The ID of the motor.
+        position: Initial present position in pulses.
+        position_range: Hard stops in pulses, e.g. the tendon limits of a
+            finger. Pushing against them builds up current.
+        time_constant: Time constant of the position response in seconds.
+        current_gain: Current drawn per pulse of position error, in mA.
+        ambient_temperature: Initial and ambient temperature in Celsius.
+        heating: Temperature rise per second at 1 A, in Celsius.
+        cooling: Fraction of the temperature above ambient lost per second.
+    """
+
+    def __init__(
+        self,
+        motor_id,
+        position=2048,
+        position_range=(0, 4095),
+        time_constant=0.05,
+        current_gain=2.0,
+        ambient_temperature=30.0,
+        heating=8.0,
+        cooling=0.02,
+    ):
+        self.motor_id = motor_id
+        self.position_range = position_range
+        self.time_constant = time_constant
+        self.current_gain = current_gain
+        self.ambient_temperature = ambient_temperature
+        self.heating = heating
+        self.cooling = cooling
+        self.overload_time = 2.0
+
+        self.table = bytearray(CONTROL_TABLE_SIZE)
+        for address, size, value in EEPROM_DEFAULTS:
+            self._set(address, size, value)
+        self._set(ADDR_ID, 1, motor_id)
+        for index in range(NUM_INDIRECT_ENTRIES):
+            self._set(
+                ADDR_INDIRECT_ADDRESS_1 + index * LEN_INDIRECT_ADDRESS,
+                LEN_INDIRECT_ADDRESS,
+                ADDR_INDIRECT_DATA_1 + index,
+            )
+
+        self.position = float(position)
+        self.velocity = 0.0
+        self.current = 0.0
+        self.temperature = ambient_temperature
+        self._time_at_current_limit = 0.0
+        self.reboot()
+
+    def _get(self, address, size, signed=False):
+        return int.from_bytes(
+            self.table[address : address + size], byteorder="little", signed=signed
+        )
+
+    def _set(self, address, size, value):
+        value = int(value) & ((1 << (8 * size)) - 1)
+        self.table[address : address + size] = value.to_bytes(size, "little")
+
+    def _map_indirect(self, address):
+        if (
+            ADDR_INDIRECT_DATA_1
+            <= address
+            < ADDR_INDIRECT_DATA_1 + NUM_INDIRECT_ENTRIES
+        ):
+            index = address - ADDR_INDIRECT_DATA_1
+            return self._get(
+                ADDR_INDIRECT_ADDRESS_1 + index * LEN_INDIRECT_ADDRESS,
+                LEN_INDIRECT_ADDRESS,
+            )
+        return address
+
+    @property
+    def torque_enabled(self):
+        return self.table[ADDR_TORQUE_ENABLE] == 1
+
+    @property
+    def hardware_error(self):
+        return self.table[ADDR_HARDWARE_ERROR]
+
+    @property
+    def return_delay(self):
+        return self.table[ADDR_RETURN_DELAY_TIME] * RETURN_DELAY_UNIT
+
+    def reboot(self):
+        for address, size, value in RAM_DEFAULTS:
+            self._set(address, size, value)
+        self._set(ADDR_GOAL_POSITION, LEN_GOAL_POSITION, round(self.position))
+        self.setpoint = self.position
+        self.setpoint_velocity = 0.0
+        self.velocity = 0.0
+        self.current = 0.0
+        self._time_at_current_limit = 0.0
+        self._update_present()
+
+    def inject_hardware_error(self, error_bit):
+        """Raises a hardware error, which also disables the torque."""
+        self.table[ADDR_HARDWARE_ERROR] |= error_bit
+        self.table[ADDR_TORQUE_ENABLE] = 0
+
+    def read(self, address, size):
+        self._update_present()
+        return bytes(
+            self.table[self._map_indirect(address + offset)] for offset in range(size)
+        )
+
+    def write(self, address, data):
+        """Writes data to the control table.
+
+        Returns:
+            The error of the status packet, 0 if the write succeeded.
+        """
+        for offset, byte in enumerate(data):
+            mapped = self._map_indirect(address + offset)
+            if mapped < ADDR_TORQUE_ENABLE and self.torque_enabled:
+                # EEPROM area is only writable with torque disabled
+                return ERRNUM_ACCESS
+            if mapped == ADDR_TORQUE_ENABLE and self.hardware_error and byte:
+                return ERRNUM_ACCESS
+            self.table[mapped] = byte
+        return 0
+
+    def status_error(self):
+        return ERRBIT_ALERT if self.hardware_error else 0
+
+    def step(self, dt):
+        """Advances the motor dynamics by dt seconds."""
+        # Integrate in sub-steps well below the time constant, up to one second
+        dt = min(dt, 1.0)
+        max_step = self.time_constant / 10
+        while dt > 0:
+            self._integrate(min(dt, max_step))
+            dt -= max_step
+
+    def _integrate(self, dt):
+        if self.torque_enabled:
+            min_limit = self._get(ADDR_MIN_POSITION_LIMIT, LEN_MIN_POSITION_LIMIT)
+            max_limit = self._get(ADDR_MAX_POSITION_LIMIT, LEN_MAX_POSITION_LIMIT)
+            goal = self._get(ADDR_GOAL_POSITION, LEN_GOAL_POSITION, signed=True)
+            goal = min(max(goal, min_limit), max_limit)
+            self._step_profile(goal, dt)
+            error = self.setpoint - self.position
+
+            # Converge towards the setpoint of the profile
+            velocity = error / self.time_constant
+
+            # Current is capped by the goal current in current-based position
+            # control and by the current limit otherwise
+            current = self.current_gain * error
+            current_limit = overload_limit = self._get(
+                ADDR_CURRENT_LIMIT, LEN_CURRENT_LIMIT
+            )
+            if self.table[ADDR_OPERATING_MODE] == 5:
+                goal_current = abs(
+                    self._get(ADDR_GOAL_CURRENT, LEN_GOAL_CURRENT, signed=True)
+                )
+                current_limit = min(current_limit, goal_current)
+            if abs(current) > current_limit:
+                velocity *= current_limit / abs(current)
+                current = math.copysign(current_limit, current)
+
+            position = self.position + velocity * dt
+            low, high = self.position_range
+            if not low <= position <= high:
+                # Blocked by a hard stop
+                position = min(max(position, low), high)
+                velocity = 0.0
+            self.velocity = (position - self.position) / dt
+            self.position = position
+            self.current = current
+
+            # Holding below a lowered goal current does not overload the motor
+            if abs(current) >= 0.95 * overload_limit and overload_limit > 0:
+                self._time_at_current_limit += dt
+            else:
+                self._time_at_current_limit = 0.0
+        else:
+            self.velocity = 0.0
+            self.current = 0.0
+            self._time_at_current_limit = 0.0
+
+        # Joule heating and cooling towards the ambient temperature
+        self.temperature += dt * (
+            self.heating * (self.current / 1000.0) ** 2
+            - self.cooling * (self.temperature - self.ambient_temperature)
+        )
+
+        shutdown = self.table[ADDR_SHUTDOWN]
+        if self.temperature > self.table[ADDR_TEMP_LIMIT]:
+            if shutdown & HW_ERROR_OVERHEATING:
+                self.inject_hardware_error(HW_ERROR_OVERHEATING)
+        if self._time_at_current_limit > self.overload_time:
+            if shutdown & HW_ERROR_OVERLOAD:
+                self.inject_hardware_error(HW_ERROR_OVERLOAD)
+
+    def _step_profile(self, goal, dt):
+        """Moves the setpoint towards the goal along the trapezoidal profile
+        given by Profile Velocity and Acceleration, 0 meaning no limit."""
+        profile_velocity = self._get(ADDR_PROFILE_VELOCITY, LEN_PROFILE_VELOCITY)
+        if profile_velocity == 0:
+            self.setpoint = goal
+            self.setpoint_velocity = 0.0
+            return
+        max_velocity = profile_velocity * PULSES_PER_S_PER_VELOCITY_UNIT
+        profile_acceleration = self._get(
+            ADDR_PROFILE_ACCELERATION, LEN_PROFILE_ACCELERATION
+        )
+        max_acceleration = (
+            profile_acceleration * PULSES_PER_S2_PER_ACCELERATION_UNIT
+            if profile_acceleration > 0
+            else math.inf
+        )
+
+        remaining = goal - self.setpoint
+        # Fastest velocity that can still stop at the goal
+        target_velocity = math.copysign(
+            min(max_velocity, math.sqrt(2 * max_acceleration * abs(remaining))),
+            remaining,
+        )
+        change = target_velocity - self.setpoint_velocity
+        max_change = max_acceleration * dt
+        self.setpoint_velocity += min(max(change, -max_change), max_change)
+        step = self.setpoint_velocity * dt
+        if abs(step) >= abs(remaining):
+            self.setpoint = goal
+            self.setpoint_velocity = 0.0
+        else:
+            self.setpoint += step
+
+    def _update_present(self):
+        self._set(ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION, round(self.position))
+        self._set(ADDR_POSITION_TRAJ, LEN_POSITION_TRAJ, round(self.setpoint))
+        self._set(
+            ADDR_VELOCITY_TRAJ,
+            LEN_VELOCITY_TRAJ,
+            round(self.setpoint_velocity / PULSES_PER_S_PER_VELOCITY_UNIT),
+        )
+        self._set(
+            ADDR_PRESENT_VELOCITY,
+            LEN_PRESENT_VELOCITY,
+            round(self.velocity / PULSES_PER_S_PER_VELOCITY_UNIT),
+        )
+        self._set(ADDR_PRESENT_CURRENT, LEN_PRESENT_CURRENT, round(self.current))
+        self._set(ADDR_PRESENT_TEMP, LEN_PRESENT_TEMP, round(self.temperature))
+        self._set(ADDR_PRESENT_INPUT_VOLTAGE, LEN_PRESENT_INPUT_VOLTAGE, 50)
+        self.table[ADDR_MOVING] = int(abs(self.velocity) > 1.0)
+
+
+class DynamixelBusEmulator:
+    """A Protocol 2.0 bus of emulated XL330 motors.
+
+    Args:
+        motor_ids: IDs of the motors on the bus.
+        baudrate: Baudrate used to compute the transmission time of packets.
+        latency: Extra delay, in seconds, before each reply reaches the host,
+            e.g. the latency timer of a USB serial adapter.
+        drop_rate: Probability of a motor not replying to an instruction.
+        motor_kwargs: Keyword arguments passed to every EmulatedXL330.
+    """
+
+    def __init__(
+        self,
+        motor_ids=range(1, 12),
+        baudrate=BAUDRATE,
+        latency=0.0,
+        drop_rate=0.0,
+        **motor_kwargs,
+    ):
+        self.motors = {
+            motor_id: EmulatedXL330(motor_id, **motor_kwargs) for motor_id in motor_ids
+        }
+        self.baudrate = baudrate
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.codec = PacketCodec()
+        self._lock = threading.Lock()
+        self._last_step = time.perf_counter()
+
+    def byte_time(self, num_bytes):
+        # 10 bits per byte: start, 8 data and stop bits
+        return num_bytes * 10.0 / self.baudrate
+
+    def step(self):
+        """Advances all motors to the current time."""
+        now = time.perf_counter()
+        dt, self._last_step = now - self._last_step, now
+        for motor in self.motors.values():
+            motor.step(dt)
+
+    def _replies(self, motor_ids):
+        # Motors that answer, in order, after the random reply drops
+        return [
+            self.motors[motor_id]
+            for motor_id in motor_ids
+            if motor_id in self.motors and random.random() >= self.drop_rate
+        ]
+
+    def _status(self, motor, params=b"", error=0):
+        return self.codec.encode(
+            motor.motor_id,
+            INST_STATUS,
+            bytes((error | motor.status_error(),)) + params,
+        )
+
+    def process(self, packet):
+        """Handles one instruction packet.
+
+        Returns:
+            A list of (delay, reply) pairs, where delay is the time between
+            the end of the instruction and the end of the reply.
+        """
+        if len(packet) < 10 or packet[:4] != PACKET_HEADER:
+            return []
+        if self.codec.crc16(packet[:-2]) != int.from_bytes(packet[-2:], "little"):
+            return []
+        dxl_id = packet[PKT_ID]
+        body = self.codec.unstuff(bytes(packet[PKT_INSTRUCTION:-2]))
+        instruction, params = body[0], body[1:]
+
+        with self._lock:
+            self.step()
+            replies = self._process(dxl_id, instruction, params)
+
+        # Replies go out one after the other, each after its return delay
+        timed_replies = []
+        elapsed = 0.0
+        for motor, reply in replies:
+            elapsed += motor.return_delay + self.byte_time(len(reply))
+            timed_replies.append((elapsed + self.latency, reply))
+        return timed_replies
+
+    def _process(self, dxl_id, instruction, params):
+        if instruction in (INST_SYNC_READ, INST_FAST_SYNC_READ):
+            address = int.from_bytes(params[0:2], "little")
+            size = int.from_bytes(params[2:4], "little")
+            motors = self._replies(params[4:])
+            if instruction == INST_SYNC_READ:
+                return [
+                    (motor, self._status(motor, motor.read(address, size)))
+                    for motor in motors
+                ]
+            return self._fast_sync_read(motors, address, size)
+
+        if instruction == INST_SYNC_WRITE:
+            address = int.from_bytes(params[0:2], "little")
+            size = int.from_bytes(params[2:4], "little")
+            for start in range(4, len(params), size + 1):
+                motor = self.motors.get(params[start])
+                if motor is not None:
+                    motor.write(address, params[start + 1 : start + 1 + size])
+            return []
+
+        if instruction == INST_BULK_READ:
+            replies = []
+            for start in range(0, len(params), 5):
+                motor_id = params[start]
+                address = int.from_bytes(params[start + 1 : start + 3], "little")
+                size = int.from_bytes(params[start + 3 : start + 5], "little")
+                for motor in self._replies([motor_id]):
+                    replies.append(
+                        (motor, self._status(motor, motor.read(address, size)))
+                    )
+            return replies
+
+        if instruction == INST_BULK_WRITE:
+            start = 0
+            while start + 5 <= len(params):
+                motor = self.motors.get(params[start])
+                address = int.from_bytes(params[start + 1 : start + 3], "little")
+                size = int.from_bytes(params[start + 3 : start + 5], "little")
+                if motor is not None:
+                    motor.write(address, params[start + 5 : start + 5 + size])
+                start += 5 + size
+            return []
+
+        # Single motor instructions, broadcast ones are not answered
+        motors = self._replies([dxl_id]) if dxl_id != BROADCAST_ID else []
+        if instruction == INST_PING:
+            return [
+                (
+                    motor,
+                    self._status(
+                        motor,
+                        motor.read(ADDR_MODEL_NUMBER, 2) + bytes((FIRMWARE_VERSION,)),
+                    ),
+                )
+                for motor in motors
+            ]
+        if instruction == INST_READ:
+            address = int.from_bytes(params[0:2], "little")
+            size = int.from_bytes(params[2:4], "little")
+            return [
+                (motor, self._status(motor, motor.read(address, size)))
+                for motor in motors
+            ]
+        if instruction == INST_WRITE:
+            address = int.from_bytes(params[0:2], "little")
+            if dxl_id == BROADCAST_ID:
+                for motor in self.motors.values():
+                    motor.write(address, params[2:])
+            return [
+                (motor, self._status(motor, error=motor.write(address, params[2:])))
+                for motor in motors
+            ]
+        if instruction == INST_REBOOT:
+            for motor in motors:
+                motor.reboot()
+            return [(motor, self._status(motor)) for motor in motors]
+        return []
+
+    def _fast_sync_read(self, motors, address, size):
+        # One status packet whose parameters are ERROR ID DATA CRC16 per motor,
+        # the CRC16 of the last motor being the one of the packet
+        if not motors:
+            return []
+        length = 1 + len(motors) * (size + 4)  # INST + segments (last CRC included)
+        packet = (
+            PACKET_HEADER
+            + bytes((BROADCAST_ID,))
+            + length.to_bytes(2, "little")
+            + bytes((INST_STATUS,))
+        )
+        for motor in motors:
+            packet += bytes((motor.status_error(), motor.motor_id)) + motor.read(
+                address, size
+            )
+            packet += self.codec.crc16(packet).to_bytes(2, "little")
+        return [(motors[-1], packet)]
+
+
+# In-process buses shared by every EmulatedPortHandler with the same name
+EMULATED_BUSES = {}
+
+
+def get_emulated_bus(port_name, **bus_kwargs):
+    """Returns the in-process bus served at port_name, creating it if needed."""
+    if port_name not in EMULATED_BUSES:
+        EMULATED_BUSES[port_name] = DynamixelBusEmulator(**bus_kwargs)
+    return EMULATED_BUSES[port_name]
+
+
+class EmulatedPortHandler(dynamixel_sdk.PortHandler):
+    """PortHandler connected to an in-process DynamixelBusEmulator.
+
+    Replies only become readable once their transmission and latency delays
+    have passed, so timings seen by the client follow the emulated bus.
+    """
+
+    def __init__(self, port_name, bus=None):
+        super().__init__(port_name)
+        self.bus = bus if bus is not None else get_emulated_bus(port_name)
+        # (arrival time, bytes) of the replies in flight
+        self._replies = deque()
+        self._buffer = b""
+
+    def setupPort(self, cflag_baud):
+        self.is_open = True
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+        self.clearPort()
+        return True
+
+    def closePort(self):
+        self.is_open = False
+
+    def clearPort(self):
+        self._replies.clear()
+        self._buffer = b""
+
+    def _receive(self):
+        now = time.perf_counter()
+        while self._replies and self._replies[0][0] <= now:
+            self._buffer += self._replies.popleft()[1]
+
+    def getBytesAvailable(self):
+        self._receive()
+        return len(self._buffer)
+
+    def readPort(self, length):
+        self._receive()
+        data, self._buffer = self._buffer[:length], self._buffer[length:]
+        return data
+
+    def writePort(self, packet):
+        packet = bytes(packet)
+        sent = time.perf_counter() + self.bus.byte_time(len(packet))
+        for delay, reply in self.bus.process(packet):
+            self._replies.append((sent + delay, reply))
+        return len(packet)
+
+
+class PtyBusEmulator(threading.Thread):
+    """Serves a DynamixelBusEmulator on a pseudo-terminal.
+
+    Any process can then open port_name, e.g. /dev/pts/3, as if it was the
+    USB serial adapter of a hand.
+    """
+
+    def __init__(self, bus=None):
+        super().__init__(daemon=True)
+        self.bus = bus if bus is not None else DynamixelBusEmulator()
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port_name = os.ttyname(self.slave_fd)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _next_packet(self, buffer):
+        # Returns the first complete packet and the remaining bytes
+        start = buffer.find(PACKET_HEADER)
+        if start < 0:
+            return None, buffer[-3:]
+        buffer = buffer[start:]
+        if len(buffer) < 7:
+            return None, buffer
+        end = 7 + int.from_bytes(buffer[PKT_LENGTH_L : PKT_LENGTH_H + 1], "little")
+        if len(buffer) < end:
+            return None, buffer
+        return buffer[:end], buffer[end:]
+
+    def run(self):
+        buffer = b""
+        while not self._stop_event.is_set():
+            try:
+                buffer += os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            packet, buffer = self._next_packet(buffer)
+            while packet is not None:
+                received = time.perf_counter()
+                for delay, reply in self.bus.process(packet):
+                    wait_time = received + delay - time.perf_counter()
+                    if wait_time > 0:
+                        time.sleep(wait_time)
+                    os.write(self.master_fd, reply)
+                packet, buffer = self._next_packet(buffer)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve an emulated RUKA Dynamixel bus on a pseudo-terminal."
+    )
+    parser.add_argument(
+        "-m",
+        "--motors",
+        default="1,2,3,4,5,6,7,8,9,10,11",
+        help="Comma-separated list of motor IDs.",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency_ms",
+        type=float,
+        default=1.0,
+        help="Extra latency of every reply in milliseconds.",
+    )
+    parser.add_argument(
+        "-d",
+        "--drop_rate",
+        type=float,
+        default=0.0,
+        help="Probability of a motor not replying.",
+    )
+    args = parser.parse_args()
+
+    emulator = PtyBusEmulator(
+        DynamixelBusEmulator(
+            motor_ids=[int(motor) for motor in args.motors.split(",")],
+            latency=args.latency_ms * 1e-3,
+            drop_rate=args.drop_rate,
+        )
+    )
+    emulator.start()
+    print("Emulated Dynamixel bus at {}".format(emulator.port_name))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        emulator.stop()
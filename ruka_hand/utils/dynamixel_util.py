@@ -1,7 +1,10 @@
 import atexit
 import logging
+import threading
 import time
-from typing import Optional, Sequence, Tuple, Union
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 import dynamixel_sdk
 import numpy as np
@@ -9,13 +12,74 @@ import numpy as np
 # Imports the control table addresses and sizes
 # E-manual has descriptions of each data in the control table and value ranges
 # E-manual Link: https://emanual.robotis.com/docs/en/dxl/x/xl330-m288/
+from ruka_hand.utils.bus_profiler import BusProfiler
 from ruka_hand.utils.control_table.control_table import *
+from ruka_hand.utils.motor_recovery import MotorRecovery
 
 # NON-CONTROL TABLE CONTSTANTS
 
 COMM_SUCCESS = 0
+COMM_PORT_BUSY = -1000
+COMM_TX_FAIL = -1001
+COMM_RX_TIMEOUT = -3001
+COMM_RX_CORRUPT = -3002
+# BusProfiler counters incremented for each failed communication result
+COMM_RESULT_COUNTERS = {
+    COMM_PORT_BUSY: "port_busy",
+    COMM_TX_FAIL: "tx_fail",
+    COMM_RX_TIMEOUT: "timeout",
+    COMM_RX_CORRUPT: "crc_error",
+}
+# Status packet field indices
+# HEADER0 HEADER1 HEADER2 RESERVED ID LEN_L LEN_H INST ERROR PARAM...
+PKT_ID = 4
+PKT_LENGTH_L = 5
+PKT_LENGTH_H = 6
+PKT_INSTRUCTION = 7
+PKT_PARAMETER0 = 8
 PROTOCOL_VERSION = 2.0
 BAUDRATE = 2000000
+# Ports served by an in-process emulated bus, see dynamixel_emulator.py
+EMULATOR_PORT_PREFIX = "emulator://"
+
+# Protocol 2.0 packet constants
+PACKET_HEADER = b"\xff\xff\xfd\x00"  # HEADER0 HEADER1 HEADER2 RESERVED
+BROADCAST_ID = 0xFE
+MAX_ID = 0xFC
+INST_SYNC_READ = 0x82
+INST_SYNC_WRITE = 0x83
+INST_FAST_SYNC_READ = 0x8A
+INST_BULK_READ = 0x92
+INST_STATUS = 0x55
+ERRBIT_ALERT = 0x80  # Set in the error of status packets on hardware errors
+STATUS_MIN_LENGTH = 11  # HEADER(4) ID LEN_L LEN_H INST ERROR CRC16_L CRC16_H
+RXPACKET_MAX_LEN = 1024
+
+# Registers mirrored into the indirect data area, in the order of STATE_DTYPE,
+# so that the full motor state is returned by a single sync read
+STATE_REGISTERS = (
+    (ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION),
+    (ADDR_PRESENT_VELOCITY, LEN_PRESENT_VELOCITY),
+    (ADDR_PRESENT_CURRENT, LEN_PRESENT_CURRENT),
+    (ADDR_PRESENT_TEMP, LEN_PRESENT_TEMP),
+    (ADDR_HARDWARE_ERROR, LEN_HARDWARE_ERROR),
+)
+STATE_DTYPE = np.dtype(
+    [
+        ("position", "<i4"),
+        ("velocity", "<i4"),
+        ("current", "<i2"),
+        ("temperature", "u1"),
+        ("hardware_error", "u1"),
+    ]
+)
+LEN_STATE = STATE_DTYPE.itemsize
+
+# Desired value of a register for a group of motors, see apply_config. value is
+# either one value for all motors or one value per motor.
+RegisterSetting = namedtuple(
+    "RegisterSetting", ["motor_ids", "address", "size", "value"]
+)
 
 # Change to log file path if not testing
 logging.basicConfig(level=logging.WARNING)
@@ -39,6 +103,196 @@ def unsigned_to_signed(value: int, size: int) -> int:
     return value
 
 
+def _make_crc_table(polynomial: int = 0x8005) -> Tuple[int, ...]:
+    """Builds the byte-wise lookup table of the Protocol 2.0 CRC16."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ polynomial if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+def _make_word_crc_table(crc_table: Tuple[int, ...]) -> list:
+    """Extends the byte-wise CRC16 table to consume 16 bits per lookup.
+
+    Feeding the word w = crc ^ (b0 << 8 | b1) through the byte-wise update
+    twice only depends on w, so the result is tabulated for all 2^16 words.
+    """
+    table = np.array(crc_table, dtype=np.uint32)
+    words = np.arange(1 << 16, dtype=np.uint32)
+    first = table[words >> 8]
+    return (((first & 0xFF) << 8) ^ table[(first >> 8) ^ (words & 0xFF)]).tolist()
+
+
+CRC_TABLE = _make_crc_table()
+CRC_WORD_TABLE = _make_word_crc_table(CRC_TABLE)
+
+
+class PacketCodec:
+    """Encodes and decodes Protocol 2.0 packets.
+
+    Replaces the packet handling of dynamixel_sdk on the hot path: the CRC
+    uses tables computed once at import, goal arrays are packed with NumPy
+    and byte stuffing works on whole bytes objects instead of element lists.
+    """
+
+    def __init__(self):
+        # Preallocated (ID, value) parameter arrays, per (size, number of motors)
+        self._param_buffers = {}
+
+    @staticmethod
+    def crc16(data: bytes, crc: int = 0) -> int:
+        """Computes the CRC16 of the given bytes, two bytes per lookup."""
+        num_words = len(data) // 2
+        for word in np.frombuffer(data, dtype=">u2", count=num_words).tolist():
+            crc = CRC_WORD_TABLE[crc ^ word]
+        if len(data) % 2:
+            crc = ((crc << 8) & 0xFFFF) ^ CRC_TABLE[(crc >> 8) ^ data[-1]]
+        return crc
+
+    @staticmethod
+    def stuff(data: bytes) -> bytes:
+        """Adds a 0xFD after every FF FF FD in the instruction and parameters."""
+        return data.replace(b"\xff\xff\xfd", b"\xff\xff\xfd\xfd")
+
+    @staticmethod
+    def unstuff(data: bytes) -> bytes:
+        """Removes the byte stuffing added by stuff()."""
+        return data.replace(b"\xff\xff\xfd\xfd", b"\xff\xff\xfd")
+
+    def encode(self, dxl_id: int, instruction: int, params: bytes = b"") -> bytes:
+        """Builds a complete packet with header, length and CRC."""
+        body = self.stuff(bytes((instruction,)) + params)
+        packet = (
+            PACKET_HEADER
+            + bytes((dxl_id,))
+            + (len(body) + 2).to_bytes(2, byteorder="little")
+            + body
+        )
+        return packet + self.crc16(packet).to_bytes(2, byteorder="little")
+
+    def pack_values(
+        self,
+        motor_ids: Sequence[int],
+        values: Sequence[Union[int, float]],
+        size: int,
+    ) -> bytes:
+        """Interleaves motor IDs with little-endian values of the given size."""
+        num_motors = len(motor_ids)
+        if size not in (1, 2, 4):
+            return b"".join(
+                bytes((motor_id,))
+                + (int(value) & ((1 << (8 * size)) - 1)).to_bytes(
+                    size, byteorder="little"
+                )
+                for motor_id, value in zip(motor_ids, values)
+            )
+
+        key = (size, num_motors)
+        if key not in self._param_buffers:
+            self._param_buffers[key] = np.zeros(
+                num_motors, dtype=[("id", "u1"), ("value", "<i{}".format(size))]
+            )
+        params = self._param_buffers[key]
+        params["id"] = motor_ids
+        # Truncate towards zero like int() and wrap around like the registers
+        params["value"] = np.asarray(values[:num_motors], dtype=np.float64).astype(
+            np.int64
+        )
+        return params.tobytes()
+
+    def encode_sync_write(
+        self,
+        motor_ids: Sequence[int],
+        values: Sequence[Union[int, float]],
+        address: int,
+        size: int,
+    ) -> bytes:
+        """Builds a Sync Write packet."""
+        params = (
+            address.to_bytes(2, byteorder="little")
+            + size.to_bytes(2, byteorder="little")
+            + self.pack_values(motor_ids, values, size)
+        )
+        return self.encode(BROADCAST_ID, INST_SYNC_WRITE, params)
+
+    def encode_sync_read(
+        self, motor_ids: Sequence[int], address: int, size: int, fast: bool = False
+    ) -> bytes:
+        """Builds a Sync Read, or Fast Sync Read, packet."""
+        params = (
+            address.to_bytes(2, byteorder="little")
+            + size.to_bytes(2, byteorder="little")
+            + bytes(motor_ids)
+        )
+        instruction = INST_FAST_SYNC_READ if fast else INST_SYNC_READ
+        return self.encode(BROADCAST_ID, instruction, params)
+
+    def encode_bulk_read(self, spans: Sequence[Tuple[int, int, int]]) -> bytes:
+        """Builds a Bulk Read packet of (motor_id, address, size) spans."""
+        params = b"".join(
+            bytes((motor_id,))
+            + address.to_bytes(2, byteorder="little")
+            + size.to_bytes(2, byteorder="little")
+            for motor_id, address, size in spans
+        )
+        return self.encode(BROADCAST_ID, INST_BULK_READ, params)
+
+    def receive_status(self, port_handler, fast: bool = False):
+        """Reads one status packet from the port.
+
+        Mirrors the packet search of dynamixel_sdk's rxPacket: bytes before a
+        header are dropped and the packet timeout set on the port applies.
+
+        Returns:
+            The received packet and the communication result.
+        """
+        max_id = BROADCAST_ID if fast else MAX_ID
+        rxpacket = bytearray()
+        wait_length = STATUS_MIN_LENGTH
+
+        while True:
+            rxpacket += port_handler.readPort(wait_length - len(rxpacket))
+            if len(rxpacket) >= wait_length:
+                start = rxpacket.find(PACKET_HEADER)
+                if start != 0:
+                    # Keep the last bytes in case they are a partial header
+                    del rxpacket[: start if start > 0 else len(rxpacket) - 3]
+                    continue
+
+                length = rxpacket[PKT_LENGTH_L] | (rxpacket[PKT_LENGTH_H] << 8)
+                if (
+                    rxpacket[PKT_ID] > max_id
+                    or length > RXPACKET_MAX_LEN
+                    or rxpacket[PKT_INSTRUCTION] != INST_STATUS
+                ):
+                    del rxpacket[0]
+                    continue
+
+                wait_length = length + PKT_LENGTH_H + 1
+                if len(rxpacket) >= wait_length:
+                    crc = rxpacket[wait_length - 2] | (rxpacket[wait_length - 1] << 8)
+                    if self.crc16(memoryview(rxpacket)[: wait_length - 2]) == crc:
+                        result = COMM_SUCCESS
+                    else:
+                        result = COMM_RX_CORRUPT
+                    break
+
+            if port_handler.isPacketTimeout():
+                result = COMM_RX_TIMEOUT if len(rxpacket) == 0 else COMM_RX_CORRUPT
+                break
+
+        port_handler.is_using = False
+
+        if result == COMM_SUCCESS and not fast:
+            rxpacket[PKT_INSTRUCTION : wait_length - 2] = self.unstuff(
+                bytes(rxpacket[PKT_INSTRUCTION : wait_length - 2])
+            )
+        return rxpacket, result
+
+
 class DynamixelClient:
     """Client for communicating with Dynamixel motors.
 
@@ -53,6 +307,12 @@ class DynamixelClient:
         motor_ids: Sequence[int],
         port: str = "/dev/ttyUSB0",
         lazy_connect: bool = False,
+        indirect_state: bool = False,
+        fast_sync_read: bool = False,
+        native_codec: bool = False,
+        profiler: Optional[BusProfiler] = None,
+        recovery: bool = False,
+        read_timeout: Optional[float] = None,
     ):
         """Initializes a new client.
 
@@ -62,8 +322,24 @@ class DynamixelClient:
                 - Linux: /dev/ttyUSB0
                 - Mac: /dev/tty.usbserial-*
                 - Windows: COM1
+                - Emulator: emulator://<name>, see dynamixel_emulator.py
             lazy_connect: If True, automatically connects when calling a method
                 that requires a connection, if not already connected.
+            indirect_state: If True, maps the state registers to the indirect
+                data area on connect so read_state() takes one transaction.
+            fast_sync_read: If True, the common read calls use Fast Sync Read,
+                falling back to Sync Read if the firmware does not support it.
+            native_codec: If True, sync reads and writes are encoded and
+                decoded with PacketCodec instead of dynamixel_sdk's handler.
+            profiler: If given, the latency and errors of the sync reads and
+                writes are recorded in it.
+            recovery: If True, motors with hardware errors or that stop
+                replying are quarantined and recovered in the background by a
+                MotorRecovery thread, see restore_motor().
+            read_timeout: If given, caps the time in seconds to wait for the
+                status packets of a read. dynamixel_sdk's timeout assumes a
+                16ms latency timer of the USB adapter, so a single lost reply
+                otherwise costs over 34ms.
         """
 
         self.dxl = dynamixel_sdk
@@ -71,12 +347,40 @@ class DynamixelClient:
         self.port_name = port
         self.baudrate = BAUDRATE
         self.lazy_connect = lazy_connect
-        self.port_handler = self.dxl.PortHandler(port)
+        self.indirect_state = indirect_state
+        self.fast_sync_read = fast_sync_read
+        # Unknown until the first Fast Sync Read is attempted
+        self._fast_sync_read_supported = None
+        self.native_codec = native_codec
+        self.codec = PacketCodec()
+        self.profiler = profiler
+        self.use_recovery = recovery
+        self.recovery = None
+        self.read_timeout = read_timeout
+        # Holds bypass_quarantine, set while restore_motor() talks to a
+        # quarantined motor from the recovery thread
+        self._thread_state = threading.local()
+        # Last bytes read from each motor per (address, size), returned for
+        # quarantined motors
+        self._last_raw = {}
+        # Settings of the last apply_config(), restored after reboots
+        self._config = []
+        # Serializes transactions when the client is shared between threads
+        self._bus_lock = threading.RLock()
+        if port.startswith(EMULATOR_PORT_PREFIX):
+            # Imported here as the emulator itself builds on this module
+            from ruka_hand.utils.dynamixel_emulator import EmulatedPortHandler
+
+            self.port_handler = EmulatedPortHandler(port)
+        else:
+            self.port_handler = self.dxl.PortHandler(port)
         self.packet_handler = self.dxl.PacketHandler(PROTOCOL_VERSION)
 
         # GroupSyncWrite instaces to add/remove params for.
         # https://emanual.robotis.com/docs/en/software/dynamixel/dynamixel_sdk/api_reference/python/python_groupsyncwrite/#groupsyncwrite
         self._sync_writers = {}
+        # GroupSyncRead instances, cached per (address, size) like the writers.
+        self._sync_readers = {}
 
         self.OPEN_CLIENTS.add(self)
 
@@ -112,6 +416,13 @@ class DynamixelClient:
                 ).format(self.baudrate)
             )
 
+        if self.indirect_state:
+            self.configure_indirect_state()
+
+        if self.use_recovery:
+            self.recovery = MotorRecovery(self)
+            self.recovery.start()
+
     def disconnect(self):
         """Disconnects from the Dynamixel device."""
         if not self.is_connected:
@@ -119,12 +430,32 @@ class DynamixelClient:
         if self.port_handler.is_using:
             logging.error("Port handler in use; cannot disconnect.")
             return
-        # Ensure motors are disabled at the end.
-        self.set_torque_enabled(False)
+        # Stopped first so that it cannot enable the torque again, which also
+        # ends the quarantine of the motors it was recovering
+        if self.recovery is not None:
+            self.recovery.stop()
+            self.recovery = None
+        # Ensure all motors are disabled at the end.
+        self.set_torque_enabled(False, retries=3)
         self.port_handler.closePort()
         if self in self.OPEN_CLIENTS:
             self.OPEN_CLIENTS.remove(self)
 
+    @property
+    def _bypassing_quarantine(self) -> bool:
+        return getattr(self._thread_state, "bypass_quarantine", False)
+
+    @property
+    def quarantined(self):
+        """IDs of the motors currently left out of the transactions."""
+        if self.recovery is None or self._bypassing_quarantine:
+            return set()
+        return self.recovery.quarantined
+
+    def _live_ids(self, motor_ids: Sequence[int]):
+        quarantined = self.quarantined
+        return [motor_id for motor_id in motor_ids if motor_id not in quarantined]
+
     def check_connected(self):
         """Ensures the robot is connected."""
         if self.lazy_connect and not self.is_connected:
@@ -144,9 +475,10 @@ class DynamixelClient:
         remaining_ids = self.motor_ids
         while remaining_ids:
             for dxl_id in remaining_ids:
-                dxl_comm_result, dxl_error = self.packet_handler.reboot(
-                    self.port_handler, dxl_id
-                )
+                with self._bus_lock:
+                    dxl_comm_result, dxl_error = self.packet_handler.reboot(
+                        self.port_handler, dxl_id
+                    )
                 if dxl_comm_result != COMM_SUCCESS:
                     logging.error(
                         "%s" % self.packet_handler.getTxRxResult(dxl_comm_result)
@@ -173,6 +505,7 @@ class DynamixelClient:
         context: Optional[str] = None,
     ):
         """Handles the result from a communication request."""
+        self._count_comm_result(comm_result)
         error_message = None
         if comm_result != COMM_SUCCESS:
             error_message = self.packet_handler.getTxRxResult(comm_result)
@@ -187,44 +520,74 @@ class DynamixelClient:
             return False
         return True
 
+    def _count_comm_result(self, comm_result: int):
+        if self.profiler is not None and comm_result != COMM_SUCCESS:
+            self.profiler.count(COMM_RESULT_COUNTERS.get(comm_result, "comm_error"))
+
+    def _record_latency(self, operation: str, address: int, start: float):
+        if self.profiler is not None:
+            self.profiler.record(operation, address, time.perf_counter() - start)
+
+    def record_retry(self, context: str):
+        """Counts a retry of the caller, e.g. after a read returned None."""
+        if self.profiler is not None:
+            self.profiler.count("retry.{}".format(context))
+
     def set_torque_enabled(
         self, enabled: bool, retries: int = -1, retry_interval: float = 0.25
     ):
         """Sets whether torque is enabled for the motors.
 
+        All motors are written with one Sync Write, which is read back to
+        reboot and retry the motors that did not take the value.
+
         Args:
             enabled: Whether to engage or disengage the motors.
             retries: The number of times to retry. If this is <0, will retry
                 forever.
             retry_interval: The number of seconds to wait between retries.
         """
-        remaining_ids = list(self.motor_ids)
+        value = int(enabled)
+        remaining_ids = self._live_ids(self.motor_ids)
         while remaining_ids:
-
-            for motor_id in remaining_ids:
-
-                dxl_comm_result, dxl_error = self.packet_handler.write1ByteTxRx(
-                    self.port_handler, motor_id, ADDR_TORQUE_ENABLE, int(enabled)
-                )
-                if dxl_comm_result != COMM_SUCCESS:
-                    print("%s" % self.packet_handler.getTxRxResult(dxl_comm_result))
-                    self.packet_handler.reboot(self.port_handler, motor_id)
-                elif dxl_error != 0:
-                    logging.error(
-                        "%s" % self.packet_handler.getRxPacketError(dxl_error)
-                    )
-                    self.packet_handler.reboot(self.port_handler, motor_id)
-                else:
-                    remaining_ids.remove(motor_id)
+            # Write all motors at once and read back which ones took the value
+            self.sync_write(
+                remaining_ids,
+                [value] * len(remaining_ids),
+                ADDR_TORQUE_ENABLE,
+                LEN_TORQUE_ENABLE,
+            )
+            torque = self.sync_read(
+                remaining_ids, ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE
+            )
+            for motor_id, motor_torque in zip(remaining_ids, torque):
+                if motor_torque == value:
                     logging.info(
                         "Dynamixel#%d has been successfully connected" % motor_id
                     )
+            remaining_ids = [
+                motor_id
+                for motor_id, motor_torque in zip(remaining_ids, torque)
+                if motor_torque != value
+            ]
             if remaining_ids:
+                self.record_retry("set_torque_enabled")
                 logging.error(
                     "Could not set torque %s for IDs: %s",
                     "enabled" if enabled else "disabled",
                     str(remaining_ids),
                 )
+                if self.recovery is not None:
+                    # Recovered in the background instead of retrying here
+                    for motor_id in remaining_ids:
+                        self.recovery.quarantine(motor_id, "torque not set")
+                    break
+                # Clears hardware errors, which block enabling the torque
+                with self._bus_lock:
+                    for motor_id in remaining_ids:
+                        self.packet_handler.reboot(self.port_handler, motor_id)
+            else:
+                break
 
             if retries == 0:
                 break
@@ -246,81 +609,650 @@ class DynamixelClient:
             address: The control table address to write to.
             size: The size of the control table value being written to.
         """
-        self.check_connected()
+        quarantined = self.quarantined
+        if quarantined:
+            values = [
+                value
+                for motor_id, value in zip(motor_ids, values)
+                if motor_id not in quarantined
+            ]
+            motor_ids = [
+                motor_id for motor_id in motor_ids if motor_id not in quarantined
+            ][: len(values)]
+            if not motor_ids:
+                return
+
+        with self._bus_lock:
+            self.check_connected()
+            start = time.perf_counter()
+            if self.native_codec:
+                packet = self.codec.encode_sync_write(motor_ids, values, address, size)
+                comm_result = self._transmit(packet)
+                self.port_handler.is_using = False
+                self.handle_packet_result(comm_result, context="sync_write")
+                self._record_latency("sync_write", address, start)
+                return
+
+            key = (address, size)
+            if key not in self._sync_writers:
+                self._sync_writers[key] = self.dxl.GroupSyncWrite(
+                    self.port_handler, self.packet_handler, address, size
+                )
+            sync_writer = self._sync_writers[key]
+            sync_writer.clearParam()
+
+            errored_ids = []
+            for motor_id, desired_pos in zip(motor_ids, values):
+                value = int(desired_pos)
+                value = value.to_bytes(size, byteorder="little")
+                success = sync_writer.addParam(motor_id, value)
+                if not success:
+                    errored_ids.append(motor_id)
+            if errored_ids:
+                logging.error("Sync write failed for: %s", str(errored_ids))
+
+            comm_result = sync_writer.txPacket()
+            self.handle_packet_result(comm_result, context="sync_write")
+            self._record_latency("sync_write", address, start)
+
+    def _get_sync_reader(self, motor_ids: Sequence[int], address: int, size: int):
+        """Returns the cached GroupSyncRead for (address, size).
+
+        The reader's parameters are only rebuilt when the requested motor IDs
+        change, so repeated reads of the same register skip the setup cost.
+        """
         key = (address, size)
-        if key not in self._sync_writers:
-            self._sync_writers[key] = self.dxl.GroupSyncWrite(
+        if key not in self._sync_readers:
+            self._sync_readers[key] = self.dxl.GroupSyncRead(
                 self.port_handler, self.packet_handler, address, size
             )
-        sync_writer = self._sync_writers[key]
-        sync_writer.clearParam()
-
-        errored_ids = []
-        for motor_id, desired_pos in zip(motor_ids, values):
-            value = int(desired_pos)
-            value = value.to_bytes(size, byteorder="little")
-            success = sync_writer.addParam(motor_id, value)
-            if not success:
-                errored_ids.append(motor_id)
-        if errored_ids:
-            logging.error("Sync write failed for: %s", str(errored_ids))
+        sync_reader = self._sync_readers[key]
+
+        if list(sync_reader.data_dict.keys()) != list(motor_ids):
+            sync_reader.clearParam()
+            errored_ids = []
+            for motor_id in motor_ids:
+                success = sync_reader.addParam(motor_id)
+                if not success:
+                    errored_ids.append(motor_id)
+            if errored_ids:
+                logging.error("Sync read failed for: %s", str(errored_ids))
+        return sync_reader
+
+    def _transmit(self, packet: bytes) -> int:
+        """Writes a packet encoded by the codec to the port."""
+        if self.port_handler.is_using:
+            return COMM_PORT_BUSY
+        self.port_handler.is_using = True
+
+        self.port_handler.clearPort()
+        if self.port_handler.writePort(packet) != len(packet):
+            self.port_handler.is_using = False
+            return COMM_TX_FAIL
+        return COMM_SUCCESS
+
+    def _transmit_sync_read(self, sync_reader, fast: bool = False) -> int:
+        """Transmits the Sync Read, or Fast Sync Read, of a cached reader."""
+        if not self.native_codec:
+            if fast:
+                comm_result = sync_reader.fastSyncReadTxPacket()
+            else:
+                comm_result = sync_reader.txPacket()
+            self._cap_read_timeout()
+            return comm_result
+
+        motor_ids = list(sync_reader.data_dict.keys())
+        packet = self.codec.encode_sync_read(
+            motor_ids, sync_reader.start_address, sync_reader.data_length, fast=fast
+        )
+        comm_result = self._transmit(packet)
+        if comm_result == COMM_SUCCESS:
+            self.port_handler.setPacketTimeout(
+                (STATUS_MIN_LENGTH + sync_reader.data_length) * len(motor_ids)
+            )
+            self._cap_read_timeout()
+        return comm_result
+
+    def _cap_read_timeout(self):
+        """Lowers the packet timeout set for a read to read_timeout."""
+        if (
+            self.read_timeout is not None
+            and self.port_handler.packet_timeout > self.read_timeout * 1000.0
+        ):
+            self.port_handler.setPacketTimeoutMillis(self.read_timeout * 1000.0)
+
+    def _receive_status(self, fast: bool = False):
+        """Reads one status packet from the port."""
+        if self.native_codec:
+            return self.codec.receive_status(self.port_handler, fast=fast)
+        return self.packet_handler.rxPacket(self.port_handler, fast)
+
+    def _collect_status(self, sizes: Dict[int, int]):
+        """Collects the status packet of each motor after a read instruction.
+
+        Packets are matched by ID as they arrive, so a motor that does not
+        reply only drops its own data.
+
+        Args:
+            sizes: The size of the data expected from each motor ID.
+        """
+        received = {}
+        while len(received) < len(sizes):
+            rxpacket, comm_result = self._receive_status()
+            if comm_result != COMM_SUCCESS:
+                self._count_comm_result(comm_result)
+                break
+            motor_id = rxpacket[PKT_ID]
+            if self.recovery is not None and rxpacket[PKT_PARAMETER0] & ERRBIT_ALERT:
+                self.recovery.report_alert(motor_id)
+            if motor_id in sizes:
+                received[motor_id] = rxpacket[
+                    PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + sizes[motor_id]
+                ]
+        return received
+
+    def _receive_sync_read(self, sync_reader, motor_ids: Sequence[int], size: int):
+        """Transmits a Sync Read and collects the status packet of each motor."""
+        comm_result = self._transmit_sync_read(sync_reader)
+        if not self.handle_packet_result(comm_result, context="sync_read"):
+            return {}
+        return self._collect_status({motor_id: size for motor_id in motor_ids})
+
+    def _receive_fast_sync_read(self, sync_reader, size: int):
+        """Transmits a Fast Sync Read and splits its single status packet.
+
+        Returns:
+            A dict from motor ID to its data, or None if no valid status
+            packet arrived.
+        """
+        comm_result = self._transmit_sync_read(sync_reader, fast=True)
+        if not self.handle_packet_result(comm_result, context="fast_sync_read"):
+            return None
+
+        rxpacket, comm_result = self._receive_status(fast=True)
+        if comm_result != COMM_SUCCESS:
+            self._count_comm_result(comm_result)
+            return None
+
+        # The parameters are ERROR ID DATA CRC16 for every motor, where the
+        # last CRC16 is the one of the whole packet
+        received = {}
+        segment_length = size + 4
+        for start in range(
+            PKT_PARAMETER0, len(rxpacket) - segment_length + 1, segment_length
+        ):
+            motor_id = rxpacket[start + 1]
+            if self.recovery is not None and rxpacket[start] & ERRBIT_ALERT:
+                self.recovery.report_alert(motor_id)
+            if motor_id in sync_reader.data_dict:
+                received[motor_id] = rxpacket[start + 2 : start + 2 + size]
+        return received
+
+    def _sync_read_raw(
+        self, motor_ids: Sequence[int], address: int, size: int, fast: bool = False
+    ):
+        """Reads raw bytes from a group of motors in a single transaction.
+
+        Quarantined motors are not read, the last bytes read from them are
+        returned instead.
+
+        Returns:
+            A list with the received bytes for each motor, or None for the
+            motors that did not reply.
+        """
+        motor_ids = list(motor_ids)
+        live_ids = self._live_ids(motor_ids)
+        received = {}
+        if live_ids:
+            received = self._receive_sync_read_raw(live_ids, address, size, fast)
+
+        if self.recovery is not None and not self._bypassing_quarantine:
+            self.recovery.report_read(
+                list(received.keys()),
+                [motor_id for motor_id in live_ids if motor_id not in received],
+            )
+            last_raw = self._last_raw.setdefault((address, size), {})
+            last_raw.update(received)
+            for motor_id in motor_ids:
+                if motor_id not in received and motor_id not in live_ids:
+                    received[motor_id] = last_raw.get(motor_id)
+        return [received.get(motor_id) for motor_id in motor_ids]
+
+    def _receive_sync_read_raw(
+        self, motor_ids: Sequence[int], address: int, size: int, fast: bool
+    ):
+        """Runs the Sync Read, or Fast Sync Read, of _sync_read_raw().
 
-        comm_result = sync_writer.txPacket()
-        self.handle_packet_result(comm_result, context="sync_write")
+        Returns:
+            A dict from motor ID to the bytes received from it.
+        """
+        with self._bus_lock:
+            self.check_connected()
+            sync_reader = self._get_sync_reader(motor_ids, address, size)
+            start = time.perf_counter()
+
+            received = None
+            if fast and self._fast_sync_read_supported is not False:
+                received = self._receive_fast_sync_read(sync_reader, size)
+                if self._fast_sync_read_supported is None:
+                    # The first Fast Sync Read tells whether the firmware supports it
+                    self._fast_sync_read_supported = received is not None
+                    if received is None:
+                        logging.warning(
+                            "Fast Sync Read is not supported, using Sync Read."
+                        )
+                elif received is None:
+                    received = {}
+            operation = "fast_sync_read"
+            if received is None:
+                operation = "sync_read"
+                received = self._receive_sync_read(sync_reader, motor_ids, size)
+            self._record_latency(operation, address, start)
+
+            self._check_received(motor_ids, received, context="Sync read")
+            return received
+
+    def _check_received(self, motor_ids: Sequence[int], received, context: str):
+        """Logs and counts the motors missing from a read."""
+        errored_ids = [motor_id for motor_id in motor_ids if motor_id not in received]
+        if errored_ids:
+            if self.profiler is not None:
+                self.profiler.count("incomplete_read")
+                self.profiler.count("missing_reply", len(errored_ids))
+            logging.error("%s data is unavailable for: %s", context, str(errored_ids))
 
-    def sync_read(self, motor_ids: Sequence[int], address: int, size: int):
+    def sync_read(
+        self, motor_ids: Sequence[int], address: int, size: int, fast: bool = False
+    ):
         """Reads data from a group of motors
 
+        All motors are read with a single Sync Read transaction.
+
         Args:
             motor_ids: The motor IDs to read from
             address: The data's address in the control table to read from
             size: The length of the data being read
+            fast: If True, uses Fast Sync Read when the firmware supports it,
+                so that all motors reply in one status packet.
+        """
+        return [
+            None if data is None else int.from_bytes(bytes(data), byteorder="little")
+            for data in self._sync_read_raw(motor_ids, address, size, fast=fast)
+        ]
+
+    def _transmit_bulk_read(self, spans: Sequence[Tuple[int, int, int]]) -> int:
+        """Transmits a Bulk Read of (motor_id, address, size) spans."""
+        if not self.native_codec:
+            params = [
+                byte
+                for motor_id, address, size in spans
+                for byte in bytes((motor_id,))
+                + address.to_bytes(2, byteorder="little")
+                + size.to_bytes(2, byteorder="little")
+            ]
+            comm_result = self.packet_handler.bulkReadTx(
+                self.port_handler, params, len(params), False
+            )
+            self._cap_read_timeout()
+            return comm_result
+
+        comm_result = self._transmit(self.codec.encode_bulk_read(spans))
+        if comm_result == COMM_SUCCESS:
+            self.port_handler.setPacketTimeout(
+                sum(STATUS_MIN_LENGTH + size for _, _, size in spans)
+            )
+            self._cap_read_timeout()
+        return comm_result
+
+    def bulk_read(self, specs: Sequence[Tuple[int, int, int]]):
+        """Reads (motor_id, address, size) specs in a single Bulk Read.
+
+        A Bulk Read returns one span per motor, so the specs of each motor are
+        merged into the span covering all of them and sliced out of its reply.
+
+        Returns:
+            A list with the received bytes for each spec, or None for the
+            specs of the motors that did not reply or are quarantined.
+        """
+        quarantined = self.quarantined
+        spans = {}
+        for motor_id, address, size in specs:
+            if motor_id in quarantined:
+                continue
+            start, end = spans.get(motor_id, (address, address + size))
+            spans[motor_id] = (min(start, address), max(end, address + size))
+        if not spans:
+            return [None] * len(specs)
+
+        with self._bus_lock:
+            self.check_connected()
+            start_time = time.perf_counter()
+            comm_result = self._transmit_bulk_read(
+                [
+                    (motor_id, start, end - start)
+                    for motor_id, (start, end) in spans.items()
+                ]
+            )
+            received = {}
+            if self.handle_packet_result(comm_result, context="bulk_read"):
+                received = self._collect_status(
+                    {motor_id: end - start for motor_id, (start, end) in spans.items()}
+                )
+            self._record_latency(
+                "bulk_read", min(start for start, _ in spans.values()), start_time
+            )
+            self._check_received(list(spans.keys()), received, context="Bulk read")
+
+        raw_data = []
+        for motor_id, address, size in specs:
+            data = received.get(motor_id)
+            if data is not None:
+                offset = address - spans[motor_id][0]
+                data = data[offset : offset + size]
+            raw_data.append(data)
+        return raw_data
+
+    def read_registers(
+        self,
+        names: Sequence[str],
+        motor_ids: Optional[Sequence[int]] = None,
+        scaled: bool = False,
+    ):
+        """Reads registers by their name in CONTROL_TABLE with a single Bulk Read.
+
+        Args:
+            names: Data names of the registers, e.g. "Present Position".
+            motor_ids: The motor IDs to read from, all motors by default.
+            scaled: If True, values are multiplied by the unit scale of their
+                register, e.g. rev/min for "Present Velocity".
+
+        Returns:
+            A dict from register name to the decoded value of each motor,
+            signed for the signed registers, or None for the motors that did
+            not reply.
         """
-        if len(motor_ids) > 3:
-            bulk_data = self.sync_read(motor_ids[:3], address, size) + self.sync_read(
-                motor_ids[3:], address, size
+        motor_ids = self.motor_ids if motor_ids is None else list(motor_ids)
+        registers = [CONTROL_TABLE[name] for name in names]
+        specs = [
+            (motor_id, register.address, register.size)
+            for register in registers
+            for motor_id in motor_ids
+        ]
+        raw_data = self.bulk_read(specs)
+
+        values = {}
+        for index, register in enumerate(registers):
+            register_data = raw_data[
+                index * len(motor_ids) : (index + 1) * len(motor_ids)
+            ]
+            received = [data for data in register_data if data is not None]
+            decoded = np.frombuffer(
+                b"".join(bytes(data) for data in received), dtype=register.dtype
             )
-            return bulk_data
+            if scaled:
+                decoded = decoded * register.unit_scale
+            decoded = iter(decoded.tolist())
+            values[register.name] = [
+                None if data is None else next(decoded) for data in register_data
+            ]
+        return values
+
+    def configure_indirect_state(self):
+        """Maps STATE_REGISTERS byte by byte to the indirect data area.
+
+        The mapping is read back afterwards; if any motor did not take it,
+        read_state() falls back to reading each register separately.
+        """
         self.check_connected()
-        sync_reader = self.dxl.GroupSyncRead(
-            self.port_handler, self.packet_handler, address, size
+        self.indirect_state = self._write_indirect_state(self.motor_ids)
+        if not self.indirect_state:
+            logging.warning(
+                "Could not map the state to the indirect address area, "
+                "reading state registers separately."
+            )
+        return self.indirect_state
+
+    def _write_indirect_state(self, motor_ids: Sequence[int]) -> bool:
+        """Writes the indirect mapping and returns whether all motors took it."""
+        indirect_addresses = [
+            address + offset
+            for address, size in STATE_REGISTERS
+            for offset in range(size)
+        ]
+        assert len(indirect_addresses) <= NUM_INDIRECT_ENTRIES
+
+        size = len(indirect_addresses) * LEN_INDIRECT_ADDRESS
+        block = b"".join(
+            address.to_bytes(LEN_INDIRECT_ADDRESS, byteorder="little")
+            for address in indirect_addresses
+        )
+        self.sync_write(
+            motor_ids,
+            [int.from_bytes(block, byteorder="little")] * len(motor_ids),
+            ADDR_INDIRECT_ADDRESS_1,
+            size,
         )
 
-        errored_ids = []
-        for motor_id in motor_ids:
-            success = sync_reader.addParam(motor_id)
-            if not success:
-                errored_ids.append(motor_id)
-        if errored_ids:
-            logging.error("Sync write failed for: %s", str(errored_ids))
-
-        # Transmit and receive packet and handle result
-        comm_result = sync_reader.txRxPacket()
-        self.handle_packet_result(comm_result, context="sync_write")
-
-        # Checks whether there is available data in the data storage for each motor
-        bulk_data = []
-        errored_ids = []
-        for motor_id in motor_ids:
-            data = None
-            available = sync_reader.isAvailable(motor_id, address, size)
-            if not available:
-                errored_ids.append(motor_id)
-            # If available then read it and add it to the bulk data
-            else:
-                data = sync_reader.getData(motor_id, address, size)
-            bulk_data.append(data)
-        if errored_ids:
-            logging.error("Bulk read data is unavailable for: %s", str(errored_ids))
+        written = self._sync_read_raw(motor_ids, ADDR_INDIRECT_ADDRESS_1, size)
+        return all(data is not None and bytes(data) == block for data in written)
+
+    def apply_config(
+        self,
+        settings: Sequence[RegisterSetting],
+        motor_ids: Optional[Sequence[int]] = None,
+    ) -> int:
+        """Writes a motor configuration, skipping values that are already set.
 
-        sync_reader.clearParam()
-        return bulk_data
+        The current values of all configured registers are read with a single
+        Sync Read and only the motors whose value differs are written. Torque
+        is disabled only for the motors that need an EEPROM write.
+
+        Args:
+            settings: RegisterSettings applied in order, so later settings
+                override earlier ones for the same register and motor.
+            motor_ids: Only configures these motors if given. Otherwise the
+                settings are kept to be restored after motor reboots.
+
+        Returns:
+            The number of Sync Writes that were needed.
+        """
+        if motor_ids is None:
+            motor_ids = self.motor_ids
+            self._config = list(settings)
+
+        # Desired unsigned value per register and motor
+        desired = {}
+        for setting in settings:
+            values = np.broadcast_to(setting.value, (len(setting.motor_ids),))
+            registers = desired.setdefault((setting.address, setting.size), {})
+            for motor_id, value in zip(setting.motor_ids, values):
+                if motor_id in motor_ids:
+                    registers[motor_id] = int(value) & ((1 << (8 * setting.size)) - 1)
+        if not desired:
+            return 0
+
+        # One span covering the configured registers and the torque enable
+        start = min(min(address for address, _ in desired), ADDR_TORQUE_ENABLE)
+        end = max(
+            max(address + size for address, size in desired),
+            ADDR_TORQUE_ENABLE + LEN_TORQUE_ENABLE,
+        )
+        span = dict(zip(motor_ids, self._sync_read_raw(motor_ids, start, end - start)))
+
+        def current_value(motor_id, address, size):
+            data = span[motor_id]
+            if data is None:
+                return None
+            return int.from_bytes(
+                bytes(data[address - start : address - start + size]),
+                byteorder="little",
+            )
+
+        writes = []
+        for (address, size), registers in sorted(desired.items()):
+            changed = {
+                motor_id: value
+                for motor_id, value in registers.items()
+                if current_value(motor_id, address, size) != value
+            }
+            if changed:
+                writes.append((address, size, changed))
+
+        # The EEPROM area is only writable with torque disabled
+        eeprom_ids = {
+            motor_id
+            for address, _, changed in writes
+            if address < ADDR_TORQUE_ENABLE
+            for motor_id in changed
+        }
+        torque_ids = [
+            motor_id
+            for motor_id in motor_ids
+            if motor_id in eeprom_ids
+            and current_value(motor_id, ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE) != 0
+        ]
+        if torque_ids:
+            self.sync_write(
+                torque_ids,
+                [0] * len(torque_ids),
+                ADDR_TORQUE_ENABLE,
+                LEN_TORQUE_ENABLE,
+            )
+
+        for address, size, changed in writes:
+            self.sync_write(list(changed.keys()), list(changed.values()), address, size)
+        logging.info(
+            "Motor configuration needed %d of %d register writes",
+            len(writes),
+            len(desired),
+        )
+        return len(writes)
+
+    def restore_motor(
+        self, motor_id: int, reboot_time: float = 0.5, cooldown_margin: int = 5
+    ) -> bool:
+        """Reboots a motor and restores its configuration and torque.
+
+        Rebooting clears hardware errors but resets the RAM area, so the
+        indirect mapping and the settings of the last apply_config() are
+        written again and the goal is set to the present position before the
+        torque is enabled. A motor at or above its Temperature Limit minus
+        cooldown_margin is not rebooted, as it would overheat again right away.
+        Called by the MotorRecovery thread.
+
+        Returns:
+            Whether the motor is back with its torque enabled.
+        """
+        motor_ids = [motor_id]
+        self._thread_state.bypass_quarantine = True
+        try:
+            temperature = self.sync_read(
+                motor_ids, ADDR_PRESENT_TEMP, LEN_PRESENT_TEMP
+            )[0]
+            temp_limit = self.sync_read(motor_ids, ADDR_TEMP_LIMIT, LEN_TEMP_LIMIT)[0]
+            if (
+                temperature is not None
+                and temp_limit is not None
+                and temperature > temp_limit - cooldown_margin
+            ):
+                logging.warning(
+                    "Dynamixel#%d is at %d C, waiting for it to cool below %d C",
+                    motor_id,
+                    temperature,
+                    temp_limit - cooldown_margin,
+                )
+                return False
+
+            with self._bus_lock:
+                comm_result, _ = self.packet_handler.reboot(self.port_handler, motor_id)
+            if comm_result != COMM_SUCCESS:
+                return False
+            # The bus stays free for the other motors while this one boots
+            time.sleep(reboot_time)
+
+            with self._bus_lock:
+                if self.indirect_state and not self._write_indirect_state(motor_ids):
+                    return False
+                self.apply_config(self._config, motor_ids=motor_ids)
+
+                present_pos = self._sync_read_raw(
+                    motor_ids, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION
+                )[0]
+                hardware_error = self.sync_read(
+                    motor_ids, ADDR_HARDWARE_ERROR, LEN_HARDWARE_ERROR
+                )[0]
+                if present_pos is None or hardware_error != 0:
+                    return False
+                self.sync_write(
+                    motor_ids,
+                    [int.from_bytes(bytes(present_pos), byteorder="little")],
+                    ADDR_GOAL_POSITION,
+                    LEN_GOAL_POSITION,
+                )
+                self.sync_write(motor_ids, [1], ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE)
+                torque = self.sync_read(
+                    motor_ids, ADDR_TORQUE_ENABLE, LEN_TORQUE_ENABLE
+                )
+                return torque[0] == 1
+        finally:
+            self._thread_state.bypass_quarantine = False
+
+    def read_state(self):
+        """Reads position, velocity, current, temperature and hardware error.
+
+        Returns:
+            A structured array with STATE_DTYPE holding one record per motor,
+            or None if any motor did not reply.
+        """
+        state, received = self.read_state_partial()
+        return state if received.all() else None
+
+    def read_state_partial(self):
+        """Reads the state like read_state(), keeping the motors that replied.
+
+        Returns:
+            A structured array with STATE_DTYPE holding one record per motor,
+            zero for the motors that did not reply, and a boolean mask of the
+            motors that replied.
+        """
+        state = np.zeros(len(self.motor_ids), dtype=STATE_DTYPE)
+        if self.indirect_state:
+            raw_data = self._sync_read_raw(
+                self.motor_ids,
+                ADDR_INDIRECT_DATA_1,
+                LEN_STATE,
+                fast=self.fast_sync_read,
+            )
+            received = np.array([data is not None for data in raw_data])
+            if received.any():
+                state[received] = np.frombuffer(
+                    b"".join(bytes(data) for data in raw_data if data is not None),
+                    dtype=STATE_DTYPE,
+                )
+            return state, received
+
+        received = np.ones(len(self.motor_ids), dtype=bool)
+        for name, (address, size) in zip(STATE_DTYPE.names, STATE_REGISTERS):
+            bulk_data = self.sync_read(
+                self.motor_ids, address, size, fast=self.fast_sync_read
+            )
+            for index, value in enumerate(bulk_data):
+                if value is None:
+                    received[index] = False
+                    continue
+                if STATE_DTYPE[name].kind == "i":
+                    value = unsigned_to_signed(value, size)
+                state[name][index] = value
+        return state, received
 
     # Common read calls
 
     def read_pos(self):
         return self.sync_read(
-            self.motor_ids, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION
+            self.motor_ids,
+            ADDR_PRESENT_POSITION,
+            LEN_PRESENT_POSITION,
+            fast=self.fast_sync_read,
         )
 
     def read_goal_pos(self):
@@ -328,17 +1260,22 @@ class DynamixelClient:
 
     def read_cur(self):
         bulk_data = self.sync_read(
-            self.motor_ids, ADDR_PRESENT_CURRENT, LEN_PRESENT_CURRENT
+            self.motor_ids,
+            ADDR_PRESENT_CURRENT,
+            LEN_PRESENT_CURRENT,
+            fast=self.fast_sync_read,
         )
-        # print(f"bulk_data: {bulk_data}")
-        for i in range(len(bulk_data)):
-            value = bulk_data[i]
-            bulk_data[i] = value - 65536 if value >= 32768 else value
-        return bulk_data
+        return [
+            None if value is None else unsigned_to_signed(value, LEN_PRESENT_CURRENT)
+            for value in bulk_data
+        ]
 
     def read_vel(self):
         return self.sync_read(
-            self.motor_ids, ADDR_PRESENT_VELOCITY, LEN_PRESENT_VELOCITY
+            self.motor_ids,
+            ADDR_PRESENT_VELOCITY,
+            LEN_PRESENT_VELOCITY,
+            fast=self.fast_sync_read,
         )
 
     # Common write calls
@@ -349,9 +1286,10 @@ class DynamixelClient:
         )
 
     def set_pos_indv(self, motor_id, value):
-        dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
-            self.port_handler, motor_id, ADDR_GOAL_POSITION, value
-        )
+        with self._bus_lock:
+            dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
+                self.port_handler, motor_id, ADDR_GOAL_POSITION, value
+            )
         if dxl_comm_result != COMM_SUCCESS:
             logging.error("%s" % self.packet_handler.getTxRxResult(dxl_comm_result))
         elif dxl_error != 0:
@@ -362,9 +1300,10 @@ class DynamixelClient:
             )
 
     def single_write(self, motor_id, value, addr):
-        dxl_comm_result, dxl_error = self.packet_handler.write2ByteTxRx(
-            self.port_handler, motor_id, addr, value
-        )
+        with self._bus_lock:
+            dxl_comm_result, dxl_error = self.packet_handler.write2ByteTxRx(
+                self.port_handler, motor_id, addr, value
+            )
 
         print(f"dxl_comm_result: {dxl_comm_result}, dxl_error: {dxl_error}")
         if dxl_comm_result != COMM_SUCCESS:
@@ -378,9 +1317,10 @@ class DynamixelClient:
 
     def single_read(self, motor_id, addr):
 
-        value, result, error = self.packet_handler.read2ByteTxRx(
-            self.port_handler, motor_id, addr
-        )
+        with self._bus_lock:
+            value, result, error = self.packet_handler.read2ByteTxRx(
+                self.port_handler, motor_id, addr
+            )
         if result != COMM_SUCCESS:
             print(
                 f"Failed to read at address {addr}: {self.packet_handler.getTxRxResult(result)}"
@@ -394,9 +1334,10 @@ class DynamixelClient:
 
     def read_single_cur(self, motor_id):
         # Read the 2-byte value from the specified address
-        value, result, error = self.packet_handler.read2ByteTxRx(
-            self.port_handler, motor_id, ADDR_PRESENT_CURRENT
-        )
+        with self._bus_lock:
+            value, result, error = self.packet_handler.read2ByteTxRx(
+                self.port_handler, motor_id, ADDR_PRESENT_CURRENT
+            )
         if result != COMM_SUCCESS:
             print(
                 f"Failed to read at address {ADDR_PRESENT_CURRENT}: {self.packet_handler.getTxRxResult(result)}"
@@ -427,6 +1368,264 @@ class DynamixelClient:
         self.disconnect()
 
 
+class ShardedDynamixelClient:
+    """Client for motors spread over several serial ports.
+
+    Each port gets its own DynamixelClient and the transactions of all ports
+    run concurrently in worker threads, so the bus time of a call is the one
+    of the largest shard instead of the sum over all motors. Results are
+    merged back in the order of motor_ids, which keeps the interface of
+    DynamixelClient.
+    """
+
+    def __init__(
+        self,
+        motor_ids: Sequence[int],
+        port_to_motor_ids: Dict[str, Sequence[int]],
+        **client_kwargs,
+    ):
+        """Initializes a new client.
+
+        Args:
+            motor_ids: All motor IDs being used by the client, in the order
+                of the returned values.
+            port_to_motor_ids: The motor IDs connected to each port.
+            client_kwargs: Keyword arguments passed to every DynamixelClient.
+        """
+        self.motor_ids = list(motor_ids)
+        sharded_ids = sorted(
+            motor_id for ids in port_to_motor_ids.values() for motor_id in ids
+        )
+        assert sharded_ids == sorted(
+            self.motor_ids
+        ), "Every motor must be connected to exactly one port."
+
+        self.clients = [
+            DynamixelClient(ids, port, **client_kwargs)
+            for port, ids in port_to_motor_ids.items()
+        ]
+        self.port_name = list(port_to_motor_ids.keys())
+        self.profiler = client_kwargs.get("profiler")
+        self._client_of_motor = {
+            motor_id: client for client in self.clients for motor_id in client.motor_ids
+        }
+        # Positions of the motors of each client in motor_ids
+        self._client_indices = [
+            [self.motor_ids.index(motor_id) for motor_id in client.motor_ids]
+            for client in self.clients
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.clients), thread_name_prefix="dynamixel_shard"
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        return all(client.is_connected for client in self.clients)
+
+    @property
+    def quarantined(self):
+        return set().union(*(client.quarantined for client in self.clients))
+
+    def _run(self, calls):
+        """Runs (function, args) calls concurrently, one per shard.
+
+        Returns:
+            The results of the calls, in order.
+        """
+        if len(calls) == 1:
+            function, args = calls[0]
+            return [function(*args)]
+        futures = [self._executor.submit(function, *args) for function, args in calls]
+        return [future.result() for future in futures]
+
+    def _split(self, motor_ids: Sequence[int], values=None):
+        """Groups motor IDs, and their values, by the client they belong to.
+
+        Motors that are not on any port are left out, as they would not reply
+        on a single bus either.
+
+        Returns:
+            A list of (client, motor IDs, values, indices in motor_ids).
+        """
+        groups = {}
+        for index, motor_id in enumerate(motor_ids):
+            client = self._client_of_motor.get(motor_id)
+            if client is None:
+                continue
+            group = groups.setdefault(client, ([], [], []))
+            group[0].append(motor_id)
+            group[1].append(None if values is None else values[index])
+            group[2].append(index)
+        return [(client, *group) for client, group in groups.items()]
+
+    @staticmethod
+    def _merge(indices, results, length):
+        """Scatters the per shard results back to their positions."""
+        merged = [None] * length
+        for shard_indices, result in zip(indices, results):
+            for index, value in zip(shard_indices, result):
+                merged[index] = value
+        return merged
+
+    def _map_clients(self, method: str):
+        """Calls a method of every client concurrently, merging the lists."""
+        results = self._run([(getattr(client, method), ()) for client in self.clients])
+        return self._merge(self._client_indices, results, len(self.motor_ids))
+
+    def connect(self):
+        for client in self.clients:
+            client.connect()
+
+    def disconnect(self):
+        self._run([(client.disconnect, ()) for client in self.clients])
+
+    def reboot(self, retries: int = -1, retry_interval: float = 0.25):
+        self._run(
+            [(client.reboot, (retries, retry_interval)) for client in self.clients]
+        )
+
+    def set_torque_enabled(
+        self, enabled: bool, retries: int = -1, retry_interval: float = 0.25
+    ):
+        self._run(
+            [
+                (client.set_torque_enabled, (enabled, retries, retry_interval))
+                for client in self.clients
+            ]
+        )
+
+    def apply_config(self, settings: Sequence[RegisterSetting]) -> int:
+        """Applies the configuration on every port, see DynamixelClient."""
+        return sum(
+            self._run([(client.apply_config, (settings,)) for client in self.clients])
+        )
+
+    def record_retry(self, context: str):
+        if self.profiler is not None:
+            self.profiler.count("retry.{}".format(context))
+
+    def sync_write(
+        self,
+        motor_ids: Sequence[int],
+        values: Sequence[Union[int, float]],
+        address: int,
+        size: int,
+    ):
+        """Writes values to a group of motors, one Sync Write per port."""
+        # Values beyond the motor IDs are ignored, like in DynamixelClient
+        motor_ids = list(motor_ids)[: len(values)]
+        shards = self._split(motor_ids, values)
+        self._run(
+            [
+                (client.sync_write, (ids, shard_values, address, size))
+                for client, ids, shard_values, _ in shards
+            ]
+        )
+
+    def sync_read(
+        self, motor_ids: Sequence[int], address: int, size: int, fast: bool = False
+    ):
+        """Reads data from a group of motors, one Sync Read per port."""
+        motor_ids = list(motor_ids)
+        shards = self._split(motor_ids)
+        results = self._run(
+            [
+                (client.sync_read, (ids, address, size, fast))
+                for client, ids, _, _ in shards
+            ]
+        )
+        return self._merge(
+            [indices for _, _, _, indices in shards], results, len(motor_ids)
+        )
+
+    def bulk_read(self, specs: Sequence[Tuple[int, int, int]]):
+        """Reads (motor_id, address, size) specs, one Bulk Read per port."""
+        specs = list(specs)
+        shards = self._split([motor_id for motor_id, _, _ in specs], specs)
+        results = self._run(
+            [(client.bulk_read, (shard_specs,)) for client, _, shard_specs, _ in shards]
+        )
+        return self._merge(
+            [indices for _, _, _, indices in shards], results, len(specs)
+        )
+
+    def read_registers(self, names: Sequence[str], scaled: bool = False):
+        """Reads registers by name, see DynamixelClient.read_registers."""
+        results = self._run(
+            [(client.read_registers, (names, None, scaled)) for client in self.clients]
+        )
+        return {
+            name: self._merge(
+                self._client_indices,
+                [values[name] for values in results],
+                len(self.motor_ids),
+            )
+            for name in names
+        }
+
+    def read_state(self):
+        """Reads the state of every port, see DynamixelClient.read_state."""
+        state, received = self.read_state_partial()
+        return state if received.all() else None
+
+    def read_state_partial(self):
+        """Reads the state of every port, see DynamixelClient.read_state_partial."""
+        results = self._run(
+            [(client.read_state_partial, ()) for client in self.clients]
+        )
+        state = np.zeros(len(self.motor_ids), dtype=STATE_DTYPE)
+        received = np.zeros(len(self.motor_ids), dtype=bool)
+        for indices, (client_state, client_received) in zip(
+            self._client_indices, results
+        ):
+            state[indices] = client_state
+            received[indices] = client_received
+        return state, received
+
+    # Common read calls
+
+    def read_pos(self):
+        return self._map_clients("read_pos")
+
+    def read_goal_pos(self):
+        return self._map_clients("read_goal_pos")
+
+    def read_cur(self):
+        return self._map_clients("read_cur")
+
+    def read_vel(self):
+        return self._map_clients("read_vel")
+
+    # Common write calls
+
+    def set_pos(self, values):
+        self.sync_write(self.motor_ids, values, ADDR_GOAL_POSITION, LEN_GOAL_POSITION)
+
+    # Single motor calls go to the client of the motor
+
+    def set_pos_indv(self, motor_id, value):
+        self._client_of_motor[motor_id].set_pos_indv(motor_id, value)
+
+    def single_write(self, motor_id, value, addr):
+        self._client_of_motor[motor_id].single_write(motor_id, value, addr)
+
+    def single_read(self, motor_id, addr):
+        return self._client_of_motor[motor_id].single_read(motor_id, addr)
+
+    def read_single_cur(self, motor_id):
+        return self._client_of_motor[motor_id].read_single_cur(motor_id)
+
+    def __enter__(self):
+        """Enables use as a context manager."""
+        if not self.is_connected:
+            self.connect()
+        return self
+
+    def __exit__(self, *args):
+        """Enables use as a context manager."""
+        self.disconnect()
+
+
 # Register global cleanup function.
 atexit.register(dynamixel_cleanup_handler)
 
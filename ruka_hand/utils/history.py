@@ -0,0 +1,36 @@
+class ObservationHistory:
+    """Fixed capacity history of the latest observations, oldest first.
+
+    Every observation is written to two slots capacity apart in a
+    preallocated buffer of twice the capacity, so the latest capacity
+    observations are always a contiguous slice of the buffer. Appending copies
+    the observation in place and view() returns that slice, so neither
+    allocates a new tensor.
+
+    Args:
+        capacity: Number of observations kept, e.g. the obs_horizon.
+        observation: First observation, which the history is filled with.
+    """
+
+    def __init__(self, capacity, observation):
+        self.capacity = capacity
+        self._buffer = observation.new_empty((2 * capacity, *observation.shape))
+        self._buffer[:] = observation
+        # Slot of the oldest observation, the newest is capacity - 1 after it
+        self._start = 0
+
+    def append(self, observation):
+        # Overwrites the oldest observation, which becomes the newest one
+        self._buffer[self._start] = observation
+        self._buffer[self._start + self.capacity] = observation
+        self._start = (self._start + 1) % self.capacity
+
+    def view(self):
+        """Returns the observations as a (capacity, ...) view, oldest first.
+
+        The view is only valid until the next append().
+        """
+        return self._buffer[self._start : self._start + self.capacity]
+
+    def __len__(self):
+        return self.capacity
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+
+class MotorRecovery(threading.Thread):
+    """Quarantines failing motors and brings them back in the background.
+
+    A motor is quarantined when its status packets raise the hardware error
+    alert, or when it misses max_missed_reads reads in a row. The client then
+    leaves it out of its transactions, so the other motors keep being
+    controlled, while this thread calls client.restore_motor() with an
+    exponential backoff until the motor is back.
+
+    Args:
+        client: The DynamixelClient owning the motors.
+        max_missed_reads: Consecutive reads without reply before quarantine.
+        initial_backoff: Delay in seconds before retrying a failed recovery,
+            doubled after every failure.
+        max_backoff: Upper bound of the delay between recoveries.
+    """
+
+    def __init__(
+        self, client, max_missed_reads=3, initial_backoff=0.5, max_backoff=30.0
+    ):
+        super().__init__(daemon=True)
+        self.client = client
+        self.max_missed_reads = max_missed_reads
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._missed_reads = {}
+        # Quarantined motor ID -> (time of the next recovery, backoff)
+        self._schedule = {}
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    @property
+    def quarantined(self):
+        with self._lock:
+            return set(self._schedule)
+
+    def quarantine(self, motor_id, reason):
+        with self._lock:
+            if motor_id in self._schedule:
+                return
+            self._schedule[motor_id] = (time.monotonic(), self.initial_backoff)
+        logging.warning("Quarantined Dynamixel#%d: %s", motor_id, reason)
+        self._wake_event.set()
+
+    def report_alert(self, motor_id):
+        self.quarantine(motor_id, "hardware error alert")
+
+    def report_read(self, received_ids, missing_ids):
+        """Counts the consecutive reads each motor did not reply to."""
+        for motor_id in received_ids:
+            self._missed_reads[motor_id] = 0
+        for motor_id in missing_ids:
+            missed_reads = self._missed_reads.get(motor_id, 0) + 1
+            self._missed_reads[motor_id] = missed_reads
+            if missed_reads >= self.max_missed_reads:
+                self.quarantine(motor_id, "missed {} reads".format(missed_reads))
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.is_alive():
+            self.join()
+
+    def _recover(self, motor_id):
+        try:
+            recovered = self.client.restore_motor(motor_id)
+        except Exception as e:
+            logging.error("Recovery of Dynamixel#%d failed: %s", motor_id, e)
+            recovered = False
+
+        if recovered:
+            with self._lock:
+                del self._schedule[motor_id]
+            self._missed_reads[motor_id] = 0
+            logging.warning("Dynamixel#%d recovered", motor_id)
+            return
+
+        with self._lock:
+            _, backoff = self._schedule[motor_id]
+            self._schedule[motor_id] = (
+                time.monotonic() + backoff,
+                min(2 * backoff, self.max_backoff),
+            )
+        logging.error(
+            "Could not recover Dynamixel#%d, retrying in %.1fs", motor_id, backoff
+        )
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            now = time.monotonic()
+            with self._lock:
+                due_ids = [
+                    motor_id
+                    for motor_id, (next_time, _) in self._schedule.items()
+                    if next_time <= now
+                ]
+            for motor_id in due_ids:
+                if self._stop_event.is_set():
+                    return
+                self._recover(motor_id)
+
+            with self._lock:
+                next_time = min(
+                    (next_time for next_time, _ in self._schedule.values()),
+                    default=None,
+                )
+            timeout = (
+                None if next_time is None else max(next_time - time.monotonic(), 0)
+            )
+            self._wake_event.wait(timeout)
@@ -0,0 +1,167 @@
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ruka_hand.utils.dynamixel_util import STATE_DTYPE
+
+# count, capacity and number of motors, padded to a cache line
+HEADER_DTYPE = np.dtype([("count", "<u8"), ("capacity", "<u8"), ("num_motors", "<u8")])
+HEADER_SIZE = 64
+
+
+def record_dtype(num_motors):
+    """dtype of one ring buffer record of a hand with num_motors motors."""
+    return np.dtype(
+        [
+            # Seqlock, odd while the record is being written
+            ("sequence", "<u8"),
+            ("timestamp", "<f8"),
+            ("commanded", "<f8", (num_motors,)),
+            ("state", STATE_DTYPE, (num_motors,)),
+        ]
+    )
+
+
+class SharedStateRing:
+    """Fixed-size ring buffer of hand state records in shared memory.
+
+    The process owning the hand creates the ring and publishes every state
+    snapshot into it; any other process attaches by name and reads without
+    touching the bus. Each record is guarded by a seqlock: the writer makes
+    its sequence odd while writing and even once done, and readers discard
+    copies whose sequence changed, so the writer never waits on readers.
+
+    Args:
+        name: Name of the shared memory block, e.g. "ruka_right_state".
+        num_motors: Number of motors, only needed to create the ring.
+        capacity: Number of records kept, only needed to create the ring.
+        create: If True, creates the ring as its single writer, replacing a
+            block left over by a crashed writer. Otherwise attaches to it.
+    """
+
+    def __init__(self, name, num_motors=None, capacity=1024, create=False):
+        self.name = name
+        self.create = create
+        if create:
+            size = HEADER_SIZE + capacity * record_dtype(num_motors).itemsize
+            try:
+                self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                stale = shared_memory.SharedMemory(name)
+                stale.close()
+                stale.unlink()
+                self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name)
+            # Only the writer may unlink the block, but before Python 3.13 the
+            # resource tracker of every attached process unlinks it on exit
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self._shm.buf)
+        if create:
+            self._header["count"] = 0
+            self._header["capacity"] = capacity
+            self._header["num_motors"] = num_motors
+        self.capacity = int(self._header["capacity"])
+        self.num_motors = int(self._header["num_motors"])
+        self._records = np.ndarray(
+            (self.capacity,),
+            dtype=record_dtype(self.num_motors),
+            buffer=self._shm.buf,
+            offset=HEADER_SIZE,
+        )
+        self._sequences = self._records["sequence"]
+
+    @property
+    def count(self):
+        """Number of records published so far."""
+        return int(self._header["count"])
+
+    def publish(self, state, timestamp, commanded=None):
+        """Writes a state snapshot as the next record, overwriting the oldest."""
+        index = self.count
+        record = self._records[index % self.capacity]
+        record["sequence"] = 2 * index + 1
+        record["timestamp"] = timestamp
+        record["commanded"] = np.nan if commanded is None else commanded
+        record["state"] = state
+        record["sequence"] = 2 * index + 2
+        self._header["count"] = index + 1
+
+    def read(self, index):
+        """Returns a copy of record index, or None if it is not available."""
+        slot = index % self.capacity
+        sequence = self._sequences[slot]
+        if sequence != 2 * index + 2:
+            return None
+        record = self._records[slot].copy()
+        if self._sequences[slot] != sequence:
+            return None
+        return record
+
+    def latest(self):
+        """Returns a copy of the latest record, or None if there is none yet."""
+        while True:
+            count = self.count
+            if count == 0:
+                return None
+            record = self.read(count - 1)
+            if record is not None:
+                return record
+
+    def read_since(self, index):
+        """Reads the records published since index.
+
+        Records that were already overwritten are skipped, so a reader
+        polling read_since() with the returned index sees every record as
+        long as it keeps up with the writer.
+
+        Returns:
+            The records in publish order and the index to continue from.
+        """
+        count = self.count
+        indices = np.arange(max(index, count - self.capacity), count, dtype=np.uint64)
+        slots = indices % self.capacity
+        records = self._records[slots]
+        valid = (records["sequence"] == 2 * indices + 2) & (
+            self._sequences[slots] == records["sequence"]
+        )
+        return records[valid], count
+
+    def close(self):
+        del self._header, self._records, self._sequences
+        self._shm.close()
+        if self.create:
+            self._shm.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prints the state published by a Hand to shared memory."
+    )
+    parser.add_argument("-n", "--name", type=str, default="ruka_right_state")
+    parser.add_argument("-i", "--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    ring = SharedStateRing(args.name)
+    index = ring.count
+    try:
+        while True:
+            time.sleep(args.interval)
+            records, index = ring.read_since(index)
+            if len(records) == 0:
+                continue
+            latest = records[-1]
+            print(
+                "{:.1f} Hz position: {} temperature: {}".format(
+                    len(records) / args.interval,
+                    latest["state"]["position"].tolist(),
+                    latest["state"]["temperature"].tolist(),
+                )
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
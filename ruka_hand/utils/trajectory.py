@@ -2,6 +2,77 @@ import time
 
 import numpy as np
 
+from ruka_hand.utils.control_table.registry import CONTROL_TABLE
+
+# Raw units of the profile registers in pulse/s and pulse/s^2
+PROFILE_VELOCITY_UNIT = CONTROL_TABLE["Profile Velocity"].unit_scale * 4096 / 60
+PROFILE_ACCELERATION_UNIT = (
+    CONTROL_TABLE["Profile Acceleration"].unit_scale * 4096 / 3600
+)
+# Profile Velocity can not exceed the Velocity Limit, 445 by default
+MAX_PROFILE_VELOCITY = 445
+MAX_PROFILE_ACCELERATION = 32767
+
+
+def synchronized_profile(curr_pos, des_pos, duration, accel_fraction=0.25):
+    """Computes the Profile Acceleration and Velocity of each motor so that
+    all motors reach des_pos together after duration seconds.
+
+    Each motor follows a trapezoidal velocity profile, accelerating during
+    accel_fraction of the duration, cruising and decelerating as long. The
+    duration is extended if the farthest motor would exceed the velocity
+    limit.
+
+    Returns:
+        The Profile Acceleration and Profile Velocity register values and the
+        duration of the move.
+    """
+    assert 0 < accel_fraction <= 0.5, "Acceleration takes at most half the move."
+    distance = np.abs(
+        np.asarray(des_pos, dtype=np.float64) - np.asarray(curr_pos, dtype=np.float64)
+    )
+    max_velocity = MAX_PROFILE_VELOCITY * PROFILE_VELOCITY_UNIT
+    duration = max(duration, distance.max() / ((1 - accel_fraction) * max_velocity))
+    if duration == 0:
+        # Nothing moves, any profile arrives immediately
+        ones = np.ones(len(distance), dtype=np.int64)
+        return ones, ones, 0.0
+
+    accel_time = accel_fraction * duration
+    velocity = distance / (duration - accel_time)
+    acceleration = velocity / accel_time
+    # 0 disables the profile, so motors that barely move get the slowest one
+    velocity = np.clip(
+        np.round(velocity / PROFILE_VELOCITY_UNIT), 1, MAX_PROFILE_VELOCITY
+    )
+    acceleration = np.clip(
+        np.round(acceleration / PROFILE_ACCELERATION_UNIT),
+        1,
+        MAX_PROFILE_ACCELERATION,
+    )
+    return acceleration.astype(np.int64), velocity.astype(np.int64), duration
+
+
+def profile_position(curr_pos, des_pos, elapsed, duration, accel_fraction=0.25):
+    """Position along the synchronized trapezoidal profile after elapsed
+    seconds, i.e. the position the motor firmware is commanding."""
+    curr_pos = np.asarray(curr_pos, dtype=np.float64)
+    des_pos = np.asarray(des_pos, dtype=np.float64)
+    if elapsed >= duration:
+        return des_pos
+    accel_time = accel_fraction * duration
+    # Fraction of the distance covered, the cruise velocity covers 1 over
+    # duration - accel_time
+    cruise_time = duration - accel_time
+    if elapsed < accel_time:
+        progress = elapsed**2 / (2 * accel_time * cruise_time)
+    elif elapsed < cruise_time:
+        progress = (elapsed - accel_time / 2) / cruise_time
+    else:
+        remaining = duration - elapsed
+        progress = 1 - remaining**2 / (2 * accel_time * cruise_time)
+    return curr_pos + progress * (des_pos - curr_pos)
+
 
 def move_to_pos(
     curr_pos,
@@ -10,7 +81,18 @@ def move_to_pos(
     data_saver=None,
     traj_len=50,
     sleep_time=0.01,
+    profiled=False,
 ):
+    if profiled and traj_len > 1:
+        return move_to_pos_profiled(
+            curr_pos,
+            des_pos,
+            hand,
+            duration=(traj_len - 1) * sleep_time,
+            data_saver=data_saver,
+            sleep_time=sleep_time,
+        )
+
     if traj_len == 1:
         trajectory = [des_pos]
     else:
@@ -26,3 +108,35 @@ def move_to_pos(
             data_saver.save_single_row(hand, hand_pos)
 
     return True, hand_pos
+
+
+def move_to_pos_profiled(
+    curr_pos,
+    des_pos,
+    hand,
+    duration,
+    data_saver=None,
+    sleep_time=0.01,
+    accel_fraction=0.25,
+):
+    """Moves to des_pos with the motion profile of the motor firmware.
+
+    The whole move is a single write, see Hand.set_pos_profiled. The host only
+    wakes up every sleep_time seconds to save rows, if a data_saver is given.
+    """
+    duration = hand.set_pos_profiled(
+        des_pos, duration, accel_fraction=accel_fraction, curr_pos=curr_pos
+    )
+    start = time.monotonic()
+    elapsed = 0.0
+    while elapsed < duration:
+        time.sleep(min(sleep_time, duration - elapsed))
+        elapsed = time.monotonic() - start
+        if not data_saver is None:
+            data_saver.save_single_row(
+                hand,
+                profile_position(curr_pos, des_pos, elapsed, duration, accel_fraction),
+            )
+    hand.clear_profile()
+
+    return True, des_pos
@@ -0,0 +1,126 @@
+# Microbenchmark of the controller inference, comparing one LSTMMLPEncDec
+# forward per finger with a single GroupedLSTMMLPEncDec forward over the whole
+# observation window and, as with streaming inference, over only the newest
+# observation continuing from the LSTM state of the previous step. Uses randomly
+# initialized learners with the architecture of the training config, so no
+# checkpoints are needed
+import argparse
+import os
+import timeit
+
+import torch
+from omegaconf import OmegaConf
+
+from ruka_hand.learning.grouped_lstm_mlp_enc_dec import GroupedLSTMMLPEncDec
+from ruka_hand.learning.lstm_mlp_enc_dec import LSTMMLPEncDec
+from ruka_hand.utils.file_ops import get_repo_root
+
+
+def per_finger_forward(learners, inputs):
+    return [
+        learner.forward(model_input).detach().cpu()[0]
+        for learner, model_input in zip(learners, inputs)
+    ]
+
+
+def grouped_forward(grouped_learner, inputs, device):
+    grouped_pred = grouped_learner(torch.stack(inputs).unsqueeze(1).to(device))
+    return list(grouped_pred.detach().cpu()[:, 0])
+
+
+def streaming_forward(grouped_learner, inputs, state, device):
+    grouped_pred, _ = grouped_learner.forward_state(
+        torch.stack([model_input[-1:] for model_input in inputs])
+        .unsqueeze(1)
+        .to(device),
+        state,
+    )
+    return list(grouped_pred.detach().cpu()[:, 0])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched inference.")
+    parser.add_argument("-n", "--number", type=int, default=500)
+    parser.add_argument("-f", "--fingers", type=int, default=4)
+    parser.add_argument("-d", "--device", type=str, default="cpu")
+    parser.add_argument("--input-dim", type=int, default=3)
+    parser.add_argument("--output-dim", type=int, default=2)
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=os.path.join(
+            get_repo_root(), "configs", "train_controller_left_index.yaml"
+        ),
+    )
+    args = parser.parse_args()
+
+    cfg = OmegaConf.load(args.config)
+    cfg.net.input_dim = args.input_dim
+    cfg.net.output_dim = args.output_dim
+
+    torch.manual_seed(0)
+    learners = []
+    for _ in range(args.fingers):
+        learner = LSTMMLPEncDec(cfg)
+        learner.eval()
+        learner.to(args.device)
+        learners.append(learner)
+    grouped_learner = GroupedLSTMMLPEncDec(learners).to(args.device)
+
+    inputs = [
+        torch.randn(cfg.dataset.obs_horizon, args.input_dim)
+        for _ in range(args.fingers)
+    ]
+    with torch.inference_mode():
+        max_error = max(
+            (per_finger - grouped).abs().max().item()
+            for per_finger, grouped in zip(
+                per_finger_forward(learners, inputs),
+                grouped_forward(grouped_learner, inputs, args.device),
+            )
+        )
+        per_finger_time = timeit.timeit(
+            lambda: per_finger_forward(learners, inputs), number=args.number
+        )
+        grouped_time = timeit.timeit(
+            lambda: grouped_forward(grouped_learner, inputs, args.device),
+            number=args.number,
+        )
+
+        # Streaming the newest observation after the state of all previous
+        # ones predicts the same as the whole window
+        _, state = grouped_learner.forward_state(
+            torch.stack([model_input[:-1] for model_input in inputs])
+            .unsqueeze(1)
+            .to(args.device)
+        )
+        streaming_error = max(
+            (grouped - streaming).abs().max().item()
+            for grouped, streaming in zip(
+                grouped_forward(grouped_learner, inputs, args.device),
+                streaming_forward(grouped_learner, inputs, state, args.device),
+            )
+        )
+        streaming_time = timeit.timeit(
+            lambda: streaming_forward(grouped_learner, inputs, state, args.device),
+            number=args.number,
+        )
+
+    print(f"max abs difference grouped: {max_error:.3g}")
+    print(f"max abs difference streaming: {streaming_error:.3g}")
+    print(
+        "{} fingers: per finger {:8.1f} us | grouped {:8.1f} us | {:.2f}x".format(
+            args.fingers,
+            per_finger_time / args.number * 1e6,
+            grouped_time / args.number * 1e6,
+            per_finger_time / grouped_time,
+        )
+    )
+    print(
+        "{} fingers: per finger {:8.1f} us | streaming {:6.1f} us | {:.2f}x".format(
+            args.fingers,
+            per_finger_time / args.number * 1e6,
+            streaming_time / args.number * 1e6,
+            per_finger_time / streaming_time,
+        )
+    )
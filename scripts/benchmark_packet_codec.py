@@ -0,0 +1,140 @@
+# Microbenchmark of the host-side cost of building and parsing packets,
+# comparing dynamixel_sdk's packet handler with PacketCodec. No hardware needed
+import argparse
+import timeit
+
+import dynamixel_sdk
+import numpy as np
+
+from ruka_hand.utils.dynamixel_util import *
+
+MOTOR_IDS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+
+class LoopbackPort:
+    # Minimal stand-in for dynamixel_sdk.PortHandler replaying a fixed reply
+    def __init__(self, reply=b""):
+        self.is_using = False
+        self.reply = reply
+        self.buffer = b""
+
+    def clearPort(self):
+        self.buffer = self.reply
+
+    def writePort(self, packet):
+        return len(packet)
+
+    def readPort(self, length):
+        data, self.buffer = self.buffer[:length], self.buffer[length:]
+        return data
+
+    def setPacketTimeout(self, packet_length):
+        pass
+
+    def isPacketTimeout(self):
+        return True
+
+
+def sdk_sync_write(sync_writer, goal_pos):
+    sync_writer.clearParam()
+    for motor_id, desired_pos in zip(MOTOR_IDS, goal_pos):
+        sync_writer.addParam(
+            motor_id, int(desired_pos).to_bytes(LEN_GOAL_POSITION, byteorder="little")
+        )
+    sync_writer.txPacket()
+
+
+def codec_sync_write(codec, port, goal_pos):
+    port.writePort(
+        codec.encode_sync_write(
+            MOTOR_IDS, goal_pos, ADDR_GOAL_POSITION, LEN_GOAL_POSITION
+        )
+    )
+
+
+def sdk_receive(packet_handler, port, num_packets):
+    port.clearPort()
+    for _ in range(num_packets):
+        packet_handler.rxPacket(port, False)
+
+
+def codec_receive(codec, port, num_packets):
+    port.clearPort()
+    for _ in range(num_packets):
+        codec.receive_status(port)
+
+
+def report(name, sdk_time, codec_time, number):
+    print(
+        "{:>12}: sdk {:8.2f} us | codec {:8.2f} us | {:.2f}x".format(
+            name,
+            sdk_time / number * 1e6,
+            codec_time / number * 1e6,
+            sdk_time / codec_time,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the packet codec.")
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    codec = PacketCodec()
+    packet_handler = dynamixel_sdk.PacketHandler(PROTOCOL_VERSION)
+    goal_pos = np.random.uniform(1000, 3000, len(MOTOR_IDS))
+
+    # CRC16 over a goal position Sync Write packet
+    packet = codec.encode_sync_write(
+        MOTOR_IDS, goal_pos, ADDR_GOAL_POSITION, LEN_GOAL_POSITION
+    )
+    assert packet_handler.updateCRC(0, packet, len(packet) - 2) == codec.crc16(
+        packet[:-2]
+    )
+    report(
+        "crc16",
+        timeit.timeit(
+            lambda: packet_handler.updateCRC(0, packet, len(packet) - 2),
+            number=args.number,
+        ),
+        timeit.timeit(lambda: codec.crc16(packet[:-2]), number=args.number),
+        args.number,
+    )
+
+    # Goal position Sync Write of all motors
+    port = LoopbackPort()
+    sync_writer = dynamixel_sdk.GroupSyncWrite(
+        port, packet_handler, ADDR_GOAL_POSITION, LEN_GOAL_POSITION
+    )
+    report(
+        "sync_write",
+        timeit.timeit(
+            lambda: sdk_sync_write(sync_writer, goal_pos), number=args.number
+        ),
+        timeit.timeit(
+            lambda: codec_sync_write(codec, port, goal_pos), number=args.number
+        ),
+        args.number,
+    )
+
+    # Parsing the status packets of a present position Sync Read
+    replies = b"".join(
+        codec.encode(
+            motor_id,
+            INST_STATUS,
+            b"\x00" + int(pos).to_bytes(LEN_PRESENT_POSITION, byteorder="little"),
+        )
+        for motor_id, pos in zip(MOTOR_IDS, goal_pos)
+    )
+    port = LoopbackPort(replies)
+    report(
+        "sync_read rx",
+        timeit.timeit(
+            lambda: sdk_receive(packet_handler, port, len(MOTOR_IDS)),
+            number=args.number,
+        ),
+        timeit.timeit(
+            lambda: codec_receive(codec, port, len(MOTOR_IDS)), number=args.number
+        ),
+        args.number,
+    )
@@ -0,0 +1,96 @@
+# Measures the round-trip time of reading the present position of all motors,
+# comparing the previous chunked sync read against the single-transaction and
+# Fast Sync Read ones
+import argparse
+import time
+
+import numpy as np
+
+from ruka_hand.utils.constants import USB_PORTS
+from ruka_hand.utils.dynamixel_util import *
+
+MOTOR_IDS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+
+def chunked_sync_read(dxl_client, motor_ids, address, size):
+    # Previous implementation: split into chunks of 3 motors and build a new
+    # GroupSyncRead on every call
+    if len(motor_ids) > 3:
+        return chunked_sync_read(
+            dxl_client, motor_ids[:3], address, size
+        ) + chunked_sync_read(dxl_client, motor_ids[3:], address, size)
+    sync_reader = dxl_client.dxl.GroupSyncRead(
+        dxl_client.port_handler, dxl_client.packet_handler, address, size
+    )
+    for motor_id in motor_ids:
+        sync_reader.addParam(motor_id)
+    sync_reader.txRxPacket()
+    bulk_data = []
+    for motor_id in motor_ids:
+        data = None
+        if sync_reader.isAvailable(motor_id, address, size):
+            data = sync_reader.getData(motor_id, address, size)
+        bulk_data.append(data)
+    sync_reader.clearParam()
+    return bulk_data
+
+
+def time_reads(read_fn, iterations):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        read_fn()
+        durations.append(time.perf_counter() - start)
+    return np.array(durations) * 1e3
+
+
+def print_stats(name, durations):
+    print(
+        "{:>10}: mean {:.3f} ms | median {:.3f} ms | p99 {:.3f} ms | {:.1f} Hz".format(
+            name,
+            np.mean(durations),
+            np.median(durations),
+            np.percentile(durations, 99),
+            1e3 / np.mean(durations),
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark motor position reads.")
+    parser.add_argument(
+        "-ht",
+        "--hand_type",
+        type=str,
+        help="Hand whose bus will be benchmarked",
+        default="right",
+    )
+    parser.add_argument(
+        "-p", "--port", type=str, help="Overrides the USB port of the hand"
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    port = args.port if args.port is not None else USB_PORTS[args.hand_type]
+    dxl_client = DynamixelClient(MOTOR_IDS, port)
+    dxl_client.connect()
+
+    chunked = time_reads(
+        lambda: chunked_sync_read(
+            dxl_client, MOTOR_IDS, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION
+        ),
+        args.iterations,
+    )
+    single = time_reads(dxl_client.read_pos, args.iterations)
+    dxl_client.fast_sync_read = True
+    fast = time_reads(dxl_client.read_pos, args.iterations)
+
+    print("Present position read of {} motors:".format(len(MOTOR_IDS)))
+    print_stats("chunked", chunked)
+    print_stats("single", single)
+    print_stats("fast", fast)
+    print("Speedup: {:.2f}x".format(np.mean(chunked) / np.mean(single)))
+    if not dxl_client._fast_sync_read_supported:
+        print("Fast Sync Read is not supported by the firmware, fast used Sync Read.")
+
+    dxl_client.disconnect()
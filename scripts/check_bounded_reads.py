@@ -0,0 +1,35 @@
+# Checks the bounded position reads of Hand on an emulated bus: read_pos()
+# returns every position on a healthy bus, and a motor that stops replying
+# keeps its last good position and is flagged stale within read_deadline
+import time
+
+import numpy as np
+
+from ruka_hand.control.hand import Hand
+from ruka_hand.utils.dynamixel_emulator import get_emulated_bus
+
+PORT = "emulator://check_bounded_reads"
+DROPPED_MOTOR = 5
+
+if __name__ == "__main__":
+    bus = get_emulated_bus(PORT)
+    hand = Hand("right", port=PORT)
+    try:
+        pos = hand.read_pos()
+        assert len(pos) == len(hand.motors), pos
+        assert not np.isnan(pos).any() and not hand.stale.any(), pos
+
+        index = hand.motors.index(DROPPED_MOTOR)
+        motor = bus.motors.pop(DROPPED_MOTOR)
+        start = time.perf_counter()
+        dropped_pos = hand.read_pos()
+        duration = time.perf_counter() - start
+        bus.motors[DROPPED_MOTOR] = motor
+
+        assert hand.stale[index] and not hand.unread[index], hand.stale
+        assert dropped_pos[index] == pos[index], dropped_pos
+        # Some slack for the read that runs over the deadline
+        assert duration < hand.read_deadline + 0.05, duration
+    finally:
+        hand.close()
+    print("Bounded reads OK")
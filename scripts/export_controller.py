@@ -0,0 +1,42 @@
+# Exports the finger checkpoints of the controller of a hand to TorchScript or
+# ONNX graphs, which HandController runs with inference_backend set to the
+# same format
+import argparse
+import os
+
+from ruka_hand.learning.export import EXPORT_FORMATS, export_learner
+from ruka_hand.utils.constants import CHECKPOINT_DIR
+from ruka_hand.utils.file_ops import get_repo_root
+
+FINGER_NAMES = ["Thumb", "Index", "Middle", "Ring", "Pinky"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export controller checkpoints.")
+    parser.add_argument(
+        "-ht",
+        "--hand_type",
+        type=str,
+        help="Hand whose checkpoints are exported",
+        default="right",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        choices=list(EXPORT_FORMATS),
+        default="torchscript",
+    )
+    parser.add_argument("-c", "--checkpoint", type=str, default="best")
+    parser.add_argument(
+        "--fingers", type=str, nargs="+", choices=FINGER_NAMES, default=FINGER_NAMES
+    )
+    args = parser.parse_args()
+
+    checkpoint_dir = os.path.join(get_repo_root(), CHECKPOINT_DIR)
+    for finger_name in args.fingers:
+        path = export_learner(
+            f"{checkpoint_dir}/{args.hand_type}_{finger_name.lower()}",
+            export_format=args.format,
+            model_type=args.checkpoint,
+        )
+        print(f"Exported {args.hand_type} {finger_name} to {path}")
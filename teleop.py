@@ -22,13 +22,22 @@ if __name__ == "__main__":
         default="manus",
     )
 
+    parser.add_argument(
+        "-b",
+        "--bimanual",
+        action="store_true",
+        help="Teleoperate both hands from a single process",
+    )
+
     args = parser.parse_args()
+    hand_names = ["left", "right"] if args.bimanual else [args.hand_type]
 
     if args.mode == "manus":
         manus_teleoperator = ManusTeleoperator(
-            hand_names=[args.hand_type],
+            hand_names=hand_names,
             frequency=50,
             record=False,
+            bimanual=args.bimanual,
         )
         manus_teleoperator.run()
     elif args.mode == "oculus":
@@ -37,6 +46,7 @@ if __name__ == "__main__":
             OCULUS_LEFT_PORT,
             OCULUS_RIGHT_PORT,
             90,
-            hands=[args.hand_type],
+            hands=hand_names,
+            bimanual=args.bimanual,
         )
         oculus_teleoperator.run()